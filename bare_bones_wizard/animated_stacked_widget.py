@@ -1,13 +1,43 @@
 # animated_stacked_widget.py
+from collections import deque
+
 from PySide6.QtCore import (
     QAbstractAnimation,
     QEasingCurve,
     QParallelAnimationGroup,
     QPoint,
     QPropertyAnimation,
+    Qt,
+    QVariantAnimation,
+    Signal,
     Slot,
 )
-from PySide6.QtWidgets import QStackedWidget
+from PySide6.QtGui import QPainter, QPalette, QPixmap
+from PySide6.QtWidgets import QStackedWidget, QWidget
+
+
+class _TransitionOverlay(QWidget):
+    """Paints the outgoing and incoming page snapshots on top of the stack."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Fully covered by the snapshots, so nothing underneath is repainted.
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.outgoing = None
+        self.incoming = None
+        self.offset = 0
+        self.progress = 0.0
+
+    def set_progress(self, progress):
+        self.progress = progress
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        shift = round(self.offset * self.progress)
+        painter.drawPixmap(-shift, 0, self.outgoing)
+        painter.drawPixmap(self.offset - shift, 0, self.incoming)
 
 
 class AnimatedStackedWidget(QStackedWidget):
@@ -16,26 +46,81 @@ class AnimatedStackedWidget(QStackedWidget):
     The animation logic is based on the user-provided file.
     """
 
+    # --- NEW: For instrumentation; `transition_frame` fires on every tick ---
+    transition_started = Signal()
+    transition_frame = Signal()
+    transition_finished = Signal()
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.animation_duration = 300  # milliseconds
         self.animation_group = QParallelAnimationGroup(self)
         # Connect the finished signal to hide the old page.
         self.animation_group.finished.connect(self._on_animation_finished)
-        self._previous_widget = None
+
+        # --- CHANGE: Both slide animations are created once and retargeted
+        # on every transition instead of being allocated per call. ---
+        self._anim_current = self._make_slide_animation()
+        self._anim_next = self._make_slide_animation()
+        self.animation_group.addAnimation(self._anim_current)
+        self.animation_group.addAnimation(self._anim_next)
+
+        # --- NEW: Snapshot mode slides two cached pixmaps instead of the live
+        # pages, so a frame costs the same however many children a page has. ---
+        self.use_snapshots = True
+        self._overlay = _TransitionOverlay(self)
+        self._overlay.hide()
+        self._snapshot_animation = QVariantAnimation(self)
+        self._snapshot_animation.setStartValue(0.0)
+        self._snapshot_animation.setEndValue(1.0)
+        self._snapshot_animation.setEasingCurve(QEasingCurve.Type.InOutQuad)
+        self._snapshot_animation.valueChanged.connect(self._overlay.set_progress)
+        self._snapshot_animation.finished.connect(self._on_snapshot_finished)
+        self._snapshot_animation.valueChanged.connect(self.transition_frame)
+        self._anim_next.valueChanged.connect(self.transition_frame)
+
+        # --- NEW: Page the running transition started from, and navigation
+        # requests that arrived while it was running. ---
+        self._from_index = -1
+        self._queue = deque()
+
+    def _make_slide_animation(self):
+        animation = QPropertyAnimation(self)
+        animation.setPropertyName(b"pos")
+        animation.setEasingCurve(QEasingCurve.Type.InOutQuad)
+        return animation
+
+    def _active_animation(self):
+        if self._snapshot_animation.state() == QAbstractAnimation.State.Running:
+            return self._snapshot_animation
+        if self.animation_group.state() == QAbstractAnimation.State.Running:
+            return self.animation_group
+        return None
 
     @Slot(int)
     def goto_page(self, next_index):
-        """Animates the transition to the specified page index."""
+        """
+        Animates the transition to the specified page index.
+
+        While a transition runs, going back to the page it started from
+        reverses it from wherever it is; any other request is queued and
+        played once it finishes.
+        """
+        if self._active_animation() is not None:
+            if not self._queue and next_index == self._from_index:
+                self._reverse()
+            elif next_index != (
+                self._queue[-1] if self._queue else self.currentIndex()
+            ):
+                self._queue.append(next_index)
+            return
+        self._start_transition(next_index)
+
+    def _start_transition(self, next_index):
         current_index = self.currentIndex()
         if next_index == current_index:
             return
 
-        # This logic is from your provided file: if an animation is already
-        # running, stop it immediately.
-        if self.animation_group.state() == QAbstractAnimation.State.Running:
-            self.animation_group.stop()
-
         current_widget = self.widget(current_index)
         next_widget = self.widget(next_index)
 
@@ -52,6 +137,15 @@ class AnimatedStackedWidget(QStackedWidget):
             # Slide to the right (backward)
             offset = -width
 
+        self._from_index = current_index
+        self.transition_started.emit()
+        # Catch up on a burst of requests by playing each one faster.
+        duration = self.animation_duration // (1 + len(self._queue))
+
+        if self.use_snapshots:
+            self._start_snapshot_transition(next_index, offset, duration)
+            return
+
         # Position the next widget off-screen to slide in
         next_widget.setGeometry(0, 0, width, self.height())
         next_widget.move(offset, 0)
@@ -60,33 +154,98 @@ class AnimatedStackedWidget(QStackedWidget):
         # Set the index immediately. This makes the new widget the "current" one
         # and emits the `currentChanged` signal that main.py uses.
         self.setCurrentIndex(next_index)
+        # The stack hides the page it switched away from; it has to stay
+        # visible to slide out.
+        current_widget.show()
+
+        self._anim_current.setTargetObject(current_widget)
+        self._anim_current.setStartValue(QPoint(0, 0))
+        self._anim_current.setEndValue(QPoint(-offset, 0))
+        self._anim_next.setTargetObject(next_widget)
+        self._anim_next.setStartValue(QPoint(offset, 0))
+        self._anim_next.setEndValue(QPoint(0, 0))
+        for animation in (self._anim_current, self._anim_next):
+            animation.setDuration(duration)
+
+        self.animation_group.setDirection(QAbstractAnimation.Direction.Forward)
+        self.animation_group.start()
 
-        # Create animations for both widgets
-        anim_current = QPropertyAnimation(current_widget, b"pos")
-        anim_current.setDuration(self.animation_duration)
-        anim_current.setEasingCurve(QEasingCurve.Type.InOutQuad)
-        anim_current.setStartValue(QPoint(0, 0))
-        anim_current.setEndValue(QPoint(-offset, 0))
-
-        anim_next = QPropertyAnimation(next_widget, b"pos")
-        anim_next.setDuration(self.animation_duration)
-        anim_next.setEasingCurve(QEasingCurve.Type.InOutQuad)
-        anim_next.setStartValue(QPoint(offset, 0))
-        anim_next.setEndValue(QPoint(0, 0))
-
-        # Group the animations to run in parallel
-        self.animation_group.clear()  # Clear any previous animations
-        self.animation_group.addAnimation(anim_current)
-        self.animation_group.addAnimation(anim_next)
-
-        # Keep track of the widget we need to hide after the animation
-        self._previous_widget = current_widget
+    def _reverse(self):
+        """Sends the running transition back to the page it came from."""
+        animation = self._active_animation()
+        if animation.direction() == QAbstractAnimation.Direction.Forward:
+            animation.setDirection(QAbstractAnimation.Direction.Backward)
+        else:
+            animation.setDirection(QAbstractAnimation.Direction.Forward)
+        leaving = self.currentWidget()
+        self._from_index, target = self.currentIndex(), self._from_index
+        self.setCurrentIndex(target)
+        if animation is self._snapshot_animation:
+            self._overlay.raise_()
+        else:
+            leaving.show()
 
-        self.animation_group.start()
+    def _start_snapshot_transition(self, next_index, offset, duration):
+        """Renders both pages once and slides the pixmaps on the overlay."""
+        next_widget = self.widget(next_index)
+        self._overlay.outgoing = self._render_page(
+            self.currentWidget(), self._overlay.outgoing
+        )
+        # The next page is still hidden; give it its final size so it lays out
+        # before being rendered.
+        next_widget.setGeometry(0, 0, self.width(), self.height())
+        self._overlay.incoming = self._render_page(next_widget, self._overlay.incoming)
+        self._overlay.offset = offset
+        self._overlay.progress = 0.0
+
+        # Switch the real page now, as the live mode does, so `currentChanged`
+        # fires at the same point; it stays hidden behind the overlay.
+        self.setCurrentIndex(next_index)
+        # The stack raises its current page, so raise the overlay after it.
+        self._overlay.setGeometry(self.rect())
+        self._overlay.raise_()
+        self._overlay.show()
+        self._snapshot_animation.setDuration(duration)
+        self._snapshot_animation.setDirection(QAbstractAnimation.Direction.Forward)
+        self._snapshot_animation.start()
+
+    def _render_page(self, widget, pixmap):
+        """Renders `widget` into `pixmap`, reusing it while the size holds."""
+        ratio = self.devicePixelRatioF()
+        size = self.size() * ratio
+        if pixmap is None or pixmap.size() != size:
+            pixmap = QPixmap(size)
+            pixmap.setDevicePixelRatio(ratio)
+        # Pages that do not fill their background would show stale pixels.
+        pixmap.fill(self.palette().color(QPalette.ColorRole.Window))
+        widget.render(pixmap)
+        return pixmap
+
+    def _on_snapshot_finished(self):
+        """Removes the overlay, revealing the real page underneath."""
+        self._overlay.hide()
+        self.transition_finished.emit()
+        self._play_queued()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._overlay.setGeometry(self.rect())
 
     def _on_animation_finished(self):
         """Called after the animation completes to hide the old page."""
-        if self._previous_widget:
-            self._previous_widget.hide()
-            self._previous_widget.move(0, 0)  # Reset position for next time
-            self._previous_widget = None
+        # After a reversal either animation may hold the page that left.
+        for animation in (self._anim_current, self._anim_next):
+            widget = animation.targetObject()
+            if widget is not None and widget is not self.currentWidget():
+                widget.hide()
+                widget.move(0, 0)  # Reset position for next time
+        self.transition_finished.emit()
+        self._play_queued()
+
+    def _play_queued(self):
+        self._from_index = -1
+        while self._queue:
+            next_index = self._queue.popleft()
+            if next_index != self.currentIndex():
+                self._start_transition(next_index)
+                return
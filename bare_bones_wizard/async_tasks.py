@@ -0,0 +1,41 @@
+# async_tasks.py
+import asyncio
+
+
+class TaskScope:
+    """
+    Owns the coroutines started for one wizard run.
+
+    `spawn` starts a task on the running loop and `cancel` cancels every
+    task that is still running, so nothing outlives the step that started
+    it. A cancelled scope does not start new tasks.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.is_cancelled = False
+        self._tasks = set()
+
+    def spawn(self, coro):
+        """Starts `coro` as a task owned by this scope and returns it."""
+        if self.is_cancelled:
+            coro.close()
+            return None
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def cancel(self):
+        self.is_cancelled = True
+        for task in list(self._tasks):
+            task.cancel()
+
+    @property
+    def active(self):
+        return len(self._tasks)
+
+    def _task_done(self, task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Task in scope '{self.name}' failed: {task.exception()}")
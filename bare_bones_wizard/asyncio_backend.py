@@ -0,0 +1,190 @@
+# asyncio_backend.py
+import asyncio
+import ssl
+import threading
+from urllib.parse import urlsplit
+
+from download_engine import CHUNK_SIZE, BodySink, DownloadBackend, DownloadResponse
+from task_executor import call_on_gui_thread
+
+
+class _AsyncioJob:
+    def __init__(self, done):
+        self.is_aborted = False
+        self.future = None
+        self.done = done
+
+    def finish(self, response, error):
+        """Called on the loop thread; `done` runs on the GUI thread."""
+        call_on_gui_thread(self._deliver, response, error)
+
+    def _deliver(self, response, error):
+        if not self.is_aborted:
+            self.done(response, error)
+
+    def abort(self):
+        self.is_aborted = True
+        if self.future is not None:
+            self.future.cancel()
+
+
+class AsyncioBackend(DownloadBackend):
+    """
+    A small HTTP/1.1 client on an asyncio loop in its own thread.
+
+    Idle connections are kept per host and reused (keep-alive); the engine's
+    per-host cap bounds how many exist. Only the standard library is used,
+    so there is no HTTP/2 support.
+    """
+
+    def __init__(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="download-asyncio", daemon=True
+        )
+        self._thread.start()
+        self._ssl = ssl.create_default_context()
+        # (scheme, host, port) -> idle (reader, writer) pairs; loop thread only.
+        self._idle = {}
+
+    def start(self, url, headers, spill_threshold, timeout, on_bytes, done):
+        job = _AsyncioJob(done)
+        job.future = asyncio.run_coroutine_threadsafe(
+            self._fetch(job, url, headers, spill_threshold, timeout, on_bytes),
+            self._loop,
+        )
+        return job
+
+    def shutdown(self):
+        self._loop.call_soon_threadsafe(self._close_idle)
+
+    def _close_idle(self):
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle.clear()
+
+    async def _fetch(self, job, url, headers, spill_threshold, timeout, on_bytes):
+        try:
+            response = await self._request(
+                url, headers, spill_threshold, timeout, on_bytes
+            )
+        except asyncio.CancelledError:
+            return
+        except (OSError, TimeoutError, ValueError) as e:
+            job.finish(None, str(e) or type(e).__name__)
+            return
+        job.finish(response, None)
+
+    async def _request(self, url, headers, spill_threshold, timeout, on_bytes):
+        parts = urlsplit(url)
+        secure = parts.scheme == "https"
+        key = (parts.scheme, parts.hostname, parts.port or (443 if secure else 80))
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        lines = [
+            f"GET {path} HTTP/1.1",
+            f"Host: {parts.netloc}",
+            "Connection: keep-alive",
+            "Accept-Encoding: identity",
+        ]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        request = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+        # A pooled connection may have been closed by the server meanwhile;
+        # retry once on a fresh one.
+        for reused in (True, False):
+            reader, writer, was_pooled = await self._connect(
+                key, secure, timeout, reused
+            )
+            try:
+                writer.write(request)
+                await writer.drain()
+                status_line = await asyncio.wait_for(reader.readline(), timeout)
+                if not status_line and was_pooled:
+                    writer.close()
+                    continue
+                return await self._read_response(
+                    url,
+                    key,
+                    reader,
+                    writer,
+                    status_line,
+                    spill_threshold,
+                    timeout,
+                    on_bytes,
+                )
+            except BaseException:
+                writer.close()
+                raise
+        raise ConnectionError("connection closed before a response arrived")
+
+    async def _connect(self, key, secure, timeout, allow_pooled):
+        idle = self._idle.get(key)
+        if allow_pooled and idle:
+            reader, writer = idle.pop()
+            return reader, writer, True
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(key[1], key[2], ssl=self._ssl if secure else None),
+            timeout,
+        )
+        return reader, writer, False
+
+    async def _read_response(
+        self, url, key, reader, writer, status_line, spill_threshold, timeout, on_bytes
+    ):
+        version, status = status_line.decode("latin-1").split(" ", 2)[:2]
+        status = int(status)
+        headers = {}
+        while True:
+            line = await asyncio.wait_for(reader.readline(), timeout)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = headers.get("content-length")
+        length = int(length) if length is not None else None
+        sink = BodySink(spill_threshold, length)
+        reusable = version == "HTTP/1.1" and headers.get("connection") != "close"
+        try:
+            if status in (204, 304) or 100 <= status < 200:
+                pass
+            elif headers.get("transfer-encoding", "").lower() == "chunked":
+                while True:
+                    size = int(
+                        (await asyncio.wait_for(reader.readline(), timeout)).split(
+                            b";"
+                        )[0],
+                        16,
+                    )
+                    if size == 0:
+                        await asyncio.wait_for(reader.readline(), timeout)
+                        break
+                    await self._copy(reader, size, sink, timeout, on_bytes)
+                    await asyncio.wait_for(reader.readline(), timeout)
+            elif length is not None:
+                await self._copy(reader, length, sink, timeout, on_bytes)
+            else:
+                # No length: the body runs until the server closes.
+                reusable = False
+                while chunk := await asyncio.wait_for(reader.read(CHUNK_SIZE), timeout):
+                    on_bytes(len(chunk))
+                    sink.write(chunk)
+        except BaseException:
+            sink.close()
+            raise
+
+        if reusable:
+            self._idle.setdefault(key, []).append((reader, writer))
+        else:
+            writer.close()
+        return DownloadResponse(url, status, headers, sink.finish())
+
+    async def _copy(self, reader, size, sink, timeout, on_bytes):
+        while size:
+            chunk = await asyncio.wait_for(reader.read(min(size, CHUNK_SIZE)), timeout)
+            if not chunk:
+                raise ConnectionError("connection closed mid-body")
+            size -= len(chunk)
+            on_bytes(len(chunk))
+            sink.write(chunk)
@@ -0,0 +1,187 @@
+# card_builder.py
+import gc
+import time
+from collections import deque
+
+from PySide6.QtCore import QObject, QTimer, Signal
+from PySide6.QtWidgets import QVBoxLayout, QWidget
+
+
+class IncrementalCardBuilder(QObject):
+    """
+    Creates cards in time-boxed slices on the GUI thread.
+
+    Each slice calls `create_card(index, item)` while the next card is
+    expected to finish within `frame_budget` seconds, and for at most
+    `max_cards_per_slice` cards, then yields to the event loop so painting,
+    input and the page animation keep running. A card is expected to cost
+    the larger of the running average and the card just built, so one slow
+    card (a new block, a first polish) ends the slice early instead of
+    several following it. The collection after a slice is budgeted as well.
+    `longest_slice` records the worst slice seen, which together with the
+    paint that follows has to stay under one frame (16 ms at 60 fps).
+
+    While building, automatic garbage collection is paused and only the young
+    generations are collected after each slice. A full collection over
+    thousands of new wrapper objects would otherwise land inside a slice and
+    blow the budget several times over.
+
+    Cards are grouped into fixed-height blocks of `block_size` inside `layout`.
+    A QVBoxLayout re-lays out every item whenever one is appended, which
+    makes each event loop pass O(n); with fixed-height blocks only the block
+    being filled is laid out again.
+
+    With `reuse_card(card, index, item)`, `clear` hides the cards instead of
+    deleting them, and later items are bound to those cards in order before
+    any new card is created. Cards and blocks stay where they are in the
+    layout, so refilling allocates no widgets and lays out nothing new.
+    """
+
+    finished = Signal()
+
+    def __init__(
+        self,
+        layout,
+        create_card,
+        frame_budget=0.004,
+        block_size=50,
+        max_cards_per_slice=16,
+        reuse_card=None,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self._layout = layout
+        self._create_card = create_card
+        self._reuse_card = reuse_card
+        self.frame_budget = frame_budget
+        self.block_size = block_size
+        self.max_cards_per_slice = max_cards_per_slice
+        # The cards showing items, in order.
+        self.cards = []
+        # --- NEW: Every card ever placed, in layout order; `cards` is a prefix ---
+        self._pool = []
+        self._blocks = []
+        self._pending = deque()
+        self._block = None
+        # A zero-interval timer fires once per event loop pass.
+        self._timer = QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._build_slice)
+        self.longest_slice = 0.0
+        self.slices = 0
+        # Running average of the time one card takes, in seconds.
+        self._card_cost = 0.0
+        # Running average of the young-generation collection after a slice.
+        self._gc_cost = 0.0
+        self._paused_gc = False
+
+    def add(self, items):
+        """Queues items; they get consecutive indexes after earlier ones."""
+        self._pending.extend(items)
+        if self._pending and not self._timer.isActive():
+            if gc.isenabled():
+                gc.disable()
+                self._paused_gc = True
+            self._timer.start()
+
+    def clear(self):
+        """
+        Drops everything not built yet and deletes the built cards, or hides
+        them for reuse when the builder has a `reuse_card`.
+        """
+        self._stop()
+        self._pending.clear()
+        if self._reuse_card is not None:
+            # Hidden blocks first, so hiding their cards costs next to nothing.
+            for block in self._blocks:
+                block.hide()
+            for card in self.cards:
+                card.hide()
+            self.cards = []
+            return
+        self.cards = []
+        self._block = None
+        while self._layout.count():
+            child = self._layout.takeAt(0)
+            if child.widget():
+                child.widget().deleteLater()
+
+    def is_running(self):
+        return self._timer.isActive()
+
+    def build_now(self):
+        """
+        Builds the next slice right away rather than on the next event loop
+        pass, for a caller about to capture the cards, such as a snapshot
+        page transition.
+        """
+        if self._timer.isActive():
+            self._build_slice()
+
+    def _build_slice(self):
+        start = now = time.perf_counter()
+        deadline = start + self.frame_budget - self._gc_cost
+        built = 0
+        last_cost = 0.0
+        # Always build at least one card so progress is guaranteed; after
+        # that, stop before a card that would likely run past the deadline.
+        while self._pending and (
+            built == 0
+            or built < self.max_cards_per_slice
+            and now + max(self._card_cost, last_cost) <= deadline
+        ):
+            index = len(self.cards)
+            if index < len(self._pool):
+                card = self._pool[index]
+                self._reuse_card(card, index, self._pending.popleft())
+                self._show_again(card)
+            else:
+                card = self._create_card(index, self._pending.popleft())
+                self._place(card)
+            previous, now = now, time.perf_counter()
+            last_cost = now - previous
+            self._card_cost += (last_cost - self._card_cost) / 8
+            built += 1
+        if self._pending and self._paused_gc:
+            gc.collect(1)
+            previous, now = now, time.perf_counter()
+            self._gc_cost += (now - previous - self._gc_cost) / 8
+        self.slices += 1
+        self.longest_slice = max(self.longest_slice, now - start)
+        if not self._pending:
+            self._stop()
+            self.finished.emit()
+
+    def _stop(self):
+        self._timer.stop()
+        if self._paused_gc:
+            gc.enable()
+            self._paused_gc = False
+
+    def _place(self, card):
+        if self._block is None or self._block.layout().count() >= self.block_size:
+            self._block = QWidget()
+            block_layout = QVBoxLayout(self._block)
+            block_layout.setContentsMargins(0, 0, 0, 0)
+            block_layout.setSpacing(self._layout.spacing())
+            self._layout.addWidget(self._block)
+            self._blocks.append(self._block)
+            if self._layout.parentWidget().isVisible():
+                self._block.show()
+        self._block.layout().addWidget(card)
+        self._block.setFixedHeight(self._block.layout().sizeHint().height())
+        # A layout shows new children on the next event loop pass; showing
+        # (and polishing) now keeps that cost inside this slice's budget.
+        if self._block.isVisible():
+            card.show()
+        self.cards.append(card)
+        if self._reuse_card is not None:
+            self._pool.append(card)
+
+    def _show_again(self, card):
+        block = card.parentWidget()
+        # Both were hidden explicitly, so the layout will not show them.
+        block.show()
+        card.show()
+        block.setFixedHeight(block.layout().sizeHint().height())
+        self.cards.append(card)
@@ -0,0 +1,178 @@
+# card_selection.py
+from PySide6.QtCore import QEvent, QObject, Qt, Signal
+
+_CTRL = Qt.KeyboardModifier.ControlModifier
+_SHIFT = Qt.KeyboardModifier.ShiftModifier
+
+
+class CardSelection(QObject):
+    """
+    Mouse and keyboard selection over the cards of an IncrementalCardBuilder.
+
+    A click selects one card, Ctrl+click toggles one and Shift+click selects
+    the range from the last plain click. With focus on the scroll area, the
+    arrow, Page and Home/End keys move the current card (Shift extends the
+    selection, Ctrl only moves), Space selects it, Ctrl+A selects everything
+    and Return activates it.
+
+    Only cards whose state changes are touched, each once per click, so a
+    plain click costs the same however many cards there are. Cards are
+    addressed by `card.index`.
+    """
+
+    changed = Signal()
+    # Carries the current card's item_data when Return is pressed.
+    activated = Signal(object)
+
+    def __init__(self, builder, scroll_area, parent=None):
+        super().__init__(parent)
+        self.builder = builder
+        self.scroll_area = scroll_area
+        # Indexes of the selected cards.
+        self.selected = set()
+        self.current = None
+        self._anchor = None
+        # index -> {"selected": ..., "current": ...} still to be shown
+        self._changes = {}
+        scroll_area.installEventFilter(self)
+
+    def selected_items(self):
+        cards = self.builder.cards
+        return [cards[index].item_data for index in sorted(self.selected)]
+
+    def selected_item(self):
+        """The current card's item if it is selected, else any selected item."""
+        if self.current in self.selected:
+            return self.current_item()
+        if self.selected:
+            return self.builder.cards[next(iter(self.selected))].item_data
+        return None
+
+    def current_item(self):
+        if self.current is None:
+            return None
+        return self.builder.cards[self.current].item_data
+
+    def click(self, card, modifiers=Qt.KeyboardModifier.NoModifier):
+        index = card.index
+        if modifiers & _SHIFT and self._anchor is not None:
+            self._select_range(self._anchor, index, keep=bool(modifiers & _CTRL))
+        elif modifiers & _CTRL:
+            self._set_selected(index, index not in self.selected)
+            self._anchor = index
+        else:
+            self._select_only(index)
+            self._anchor = index
+        self._set_current(index)
+        self._apply()
+
+    def clear(self):
+        """Unselects every card; call it before the cards are cleared."""
+        self._select_none()
+        self._set_current(None)
+        self._anchor = None
+        self._apply()
+
+    def restore(self, card):
+        """Shows this selection's state again on a card that was rebound."""
+        card.set_state(
+            selected=card.index in self.selected, current=card.index == self.current
+        )
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Type.KeyPress:
+            return self._on_key(event.key(), event.modifiers())
+        return False
+
+    def _on_key(self, key, modifiers):
+        count = len(self.builder.cards)
+        if not count:
+            return False
+        current = self.current if self.current is not None else -1
+        if key == Qt.Key.Key_A and modifiers & _CTRL:
+            self._select_range(0, count - 1, keep=False)
+            self._apply()
+            return True
+        if key in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
+            if self.current is not None:
+                self.activated.emit(self.current_item())
+            return True
+        if key == Qt.Key.Key_Space and self.current is not None:
+            self.click(self.builder.cards[self.current], modifiers & _CTRL)
+            return True
+
+        page = max(1, self.scroll_area.viewport().height() // self._card_height())
+        steps = {
+            Qt.Key.Key_Up: -1,
+            Qt.Key.Key_Down: 1,
+            Qt.Key.Key_PageUp: -page,
+            Qt.Key.Key_PageDown: page,
+            Qt.Key.Key_Home: -count,
+            Qt.Key.Key_End: count,
+        }
+        if key not in steps:
+            return False
+        target = min(max(current + steps[key], 0), count - 1)
+        if modifiers & _SHIFT:
+            if self._anchor is None:
+                self._anchor = max(current, 0)
+            self._select_range(self._anchor, target, keep=False)
+        elif not modifiers & _CTRL:
+            self._select_only(target)
+            self._anchor = target
+        self._set_current(target)
+        self._apply()
+        self.scroll_area.ensureWidgetVisible(self.builder.cards[target], 0, 0)
+        return True
+
+    def _card_height(self):
+        return max(self.builder.cards[0].height(), 1)
+
+    def _change(self, index, name, value):
+        self._changes.setdefault(index, {})[name] = value
+
+    def _set_selected(self, index, selected):
+        self._change(index, "selected", selected)
+        if selected:
+            self.selected.add(index)
+        else:
+            self.selected.discard(index)
+
+    def _select_none(self):
+        for index in self.selected:
+            self._change(index, "selected", False)
+        self.selected.clear()
+
+    def _select_only(self, index):
+        if len(self.selected) == 1 and index in self.selected:
+            return
+        self._select_none()
+        self._set_selected(index, True)
+
+    def _select_range(self, first, last, keep):
+        if first > last:
+            first, last = last, first
+        wanted = set(range(first, last + 1))
+        if not keep:
+            for index in self.selected - wanted:
+                self._set_selected(index, False)
+        for index in wanted - self.selected:
+            self._set_selected(index, True)
+
+    def _set_current(self, index):
+        if index == self.current:
+            return
+        if self.current is not None:
+            self._change(self.current, "current", False)
+        if index is not None:
+            self._change(index, "current", True)
+        self.current = index
+
+    def _apply(self):
+        """Shows the recorded changes, one re-polish per card at most."""
+        cards = self.builder.cards
+        for index, state in self._changes.items():
+            if index < len(cards):
+                cards[index].set_state(**state)
+        self._changes.clear()
+        self.changed.emit()
@@ -1,12 +1,62 @@
 # card_widget.py
-from PySide6.QtCore import Qt, QUrl, Signal, Slot
-from PySide6.QtGui import QMouseEvent, QPixmap
-from PySide6.QtNetwork import QNetworkAccessManager, QNetworkRequest
+import os
+
+from download_engine import DOWNLOAD_ENGINE
+from instrumentation import INSTRUMENTATION
+from PySide6.QtCore import Qt, Signal
+from PySide6.QtGui import QMouseEvent
 from PySide6.QtWidgets import QFrame, QHBoxLayout, QLabel, QVBoxLayout
+from request_registry import RequestRegistry
+from thumbnail_cache import THUMBNAIL_CACHE
+from thumbnail_loader import THUMBNAIL_SIZE, ThumbnailLoader
+from thumbnail_source import LocalThumbnailRenderer
+
+# --- NEW: `{id}` is replaced by the item id; benchmarks point this at a stub ---
+THUMBNAIL_URL_TEMPLATE = os.environ.get(
+    "BBW_THUMBNAIL_URL", "https://placehold.co/128x96/222/FFF.png?text=Item+{id}"
+)
+
+# --- NEW: Thumbnails come from a pluggable source; the network by default,
+# or painted locally with BBW_THUMBNAIL_SOURCE=local ---
+if os.environ.get("BBW_THUMBNAIL_SOURCE") == "local":
+    THUMBNAIL_SOURCE = LocalThumbnailRenderer(THUMBNAIL_CACHE, THUMBNAIL_SIZE)
+else:
+    # --- CHANGE: Downloads share the app-wide engine and its connection caps ---
+    THUMBNAIL_SOURCE = ThumbnailLoader(
+        DOWNLOAD_ENGINE, THUMBNAIL_CACHE, THUMBNAIL_URL_TEMPLATE
+    )
+
+# --- NEW: Cards asking for the same thumbnail share one in-flight request ---
+# --- NEW: Jobs read the disk cache or network, then decode off the GUI thread ---
+THUMBNAIL_REQUESTS = RequestRegistry(
+    lambda url, finish: THUMBNAIL_SOURCE.fetch(url, finish)
+)
+
+
+# --- NEW: Card states are drawn by one application style sheet keyed on
+# dynamic properties, instead of a style sheet set on each card ---
+CARD_STYLE_SHEET = """
+CardWidget QLabel#thumbnail { border: 1px solid gray; }
+CardWidget[current="true"] { border: 1px dashed #0078d4; }
+CardWidget[selected="true"] { border: 2px solid #0078d4; }
+"""
+
 
-# --- NEW: Create a single, global network manager for the whole app ---
-# This is the standard, recommended practice.
-NETWORK_MANAGER = QNetworkAccessManager()
+def install_card_style_sheet(app):
+    """Adds the card rules to the application's style sheet, once."""
+    if CARD_STYLE_SHEET not in app.styleSheet():
+        app.setStyleSheet(app.styleSheet() + CARD_STYLE_SHEET)
+
+
+def set_thumbnail_source(source):
+    """Sends new thumbnail requests to `source`; running ones finish as they are."""
+    global THUMBNAIL_SOURCE
+    THUMBNAIL_SOURCE = source
+
+
+def thumbnail_url(item_id):
+    """Returns the thumbnail URL (cache key) for an item id."""
+    return THUMBNAIL_SOURCE.url_for(item_id)
 
 
 class CardWidget(QFrame):
@@ -15,24 +65,31 @@ class CardWidget(QFrame):
     """
 
     selected = Signal(object)
-    chosen = Signal(dict)
+    # --- CHANGE: item_data is a ResultRow, so it is passed as an object ---
+    chosen = Signal(object)
 
     def __init__(self, item_data, parent=None):
         super().__init__(parent)
-        self.item_data = item_data
-        # --- NEW: This will hold our network reply object ---
-        self.network_reply = None
+        self.item_data = None
+        # --- NEW: The card's position in its list; set by whoever places it ---
+        self.index = -1
+        # --- NEW: This will hold our subscription to a shared request ---
+        self.thumbnail_request = None
+        # --- NEW: Higher values are downloaded first; set from the viewport ---
+        self.download_priority = 0
+        self.thumbnail_url = None
+        self.thumbnail_loaded = False
 
         # --- UI Setup (no changes here) ---
         self.setFrameStyle(QFrame.Shape.StyledPanel | QFrame.Shadow.Raised)
         self.setMinimumHeight(150)
         self.setMaximumHeight(150)
         main_layout = QVBoxLayout(self)
-        self.thumbnail_label = QLabel("Loading...")
+        self.thumbnail_label = QLabel()
+        self.thumbnail_label.setObjectName("thumbnail")
         self.thumbnail_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.thumbnail_label.setFixedSize(128, 96)
-        self.thumbnail_label.setStyleSheet("border: 1px solid gray;")
-        self.name_label = QLabel(self.item_data.get("name", "No Name"))
+        self.thumbnail_label.setFixedSize(THUMBNAIL_SIZE)
+        self.name_label = QLabel()
         self.name_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         thumb_container_layout = QHBoxLayout()
         thumb_container_layout.addStretch()
@@ -42,12 +99,51 @@ class CardWidget(QFrame):
         main_layout.addLayout(thumb_container_layout)
         main_layout.addWidget(self.name_label)
         main_layout.addStretch()
+        self.bind(item_data)
 
+    # --- NEW: Recycled cards are rebound instead of rebuilt ---
+    def bind(self, item_data):
+        """Shows `item_data`, resetting everything left from a previous item."""
+        self.cancel_download()
+        self.item_data = item_data
+        self.download_priority = 0
+        self.thumbnail_url = None
+        self.thumbnail_loaded = False
+        # setText also drops a previous pixmap.
+        self.thumbnail_label.setText("Loading...")
+        self.name_label.setText(item_data.get("name", "No Name"))
+        self.set_selected(False)
+        self.set_current(False)
+
+    # --- CHANGE: Selection is a dynamic property; only this card is re-polished ---
     def select_card(self):
-        self.setStyleSheet("QFrame { border: 2px solid #0078d4; }")
+        self.set_selected(True)
 
     def unselect_card(self):
-        self.setStyleSheet("")
+        self.set_selected(False)
+
+    def set_selected(self, selected):
+        self.set_state(selected=selected)
+
+    def set_current(self, current):
+        """Marks the card keyboard navigation is on."""
+        self.set_state(current=current)
+
+    def set_state(self, selected=None, current=None):
+        """Sets either state, or both with a single re-polish."""
+        changed = False
+        for name, value in (("selected", selected), ("current", current)):
+            if value is not None and bool(self.property(name)) != value:
+                self.setProperty(name, value)
+                changed = True
+        if not changed:
+            return
+        # The rules only match the card itself, so its children keep their
+        # polish; a style sheet per card re-polished the whole subtree.
+        style = self.style()
+        style.unpolish(self)
+        style.polish(self)
+        self.update()
 
     def mousePressEvent(self, event: QMouseEvent):
         self.selected.emit(self)
@@ -59,52 +155,62 @@ class CardWidget(QFrame):
 
     def showEvent(self, event):
         super().showEvent(event)
-        # --- CHANGE: Check for network_reply instead of download_runner ---
-        if not self.network_reply:
+        # --- CHANGE: Check for thumbnail_request instead of download_runner ---
+        if not self.thumbnail_request and not self.thumbnail_loaded:
             self.start_download()
 
     def start_download(self):
-        """Creates and executes a network request."""
+        """Shows a cached thumbnail, or creates and executes a network request."""
         item_id = self.item_data.get("id", 0)
-        url = QUrl(f"https://placehold.co/128x96/222/FFF.png?text=Item+{item_id}")
-        request = QNetworkRequest(url)
-
-        # --- NEW: Use the global network manager to get the URL ---
-        self.network_reply = NETWORK_MANAGER.get(request)
-        # --- NEW: Connect the finished signal to our new slot ---
-        self.network_reply.finished.connect(self.on_network_reply_finished)
-
-    @Slot()
-    def on_network_reply_finished(self):
-        """Slot to handle the completed network request."""
-        # --- NEW: Read data directly from the reply object ---
-        image_data = self.network_reply.readAll()
-
-        # Check for errors
-        if self.network_reply.error() != self.network_reply.NetworkError.NoError:
-            print(f"Network Error: {self.network_reply.errorString()}")
-            self.thumbnail_label.setText("Error")
-        else:
-            pixmap = QPixmap()
-            pixmap.loadFromData(image_data)
-
-            if not pixmap.isNull():
-                scaled_pixmap = pixmap.scaled(
-                    self.thumbnail_label.size(),
-                    Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation,
-                )
-                self.thumbnail_label.clear()
-                self.thumbnail_label.setPixmap(scaled_pixmap)
-                self.thumbnail_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-
-        # Clean up the reply object
-        self.network_reply.deleteLater()
-        self.network_reply = None
+        self.thumbnail_url = thumbnail_url(item_id)
+
+        # --- NEW: Serve from the thumbnail cache when we can ---
+        pixmap, is_fresh = THUMBNAIL_CACHE.lookup(self.thumbnail_url, load=True)
+        if pixmap is not None:
+            self.set_thumbnail(pixmap)
+            if is_fresh:
+                return
+
+        # A stale entry turns this into a conditional (revalidation) request.
+        # --- NEW: Subscribe through the registry so duplicates are coalesced ---
+        self.thumbnail_request = THUMBNAIL_REQUESTS.subscribe(
+            self.thumbnail_url,
+            self.on_thumbnail_request_finished,
+            self.download_priority,
+        )
+
+    def set_download_priority(self, priority):
+        """Re-ranks this card's queued thumbnail request."""
+        self.download_priority = priority
+        if self.thumbnail_request:
+            THUMBNAIL_REQUESTS.set_priority(self.thumbnail_request, priority)
+
+    @INSTRUMENTATION.timed
+    def on_thumbnail_request_finished(self, pixmap, error):
+        """Handles the shared request's result for this card."""
+        self.thumbnail_request = None
+        if error is not None:
+            print(f"Network Error: {error}")
+            if not self.thumbnail_loaded:
+                self.thumbnail_label.setText("Error")
+        elif pixmap is not None:
+            self.set_thumbnail(pixmap)
+
+    def cancel_download(self):
+        """Drops this card's interest in its thumbnail request, if any."""
+        if self.thumbnail_request:
+            THUMBNAIL_REQUESTS.cancel(self.thumbnail_request)
+            self.thumbnail_request = None
+
+    def set_thumbnail(self, pixmap):
+        """Shows a pixmap that was already decoded at the label's size."""
+        self.thumbnail_label.clear()
+        self.thumbnail_label.setPixmap(pixmap)
+        self.thumbnail_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.thumbnail_loaded = True
 
     def closeEvent(self, event):
         """Ensure any running download is aborted when the widget is closed."""
-        # --- NEW: Abort the network reply if it's running ---
-        if self.network_reply and self.network_reply.isRunning():
-            self.network_reply.abort()
+        # --- NEW: The shared reply is aborted once no card is waiting for it ---
+        self.cancel_download()
         super().closeEvent(event)
@@ -0,0 +1,124 @@
+# disk_tier.py
+import hashlib
+import os
+import threading
+
+from PySide6.QtCore import QStandardPaths
+
+
+class DiskTier:
+    """
+    The disk half of a two-tier cache: a size-bounded directory of entries.
+
+    An entry is one file per suffix in `suffixes`, all named by the entry's
+    key. Only the first, the data file, counts towards `limit`, and its
+    mtime orders entries for least recently used eviction; `touch` marks an
+    entry as used. The index of data file sizes is built from the directory
+    on first use, so it also covers entries written by an earlier run.
+
+    Files may vanish underneath the index (another instance, a manual
+    cleanup); they are dropped from the index when found missing. Methods
+    may be called from any thread.
+    """
+
+    def __init__(self, name, limit, suffixes, directory=None):
+        # Subdirectory of the cache location, used without a `directory`.
+        self.name = name
+        self.limit = limit
+        self.suffixes = suffixes
+        self._directory = directory
+        # key -> data file size; built lazily on first use.
+        self._index = None
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def directory(self):
+        # Resolved lazily so QStandardPaths sees the application name.
+        if self._directory is None:
+            base = QStandardPaths.writableLocation(
+                QStandardPaths.StandardLocation.CacheLocation
+            )
+            self._directory = os.path.join(base, self.name)
+        os.makedirs(self._directory, exist_ok=True)
+        return self._directory
+
+    def key(self, text):
+        """The file name stem for the entry stored under `text`."""
+        return hashlib.sha1(text.encode()).hexdigest()
+
+    def path(self, key, suffix=None):
+        return os.path.join(self.directory, key + (suffix or self.suffixes[0]))
+
+    def touch(self, key):
+        """Marks an entry as recently used for LRU eviction."""
+        try:
+            os.utime(self.path(key))
+        except OSError:
+            pass
+
+    def added(self, key, size, keep=False):
+        """
+        Records that the entry `key` now holds `size` bytes of data, then
+        evicts least recently used entries until the tier fits its limit.
+        With `keep`, `key` itself is never evicted. Returns the number of
+        entries evicted.
+        """
+        with self._lock:
+            if self._index is None:
+                self._load_index()
+            self._bytes += size - self._index.get(key, 0)
+            self._index[key] = size
+            return self._evict(key if keep else None)
+
+    def remove(self, key):
+        """Deletes the entry `key`, if there is one."""
+        with self._lock:
+            if self._index is not None:
+                self._bytes -= self._index.pop(key, 0)
+        self._remove_files(key)
+
+    def _load_index(self):
+        # Called with the lock held.
+        self._index = {}
+        self._bytes = 0
+        data_suffix = self.suffixes[0]
+        for name in os.listdir(self.directory):
+            if name.endswith(data_suffix):
+                try:
+                    size = os.path.getsize(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                self._index[name[: -len(data_suffix)]] = size
+                self._bytes += size
+
+    def _evict(self, keep):
+        # Called with the lock held.
+        if self._bytes <= self.limit:
+            return 0
+        entries = sorted(
+            (_mtime(self.path(key)), key) for key in self._index if key != keep
+        )
+        evicted = 0
+        for _, key in entries:
+            if self._bytes <= self.limit:
+                break
+            self._remove_files(key)
+            self._bytes -= self._index.pop(key)
+            evicted += 1
+        return evicted
+
+    def _remove_files(self, key):
+        for suffix in self.suffixes:
+            try:
+                os.remove(self.path(key, suffix))
+            except OSError:
+                pass
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        # Already gone; evicting it only fixes the byte count.
+        return 0.0
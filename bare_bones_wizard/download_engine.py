@@ -0,0 +1,317 @@
+# download_engine.py
+import mmap
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+from PySide6.QtCore import QObject
+
+# Bodies above this size are spilled to disk and mmap'ed.
+SPILL_THRESHOLD = 8 * 1024 * 1024  # bytes
+CHUNK_SIZE = 64 * 1024
+# Bandwidth is averaged over this window.
+BANDWIDTH_WINDOW = 2.0  # seconds
+
+
+class DownloadResponse:
+    """A finished HTTP response, whatever backend fetched it."""
+
+    __slots__ = ("body", "headers", "status", "url")
+
+    def __init__(self, url, status, headers, body):
+        self.url = url
+        self.status = status
+        # Names are lower-cased so lookups are case-insensitive.
+        self.headers = {name.lower(): value for name, value in headers.items()}
+        # A bytearray, or a read-only mmap for spilled bodies.
+        self.body = body
+
+    def header(self, name):
+        return self.headers.get(name.lower())
+
+
+def _spill_file():
+    # Returned rather than used in a with block: the BodySink owns it and
+    # closes it in finish() or close().
+    return tempfile.TemporaryFile()
+
+
+class BodySink:
+    """
+    Collects a response body without repeated copies.
+
+    Bodies up to `spill_threshold` bytes are written into one bytearray,
+    preallocated from Content-Length when it is known. Larger ones are
+    spilled to an anonymous temporary file and handed over as a read-only
+    mmap, so they are never read back into memory.
+    """
+
+    def __init__(self, spill_threshold=SPILL_THRESHOLD, length=None):
+        self.spill_threshold = spill_threshold
+        self._file = None
+        self._buffer = None
+        self._filled = 0
+        if length is not None and length > spill_threshold:
+            self._file = _spill_file()
+        else:
+            # Grow only if the server lied or did not send a length.
+            self._buffer = bytearray(length or 0)
+
+    def write(self, chunk):
+        if self._file is not None:
+            self._file.write(chunk)
+            return
+        end = self._filled + len(chunk)
+        if end <= len(self._buffer):
+            self._buffer[self._filled : end] = chunk
+        else:
+            del self._buffer[self._filled :]
+            self._buffer += chunk
+            if end > self.spill_threshold:
+                self._file = _spill_file()
+                self._file.write(self._buffer)
+                self._buffer = None
+                return
+        self._filled = end
+
+    def finish(self):
+        """Returns the body as a bytearray or a read-only mmap."""
+        if self._file is None:
+            # Shrinking in place does not copy the remaining bytes.
+            del self._buffer[self._filled :]
+            return self._buffer
+        # TemporaryFile has no name on POSIX and is deleted on close on
+        # Windows, so nothing is left behind once the mapping is released.
+        with self._file as f:
+            f.flush()
+            if f.tell() == 0:
+                return bytearray()
+            # The mapping keeps its own handle and outlives the file object.
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        """Discards a partial body."""
+        if self._file is not None:
+            self._file.close()
+        self._buffer = None
+
+
+class DownloadBackend:
+    """
+    Performs single HTTP GETs for a DownloadEngine.
+
+    `start(url, headers, spill_threshold, timeout, on_bytes, done)` returns
+    a job with `abort()`. The backend calls `on_bytes(count)` from any
+    thread as data arrives, and `done(response, error)` exactly once on the
+    GUI thread unless the job was aborted first. `error` is a string for
+    transport failures; HTTP error statuses come back as responses.
+    """
+
+    def start(self, url, headers, spill_threshold, timeout, on_bytes, done):
+        raise NotImplementedError
+
+    def shutdown(self):
+        pass
+
+
+class _Transfer:
+    """A request waiting for, or holding, one of the engine's slots."""
+
+    def __init__(self, engine, url, headers, finish, spill_threshold):
+        self.engine = engine
+        self.url = url
+        self.host = urlsplit(url).netloc
+        self.headers = headers or {}
+        self.finish = finish
+        self.spill_threshold = spill_threshold
+        self.job = None
+        self.is_done = False
+
+    def abort(self):
+        """Stops the transfer; `finish` will not be called."""
+        self.engine._abort(self)
+
+
+class DownloadEngine(QObject):
+    """
+    The one place the app downloads from, whichever backend does the work.
+
+    Every caller shares the same limits: at most `per_host_limit` transfers
+    per host and `max_concurrent` overall. Transfers beyond that wait in a
+    queue per host, and the queues are served round-robin so a busy host
+    cannot starve another. Bytes received by every backend are counted
+    together, so `bandwidth()` reports the app's total download rate.
+
+    `get(url, finish)` calls `finish(response, error)` on the GUI thread.
+    A status of 400 or above is reported as an error.
+
+    `backend` may also be a backend name for `make_backend`. The backend is
+    then only built, and its network stack only imported, when the first
+    transfer starts, which is after QApplication exists.
+    """
+
+    def __init__(
+        self, backend, per_host_limit=6, max_concurrent=16, timeout=10.0, parent=None
+    ):
+        super().__init__(parent)
+        self._backend = backend
+        self.per_host_limit = per_host_limit
+        self.max_concurrent = max_concurrent
+        self.timeout = timeout
+        # host -> deque of waiting transfers
+        self._waiting = {}
+        # host -> number of running transfers
+        self._active = {}
+        self._running = 0
+        self._started = set()
+        self._lock = threading.Lock()
+        self._samples = deque()
+        self.stats = {"requests": 0, "bytes": 0, "aborted": 0, "failed": 0}
+
+    def get(self, url, finish, headers=None, spill_threshold=SPILL_THRESHOLD):
+        """Queues a GET and returns a handle whose abort() cancels it."""
+        transfer = _Transfer(self, url, headers, finish, spill_threshold)
+        self._waiting.setdefault(transfer.host, deque()).append(transfer)
+        self._dispatch()
+        return transfer
+
+    @property
+    def backend(self):
+        if isinstance(self._backend, str):
+            self._backend = make_backend(self._backend)
+        return self._backend
+
+    def prepare(self):
+        """Builds a backend given by name now instead of on the first transfer."""
+        return self.backend
+
+    def set_backend(self, backend):
+        """Sends new transfers to `backend`; running ones finish where they are."""
+        self._backend = backend
+
+    def bandwidth(self):
+        """Bytes per second received over the last BANDWIDTH_WINDOW seconds."""
+        with self._lock:
+            self._trim_samples(time.monotonic())
+            return sum(count for _, count in self._samples) / BANDWIDTH_WINDOW
+
+    def active_count(self, host=None):
+        return self._running if host is None else self._active.get(host, 0)
+
+    def shutdown(self):
+        """Aborts every transfer and releases the backend's connections."""
+        for queue in list(self._waiting.values()):
+            for transfer in list(queue):
+                transfer.abort()
+        for transfer in list(self._running_transfers()):
+            transfer.abort()
+        if not isinstance(self._backend, str):
+            # A backend that was never built has nothing to release.
+            self._backend.shutdown()
+
+    def _running_transfers(self):
+        return [t for t in self._started if not t.is_done]
+
+    def _dispatch(self):
+        """Starts waiting transfers, one host at a time, while slots are free."""
+        progressed = True
+        while progressed and self._running < self.max_concurrent:
+            progressed = False
+            for host in list(self._waiting):
+                if self._running >= self.max_concurrent:
+                    break
+                if self._active.get(host, 0) >= self.per_host_limit:
+                    continue
+                queue = self._waiting[host]
+                transfer = queue.popleft()
+                if not queue:
+                    del self._waiting[host]
+                self._start(transfer)
+                progressed = True
+
+    def _start(self, transfer):
+        self._active[transfer.host] = self._active.get(transfer.host, 0) + 1
+        self._running += 1
+        self._started.add(transfer)
+        self.stats["requests"] += 1
+        transfer.job = self.backend.start(
+            transfer.url,
+            transfer.headers,
+            transfer.spill_threshold,
+            self.timeout,
+            self._record_bytes,
+            lambda response, error: self._on_done(transfer, response, error),
+        )
+
+    def _on_done(self, transfer, response, error):
+        if transfer.is_done:
+            return
+        self._release(transfer)
+        if error is None and response.status >= 400:
+            error = f"HTTP {response.status} for {transfer.url}"
+        if error is not None:
+            self.stats["failed"] += 1
+            response = None
+        transfer.finish(response, error)
+        self._dispatch()
+
+    def _abort(self, transfer):
+        if transfer.is_done:
+            return
+        self.stats["aborted"] += 1
+        if transfer.job is None:
+            transfer.is_done = True
+            queue = self._waiting.get(transfer.host)
+            if queue is not None:
+                queue.remove(transfer)
+                if not queue:
+                    del self._waiting[transfer.host]
+            return
+        self._release(transfer)
+        transfer.job.abort()
+        self._dispatch()
+
+    def _release(self, transfer):
+        transfer.is_done = True
+        self._started.discard(transfer)
+        self._running -= 1
+        self._active[transfer.host] -= 1
+        if not self._active[transfer.host]:
+            del self._active[transfer.host]
+
+    def _record_bytes(self, count):
+        # Called from backend threads as well as the GUI thread.
+        now = time.monotonic()
+        with self._lock:
+            self.stats["bytes"] += count
+            self._samples.append((now, count))
+            self._trim_samples(now)
+
+    def _trim_samples(self, now):
+        while self._samples and self._samples[0][0] < now - BANDWIDTH_WINDOW:
+            self._samples.popleft()
+
+
+def make_backend(name):
+    """Builds a backend by name: "qt" (default), "requests" or "asyncio"."""
+    # --- CHANGE: Each backend's network stack is imported only when chosen ---
+    if name == "requests":
+        # Imported here so requests stays an optional dependency.
+        from requests_backend import RequestsBackend
+
+        return RequestsBackend()
+    if name == "asyncio":
+        from asyncio_backend import AsyncioBackend
+
+        return AsyncioBackend()
+    from qt_network_backend import QtNetworkBackend
+
+    return QtNetworkBackend()
+
+
+# --- NEW: One engine for thumbnails and file downloads alike ---
+# --- CHANGE: The backend is built on the first transfer, not at import ---
+DOWNLOAD_ENGINE = DownloadEngine(os.environ.get("BBW_DOWNLOAD_BACKEND", "qt"))
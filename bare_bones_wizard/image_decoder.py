@@ -0,0 +1,118 @@
+# image_decoder.py
+from PySide6.QtCore import (
+    QBuffer,
+    QByteArray,
+    QIODevice,
+    QRunnable,
+    QSize,
+    Qt,
+    QThread,
+    QThreadPool,
+)
+from PySide6.QtGui import QImage, QImageReader
+from task_executor import call_on_gui_thread
+
+
+class DecodeRunner(QRunnable):
+    """
+    Decodes an encoded image on a worker thread.
+
+    The source is either encoded bytes or a file path. QImageReader is asked
+    for the target size up front, so formats that support it (JPEG, for
+    example) never decode at full resolution. `callback(image)` is called
+    on the GUI thread unless the runner is aborted first.
+    """
+
+    def __init__(self, source, target_size, device_pixel_ratio=1.0, callback=None):
+        super().__init__()
+        self.source = source
+        self.target_size = target_size
+        self.device_pixel_ratio = device_pixel_ratio
+        self.callback = callback
+        self.is_aborted = False
+
+    def abort(self):
+        self.is_aborted = True
+
+    def _deliver(self, image):
+        # On the GUI thread, where abort() is called too.
+        if not self.is_aborted:
+            self.callback(image)
+
+    def run(self):
+        if self.is_aborted:
+            return
+
+        if isinstance(self.source, str):
+            reader = QImageReader(self.source)
+        else:
+            buffer = QBuffer()
+            buffer.setData(QByteArray(self.source))
+            buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+            reader = QImageReader(buffer)
+
+        # Scale in device pixels so the image is sharp on high-DPI screens.
+        target = QSize(
+            round(self.target_size.width() * self.device_pixel_ratio),
+            round(self.target_size.height() * self.device_pixel_ratio),
+        )
+        source_size = reader.size()
+        if source_size.isValid():
+            reader.setScaledSize(
+                source_size.scaled(target, Qt.AspectRatioMode.KeepAspectRatio)
+            )
+        image = reader.read()
+
+        if image.isNull() or self.is_aborted:
+            if not self.is_aborted:
+                print(f"Decode Error: {reader.errorString()}")
+                call_on_gui_thread(self._deliver, QImage())
+            return
+        if image.size() != target and not source_size.isValid():
+            # The format could not report its size up front; scale afterwards.
+            image = image.scaled(
+                target,
+                Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation,
+            )
+        image.setDevicePixelRatio(self.device_pixel_ratio)
+        call_on_gui_thread(self._deliver, image)
+
+
+DECODE_POOL = QThreadPool()
+# Decoding and cache I/O only run when the GUI thread has nothing to do, so
+# on a busy core they cannot stretch an event loop pass past a frame.
+DECODE_POOL.setThreadPriority(QThread.Priority.IdlePriority)
+
+
+def decode_image(source, target_size, device_pixel_ratio, callback):
+    """
+    Decodes `source` on DECODE_POOL and calls `callback(image)` on the GUI
+    thread with a QImage ready to show, or a null QImage on failure.
+    Returns the runner, whose abort() suppresses the callback.
+    """
+    runner = DecodeRunner(source, target_size, device_pixel_ratio, callback)
+    DECODE_POOL.start(runner)
+    return runner
+
+
+# --- NEW: Blocking work other than decoding, such as cache disk I/O ---
+class _CallRunner(QRunnable):
+    """Calls a function on a worker thread and hands back what it returns."""
+
+    def __init__(self, function, callback):
+        super().__init__()
+        self.function = function
+        self.callback = callback
+
+    def run(self):
+        function, self.function = self.function, None
+        call_on_gui_thread(self.callback, function())
+
+
+def run_on_decode_pool(function, callback):
+    """
+    Calls `function()` on DECODE_POOL and `callback(result)` with what it
+    returns on the GUI thread. `function` must not raise.
+    """
+    DECODE_POOL.start(_CallRunner(function, callback))
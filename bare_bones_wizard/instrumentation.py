@@ -0,0 +1,249 @@
+# instrumentation.py
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from PySide6.QtCore import QObject, Qt, QTimer
+from PySide6.QtWidgets import QLabel
+
+# Upper bounds (ms) of the frame interval histogram buckets; the last bucket
+# catches everything slower. 16.7 ms is one frame at 60 fps.
+FRAME_BUCKETS = (8.0, 16.7, 33.4, 50.0, 100.0)
+# Oldest trace events are dropped past this, so a long session stays bounded.
+MAX_TRACE_EVENTS = 50000
+
+
+def _now_us():
+    return time.perf_counter_ns() // 1000
+
+
+class Instrumentation(QObject):
+    """
+    Opt-in timing for the GUI thread.
+
+    Records frame intervals during page transitions, event loop latency and
+    how long selected slots take. Everything is a no-op until `enable` is
+    called, so the hooks can stay in production builds. `export_json` writes
+    a summary; `export_chrome_trace` writes a file for chrome://tracing or
+    Perfetto.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.enabled = False
+        self.frame_histogram = [0] * (len(FRAME_BUCKETS) + 1)
+        self.frame_count = 0
+        self.worst_frame_ms = 0.0
+        self.loop_latency_ms = deque(maxlen=600)
+        self.slot_stats = {}
+        self._trace = deque(maxlen=MAX_TRACE_EVENTS)
+        self._lock = threading.Lock()
+        self._last_frame = None
+        self._transition_start = None
+        self._latency_timer = None
+        self._expected_tick = None
+
+    def enable(self, latency_interval_ms=100):
+        """Starts recording; latency is sampled every `latency_interval_ms`."""
+        self.enabled = True
+        self._latency_timer = QTimer(self)
+        self._latency_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._latency_timer.setInterval(latency_interval_ms)
+        self._latency_timer.timeout.connect(self._sample_latency)
+        self._expected_tick = time.perf_counter() + latency_interval_ms / 1000
+        self._latency_timer.start()
+
+    # --- Page transitions ---
+
+    def watch_transitions(self, stacked_widget):
+        """Records frame intervals while `stacked_widget` is animating."""
+        stacked_widget.transition_started.connect(self._on_transition_started)
+        stacked_widget.transition_frame.connect(self._on_transition_frame)
+        stacked_widget.transition_finished.connect(self._on_transition_finished)
+
+    def _on_transition_started(self):
+        if not self.enabled:
+            return
+        self._transition_start = _now_us()
+        self._last_frame = time.perf_counter()
+
+    def _on_transition_frame(self):
+        if not self.enabled or self._last_frame is None:
+            return
+        now = time.perf_counter()
+        interval = (now - self._last_frame) * 1000
+        self._last_frame = now
+        self.frame_count += 1
+        self.worst_frame_ms = max(self.worst_frame_ms, interval)
+        for bucket, limit in enumerate(FRAME_BUCKETS):
+            if interval <= limit:
+                break
+        else:
+            bucket = len(FRAME_BUCKETS)
+        self.frame_histogram[bucket] += 1
+
+    def _on_transition_finished(self):
+        if not self.enabled or self._transition_start is None:
+            return
+        self._add_event("transition", self._transition_start, _now_us())
+        self._transition_start = None
+        self._last_frame = None
+
+    # --- Event loop latency ---
+
+    def _sample_latency(self):
+        now = time.perf_counter()
+        # How late the timer fired is how long the loop was busy elsewhere.
+        latency = max(0.0, (now - self._expected_tick) * 1000)
+        self._expected_tick = now + self._latency_timer.interval() / 1000
+        self.loop_latency_ms.append(latency)
+        with self._lock:
+            self._trace.append(
+                {
+                    "name": "event loop latency",
+                    "ph": "C",
+                    "ts": _now_us(),
+                    "pid": os.getpid(),
+                    "args": {"ms": round(latency, 3)},
+                }
+            )
+
+    # --- Slot timings ---
+
+    def timed(self, function):
+        """Decorator recording each call's duration while enabled."""
+        name = function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return function(*args, **kwargs)
+            start = _now_us()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                end = _now_us()
+                self._record_slot(name, start, end)
+
+        return wrapper
+
+    def _record_slot(self, name, start, end):
+        duration_ms = (end - start) / 1000
+        with self._lock:
+            stats = self.slot_stats.setdefault(
+                name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+            )
+            stats["count"] += 1
+            stats["total_ms"] += duration_ms
+            stats["max_ms"] = max(stats["max_ms"], duration_ms)
+        self._add_event(name, start, end)
+
+    def _add_event(self, name, start, end):
+        with self._lock:
+            self._trace.append(
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": start,
+                    "dur": end - start,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                }
+            )
+
+    # --- Export ---
+
+    def summary(self):
+        """Returns everything recorded so far as a JSON-ready dict."""
+        labels = [f"<={limit}ms" for limit in FRAME_BUCKETS]
+        labels.append(f">{FRAME_BUCKETS[-1]}ms")
+        latency = sorted(self.loop_latency_ms)
+        with self._lock:
+            slots = {
+                name: dict(stats, mean_ms=stats["total_ms"] / stats["count"])
+                for name, stats in self.slot_stats.items()
+            }
+        return {
+            "frames": {
+                "count": self.frame_count,
+                "worst_ms": round(self.worst_frame_ms, 3),
+                "histogram": dict(zip(labels, self.frame_histogram)),
+            },
+            "event_loop_latency": {
+                "samples": len(latency),
+                "p50_ms": round(latency[len(latency) // 2], 3) if latency else 0.0,
+                "p99_ms": (
+                    round(latency[int(len(latency) * 0.99)], 3) if latency else 0.0
+                ),
+                "max_ms": round(latency[-1], 3) if latency else 0.0,
+            },
+            "slots": slots,
+        }
+
+    def export_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def export_chrome_trace(self, path):
+        with self._lock:
+            events = list(self._trace)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+class InstrumentationOverlay(QLabel):
+    """A small always-on-top readout of the live numbers."""
+
+    def __init__(self, instrumentation, parent=None):
+        super().__init__(parent)
+        self.instrumentation = instrumentation
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setStyleSheet(
+            "background: rgba(0, 0, 0, 160); color: white;"
+            " font-family: monospace; padding: 4px;"
+        )
+        self._timer = QTimer(self)
+        self._timer.setInterval(500)
+        self._timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self._timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._timer.stop()
+
+    def refresh(self):
+        summary = self.instrumentation.summary()
+        frames = summary["frames"]
+        latency = summary["event_loop_latency"]
+        # Frames slower than one 60 fps frame are the ones users notice.
+        slow = sum(
+            self.instrumentation.frame_histogram[FRAME_BUCKETS.index(16.7) + 1 :]
+        )
+        lines = [
+            f"frames {frames['count']}  slow {slow}  worst {frames['worst_ms']:.1f} ms",
+            (
+                f"loop p50 {latency['p50_ms']:.1f}  p99 {latency['p99_ms']:.1f}"
+                f"  max {latency['max_ms']:.1f} ms"
+            ),
+        ]
+        for name, stats in summary["slots"].items():
+            lines.append(
+                f"{name.split('.')[-1]} x{stats['count']}"
+                f"  mean {stats['mean_ms']:.2f}  max {stats['max_ms']:.2f} ms"
+            )
+        self.setText("\n".join(lines))
+        self.adjustSize()
+        if self.parentWidget():
+            self.move(max(0, self.parentWidget().width() - self.width() - 4), 4)
+        self.raise_()
+
+
+# One recorder for the whole app; disabled until `enable` is called.
+INSTRUMENTATION = Instrumentation()
@@ -1,11 +1,19 @@
 # main.py
+# isort: off
+# --- NEW: Imported first so the startup report times every import below ---
+from startup_report import STARTUP
+
+# isort: on
 import sys
 from enum import Enum, auto
 
 # --- Import our custom animated widget ---
 from animated_stacked_widget import AnimatedStackedWidget
-from card_widget import CardWidget
-from PySide6.QtCore import Qt, QThread, Slot
+from card_widget import CardWidget, install_card_style_sheet, set_thumbnail_source
+from download_engine import DOWNLOAD_ENGINE
+from instrumentation import INSTRUMENTATION, InstrumentationOverlay
+from PySide6.QtCore import Qt, QTimer, Slot
+from PySide6.QtGui import QKeySequence, QShortcut
 from PySide6.QtWidgets import (
     QApplication,
     QHBoxLayout,
@@ -13,10 +21,25 @@ from PySide6.QtWidgets import (
     QMainWindow,
     QPushButton,
     QScrollArea,
+    QStackedLayout,
     QVBoxLayout,
     QWidget,
 )
-from worker import Worker
+from result_cache import RESULT_CACHE
+from result_store import ResultStore
+from task_executor import TaskExecutor, shutdown_executors
+from thumbnail_cache import THUMBNAIL_CACHE
+from thumbnail_loader import THUMBNAIL_SIZE
+from thumbnail_source import LocalThumbnailRenderer
+from worker import Worker, cache_key
+
+STARTUP.mark("imports")
+
+# Result sets larger than this are shown in the virtualized ResultsView
+# instead of one CardWidget per item.
+VIRTUALIZED_RESULTS_THRESHOLD = 200
+# The final page lists at most this many chosen items by name.
+MAX_LISTED_CHOICES = 10
 
 
 class WizardStep(Enum):
@@ -27,15 +50,48 @@ class WizardStep(Enum):
 
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(
+        self,
+        use_process_pool=False,
+        instrument=False,
+        use_asyncio=False,
+        defer_pages=False,
+        use_result_cache=True,
+    ):
         super().__init__()
         self.setWindowTitle("Bare Bones Wizard")
         self.setGeometry(200, 200, 500, 600)
 
         self.results_data = None
-        self.worker_thread = None
+        # --- CHANGE: One long-lived executor instead of a QThread per run ---
+        self.task_executor = TaskExecutor(parent=self)
+        # --- NEW: Optionally compute results in worker processes ---
+        self.process_pool = None
+        if use_process_pool:
+            # --- CHANGE: multiprocessing is only imported when it is used ---
+            from process_pool import ProcessPool
+
+            self.process_pool = ProcessPool()
         self.worker = None
-        self.selected_card = None
+        self.worker_token = None
+        # --- NEW: Runs are coroutines on the QtAsyncio loop instead ---
+        self.use_asyncio = use_asyncio
+        self.run_scope = None
+        # --- NEW: Repeated runs show cached results; stale ones are refreshed ---
+        self.result_cache = RESULT_CACHE if use_result_cache else None
+        self._refreshing = False
+        self.selected_item = None
+        # --- NEW: Streaming state for the current run ---
+        self.results_virtualized = False
+        self._results_streaming = False
+        self._expected_results = 0
+        # --- NEW: Search over the finished results, built off the GUI thread ---
+        # Its own thread, so a build never holds one a wizard run needs.
+        self.index_executor = TaskExecutor(max_threads=1, parent=self)
+        self.search_index = None
+        self.index_builder = None
+        self.index_token = None
+        self.search_active = False
 
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -48,41 +104,117 @@ class MainWindow(QMainWindow):
         nav_layout = QHBoxLayout()
         self.back_button = QPushButton("Back")
         self.next_button = QPushButton("Next")
+        # --- NEW: Progress of a run that is still streaming results ---
+        self.status_label = QLabel()
+        self.status_label.hide()
+        nav_layout.addWidget(self.status_label)
         nav_layout.addStretch()
         nav_layout.addWidget(self.back_button)
         nav_layout.addWidget(self.next_button)
         main_layout.addLayout(nav_layout)
 
-        self._create_pages()
+        # --- NEW: With defer_pages, only WELCOME is built before the first
+        # paint; the other pages are built on the first navigation ---
+        self.pages_built = False
+        self._create_welcome_page()
+        if not defer_pages:
+            self.ensure_pages()
 
         self.next_button.clicked.connect(self.go_to_next_step)
         self.back_button.clicked.connect(self.go_to_previous_step)
         self.wizard.currentChanged.connect(self.update_ui_for_step)
 
+        # --- NEW: Opt-in frame, latency and slot timing; F12 shows the numbers ---
+        self.instrumentation_overlay = None
+        if instrument:
+            INSTRUMENTATION.enable()
+            INSTRUMENTATION.watch_transitions(self.wizard)
+            self.instrumentation_overlay = InstrumentationOverlay(
+                INSTRUMENTATION, central_widget
+            )
+            self.instrumentation_overlay.hide()
+            QShortcut(QKeySequence(Qt.Key.Key_F12), self).activated.connect(
+                lambda: self.instrumentation_overlay.setVisible(
+                    not self.instrumentation_overlay.isVisible()
+                )
+            )
+
         self.current_step_index = 0
         self.steps = list(WizardStep)
         # Set the initial page without animation
         self.wizard.setCurrentIndex(self.current_step_index)
 
-    def _create_pages(self):
+    def _create_welcome_page(self):
         welcome_page = QLabel("Welcome! Click Next to begin a simulated process.")
         welcome_page.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.wizard.addWidget(welcome_page)
 
+    def ensure_pages(self):
+        """Builds the pages after WELCOME, once."""
+        if self.pages_built:
+            return
+        self.pages_built = True
+        # --- CHANGE: Imported with the pages, not before the first paint ---
+        from card_builder import IncrementalCardBuilder
+        from card_selection import CardSelection
+        from results_view import ResultsView
+        from search_bar import SearchBar
+
+        # Load the network stack with the pages that download, rather than
+        # in the middle of the first card slice.
+        DOWNLOAD_ENGINE.prepare()
+
         processing_page = QLabel("Simulating work... Please wait.")
         processing_page.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.wizard.addWidget(processing_page)
 
         self.results_page = QWidget()
-        results_layout = QVBoxLayout(self.results_page)
-        results_layout.setContentsMargins(0, 0, 0, 0)
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        results_layout.addWidget(scroll_area)
+        results_page_layout = QVBoxLayout(self.results_page)
+        results_page_layout.setContentsMargins(0, 0, 0, 0)
+        # --- NEW: Search and sort controls above the results ---
+        self.search_bar = SearchBar()
+        self.search_bar.changed.connect(self.on_search_changed)
+        results_page_layout.addWidget(self.search_bar)
+        results_stack = QWidget()
+        results_page_layout.addWidget(results_stack)
+        # --- NEW: The page holds both the card list and the virtualized view ---
+        self.results_layout = QStackedLayout(results_stack)
+        self.results_layout.setContentsMargins(0, 0, 0, 0)
+        self.scroll_area = QScrollArea()
+        self.scroll_area.setWidgetResizable(True)
+        self.results_layout.addWidget(self.scroll_area)
         self.card_container = QWidget()
         self.card_layout = QVBoxLayout(self.card_container)
         self.card_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-        scroll_area.setWidget(self.card_container)
+        self.scroll_area.setWidget(self.card_container)
+        # --- NEW: Cards are built in per-frame slices, not in one loop ---
+        # --- CHANGE: Cleared cards are kept and rebound to the next items ---
+        self.card_builder = IncrementalCardBuilder(
+            self.card_layout,
+            self._create_card,
+            reuse_card=self._reuse_card,
+            parent=self,
+        )
+        # --- NEW: Click, Ctrl/Shift and keyboard selection over the cards ---
+        install_card_style_sheet(QApplication.instance())
+        self.scroll_area.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
+        self.card_selection = CardSelection(
+            self.card_builder, self.scroll_area, parent=self
+        )
+        self.card_selection.changed.connect(self.on_card_selection_changed)
+        self.card_selection.activated.connect(self.on_card_chosen)
+        # --- NEW: Re-rank pending thumbnails once scrolling settles ---
+        self._priority_timer = QTimer(self)
+        self._priority_timer.setSingleShot(True)
+        self._priority_timer.setInterval(50)
+        self._priority_timer.timeout.connect(self._update_thumbnail_priorities)
+        self.scroll_area.verticalScrollBar().valueChanged.connect(
+            lambda _: self._priority_timer.start()
+        )
+        self.results_view = ResultsView()
+        self.results_view.selected.connect(self.on_result_selected)
+        self.results_view.chosen.connect(self.on_card_chosen)
+        self.results_layout.addWidget(self.results_view)
         self.wizard.addWidget(self.results_page)
 
         self.final_page_label = QLabel("Process Complete!")
@@ -93,22 +225,18 @@ class MainWindow(QMainWindow):
         current_step = self.steps[self.current_step_index]
 
         if current_step == WizardStep.WELCOME:
+            self.ensure_pages()
+            # --- CHANGE: Cached results skip PROCESSING altogether ---
+            if self._show_cached_results():
+                self._goto_results_page()
+                return
             # --- Use goto_page for animated transition ---
             self.wizard.goto_page(WizardStep.PROCESSING.value - 1)
-            self.worker_thread = QThread()
-            self.worker = Worker()
-            self.worker.moveToThread(self.worker_thread)
-            self.worker_thread.started.connect(self.worker.do_work)
-            self.worker.work_finished.connect(self.on_work_finished)
-            self.worker.work_finished.connect(self.worker_thread.quit)
-            self.worker_thread.finished.connect(self.worker.deleteLater)
-            self.worker_thread.finished.connect(self.worker_thread.deleteLater)
-            self.worker_thread.finished.connect(self.on_thread_finished)
-            self.worker_thread.start()
+            self._start_worker()
             return
 
-        if current_step == WizardStep.RESULTS and self.selected_card:
-            self.on_card_chosen(self.selected_card.item_data)
+        if current_step == WizardStep.RESULTS and self.selected_item:
+            self.on_items_chosen(self._selected_items())
             return
 
         if self.current_step_index < len(self.steps) - 1:
@@ -120,6 +248,7 @@ class MainWindow(QMainWindow):
         current_step = self.steps[self.current_step_index]
 
         if current_step == WizardStep.RESULTS:
+            self._detach_worker()
             self._clear_cards()
             # --- Use goto_page for animated transition ---
             self.wizard.goto_page(WizardStep.WELCOME.value - 1)
@@ -133,47 +262,344 @@ class MainWindow(QMainWindow):
             # --- Use goto_page for animated transition ---
             self.wizard.goto_page(previous_index)
 
-    def on_work_finished(self, results):
+    def _show_cached_results(self):
+        """
+        Shows cached results for the task, if there are any, and starts a
+        background refresh when they are stale. Returns whether it did.
+        """
+        if self.result_cache is None:
+            return False
+        results, is_fresh = self.result_cache.lookup(cache_key())
+        if results is None:
+            return False
+        print("Showing cached results" + ("." if is_fresh else "; refreshing them."))
+        self._detach_worker()
         self.results_data = results
         self.populate_results_page()
-        # --- Use goto_page for animated transition ---
+        self._build_search_index()
+        if not is_fresh:
+            self._start_worker(refresh=True)
+        return True
+
+    def _start_worker(self, refresh=False):
+        """
+        Runs a fresh Worker on the executor, superseding any earlier run.
+        With `refresh`, the results on screen stay there and the new ones
+        are applied as a diff when the run finishes.
+        """
+        self._detach_worker()
+        worker = Worker(
+            self.process_pool,
+            self.result_cache,
+            previous=self.results_data if refresh else None,
+        )
+
+        # Signals from the pool thread are queued, so an event may still
+        # arrive after its run was superseded; drop those.
+        def current(slot):
+            return lambda *args: slot(*args) if worker is self.worker else None
+
+        worker.progress_changed.connect(current(self.on_work_progress))
+        if refresh:
+            # --- NEW: The cached results stay on screen until the diff arrives ---
+            self._refreshing = True
+            worker.work_refreshed.connect(current(self.on_work_refreshed))
+            worker.work_refreshed.connect(current(self.on_worker_done))
+        else:
+            # --- CHANGE: Stream results so the first ones show up right away ---
+            worker.batch_ready.connect(current(self.on_batch_ready))
+            worker.work_finished.connect(current(self.on_work_finished))
+            worker.work_finished.connect(current(self.on_worker_done))
+        worker.work_cancelled.connect(current(self.on_worker_done))
+        self.worker = worker
+        if self.use_asyncio:
+            from async_tasks import TaskScope
+
+            # Cancelled together with everything else the run started.
+            self.run_scope = TaskScope("run")
+            self.run_scope.spawn(worker.do_work_async())
+        else:
+            self.worker_token = self.task_executor.submit(worker.do_work_streaming)
+
+    def on_work_finished(self, results):
+        self.status_label.hide()
+        if self._results_streaming:
+            # Everything already arrived through on_batch_ready.
+            self._results_streaming = False
+        else:
+            self.results_data = results
+            self.populate_results_page()
+            # --- Use goto_page for animated transition ---
+            self._goto_results_page()
+        # --- NEW: The results are complete, so they can be indexed ---
+        self._build_search_index()
+
+    def on_work_refreshed(self, results, diff):
+        """Applies a background refresh to the cached results on screen."""
+        self._refreshing = False
+        self.status_label.hide()
+        print(f"Refreshed cached results: {diff}")
+        if diff.unchanged:
+            # Nothing to repaint, and the search index still holds.
+            return
+        virtualized = len(results) > VIRTUALIZED_RESULTS_THRESHOLD
+        if (
+            diff.in_place
+            and virtualized == self.results_virtualized
+            and not self.search_active
+            and not self.card_builder.is_running()
+        ):
+            self._patch_results_page(results, diff)
+        else:
+            # Too different to patch; show the new results from scratch.
+            self.results_data = results
+            self.populate_results_page()
+        self._build_search_index()
+
+    def _patch_results_page(self, results, diff):
+        """Rebinds the changed rows and appends new ones, keeping the selection."""
+        first_added = len(self.results_data)
+        self.results_data = results
+        if self.results_virtualized:
+            self.results_view.results_model.update_results(results, diff.changed)
+            return
+        changed = set(diff.changed)
+        for card in self.card_builder.cards:
+            item = results[card.index]
+            if card.index not in changed:
+                # Same values; point at the new store so the old one can go.
+                card.item_data = item
+                continue
+            card.bind(item)
+            self.card_selection.restore(card)
+            if card.isVisible():
+                card.start_download()
+        self.card_builder.add(results[row] for row in range(first_added, len(results)))
+        self.on_card_selection_changed()
+
+    @Slot(object)
+    def on_batch_ready(self, batch):
+        """Shows streamed results, switching to RESULTS on the first batch."""
+        if self._results_streaming:
+            self._append_to_results_page(batch)
+            return
+        self._results_streaming = True
+        self._clear_cards()
+        self.results_data = ResultStore()
+        self._begin_results(self._expected_results)
+        self._append_to_results_page(batch)
+        self._goto_results_page()
+
+    @Slot(int, int, float)
+    def on_work_progress(self, done, total, eta):
+        self._expected_results = total
+        text = f"Loaded {done} of {total}"
+        if self._refreshing:
+            text = "Refreshing: " + text
+        if eta >= 0:
+            text += f", about {eta:.0f} s left"
+        self.status_label.setText(text)
+        self.status_label.show()
+
+    def _goto_results_page(self):
+        # --- NEW: The first cards are built before the transition captures
+        # the page, so it slides in filled rather than empty ---
+        self.card_builder.build_now()
         self.wizard.goto_page(WizardStep.RESULTS.value - 1)
 
+    def _detach_worker(self):
+        """Cancels a run whose results are no longer wanted."""
+        self._results_streaming = False
+        self._refreshing = False
+        self.status_label.hide()
+        if self.worker_token:
+            # The task wakes from its wait and returns its thread to the pool.
+            self.worker_token.cancel()
+        if self.run_scope:
+            # Cancellation is delivered at the task's next await.
+            self.run_scope.cancel()
+        self.worker = None
+        self.worker_token = None
+        self.run_scope = None
+
+    @INSTRUMENTATION.timed
     def populate_results_page(self):
         self._clear_cards()
-        if self.results_data:
-            for item in self.results_data:
-                card = CardWidget(item)
-                card.selected.connect(self.on_card_selected)
-                card.chosen.connect(self.on_card_chosen)
-                self.card_layout.addWidget(card)
+        if not self.results_data:
+            return
+        self._begin_results(len(self.results_data))
+        if not self.results_virtualized:
+            self.card_builder.add(self.results_data)
+
+    def _begin_results(self, total):
+        """Picks the card list or the virtualized view for `total` results."""
+        self.results_virtualized = total > VIRTUALIZED_RESULTS_THRESHOLD
+        if self.results_virtualized:
+            self.results_layout.setCurrentWidget(self.results_view)
+            # --- CHANGE: The model reads results_data in place, no copy ---
+            self.results_view.set_results(self.results_data)
+        else:
+            self.results_layout.setCurrentWidget(self.scroll_area)
+
+    def _append_to_results_page(self, items):
+        if self.results_virtualized:
+            # --- NEW: Large sets only cost a row insert, not a widget per item ---
+            # This also extends results_data, which the model shares.
+            self.results_view.append_results(items)
+        else:
+            self.results_data.extend(items)
+            self.card_builder.add(items)
+
+    def _build_search_index(self):
+        """Indexes results_data on index_executor; the search bar waits for it."""
+        self._cancel_search_index()
+        if not self.results_data:
+            return
+        from search_index import SearchIndexBuilder
+
+        builder = SearchIndexBuilder(self.results_data)
+        # Queued from the pool thread; drop an index for superseded results.
+        builder.index_ready.connect(
+            lambda index: (
+                self.on_search_index_ready(index)
+                if builder is self.index_builder
+                else None
+            )
+        )
+        self.index_builder = builder
+        self.index_token = self.index_executor.submit(builder.build)
+
+    def _cancel_search_index(self):
+        if self.index_token:
+            self.index_token.cancel()
+        self.index_builder = None
+        self.index_token = None
+        self.search_index = None
+        self.search_active = False
+        self.search_bar.clear()
+        self.search_bar.setEnabled(False)
+
+    def on_search_index_ready(self, index):
+        self.index_builder = None
+        self.index_token = None
+        self.search_index = index
+        self.search_bar.set_fields(index.fields())
+        self.search_bar.setEnabled(True)
+
+    @Slot(str, object, bool)
+    def on_search_changed(self, text, field, descending):
+        """Filters and sorts the results; each call only swaps the view's rows."""
+        if self.search_index is None:
+            return
+        active = bool(text.strip()) or field is not None or descending
+        if active and not self.search_active and not self.results_virtualized:
+            # Cards are not filtered in place; the view shows the same store.
+            self._clear_selection()
+            self.results_view.set_results(self.results_data)
+            self.results_layout.setCurrentWidget(self.results_view)
+        if active:
+            view = self.search_index.search(text, field, descending)
+            self.results_view.set_view(view)
+            self.search_bar.set_match_count(view.count, len(self.results_data))
+        elif not self.results_virtualized:
+            self._clear_selection()
+            self.results_view.clear()
+            self.results_layout.setCurrentWidget(self.scroll_area)
+            self.search_bar.set_match_count(
+                len(self.results_data), len(self.results_data)
+            )
+        else:
+            self.results_view.set_view(None)
+            self.search_bar.set_match_count(
+                len(self.results_data), len(self.results_data)
+            )
+        self.search_active = active
+
+    def _create_card(self, index, item):
+        """Called by the card builder for each item, a few per frame."""
+        card = CardWidget(item)
+        card.index = index
+        # Until the layout exists, list order is the best guess.
+        card.download_priority = -index
+        card.selected.connect(self.on_card_selected)
+        card.chosen.connect(self.on_card_chosen)
+        return card
+
+    def _reuse_card(self, card, index, item):
+        """Called instead of _create_card for a card kept from earlier results."""
+        card.bind(item)
+        card.index = index
+        card.download_priority = -index
+
+    def _update_thumbnail_priorities(self):
+        """Ranks pending card thumbnails by their distance from the viewport."""
+        top = self.scroll_area.verticalScrollBar().value()
+        bottom = top + self.scroll_area.viewport().height()
+        for card in self.card_builder.cards:
+            if not card.thumbnail_request:
+                continue
+            # Cards sit inside blocks; offset by the block's position.
+            geometry = card.geometry().translated(card.parentWidget().pos())
+            if geometry.bottom() < top:
+                distance = top - geometry.bottom()
+            elif geometry.top() > bottom:
+                distance = geometry.top() - bottom
+            else:
+                distance = 0
+            # Rank in whole cards away from the viewport; 0 is on screen.
+            card.set_download_priority(-(distance // max(card.height(), 1)))
 
     def _clear_cards(self):
-        self.selected_card = None
-        while self.card_layout.count():
-            child = self.card_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
+        self._clear_selection()
+        self._cancel_search_index()
+        self.results_view.clear()
+        for card in self.card_builder.cards:
+            card.cancel_download()
+        self.card_builder.clear()
 
     @Slot(object)
     def on_card_selected(self, card_widget):
-        if self.selected_card:
-            self.selected_card.unselect_card()
-        self.selected_card = card_widget
-        self.selected_card.select_card()
-        self.next_button.setEnabled(True)
+        self.card_selection.click(card_widget, QApplication.keyboardModifiers())
 
-    @Slot(dict)
+    def on_card_selection_changed(self):
+        self.selected_item = self.card_selection.selected_item()
+        self.next_button.setEnabled(self.selected_item is not None)
+
+    @Slot(object)
+    def on_result_selected(self, item_data):
+        self.selected_item = item_data
+        self.next_button.setEnabled(item_data is not None)
+
+    def _clear_selection(self):
+        self.card_selection.clear()
+        self.selected_item = None
+        self.next_button.setEnabled(False)
+
+    def _selected_items(self):
+        if self.results_layout.currentWidget() is self.results_view:
+            return self.results_view.selected_items()
+        return self.card_selection.selected_items()
+
+    @Slot(object)
     def on_card_chosen(self, item_data):
-        print(f"Final item chosen: {item_data['name']}")
-        self.final_page_label.setText(f"You chose:\n{item_data['name']}")
+        self.on_items_chosen([item_data])
+
+    def on_items_chosen(self, items):
+        names = [item["name"] for item in items]
+        print(f"Final item chosen: {', '.join(names)}")
+        listed = names[:MAX_LISTED_CHOICES]
+        if len(names) > len(listed):
+            listed.append(f"and {len(names) - len(listed)} more")
+        self.final_page_label.setText("You chose:\n" + "\n".join(listed))
         # --- Use goto_page for animated transition ---
         self.wizard.goto_page(WizardStep.FINAL.value - 1)
 
-    def on_thread_finished(self):
+    def on_worker_done(self, *args):
         self.worker = None
-        self.worker_thread = None
+        self.worker_token = None
+        self.run_scope = None
 
+    @INSTRUMENTATION.timed
     def update_ui_for_step(self, index):
         # This logic is now driven by the `currentChanged` signal,
         # which is emitted by our custom widget after the animation finishes.
@@ -189,7 +615,7 @@ class MainWindow(QMainWindow):
         elif current_step == WizardStep.RESULTS:
             self.back_button.show()
             self.next_button.show()
-            self.next_button.setEnabled(bool(self.selected_card))
+            self.next_button.setEnabled(bool(self.selected_item))
         elif current_step == WizardStep.FINAL:
             self.back_button.show()
             self.next_button.hide()
@@ -198,14 +624,56 @@ class MainWindow(QMainWindow):
             self.next_button.show()
 
     def closeEvent(self, event):
-        if self.worker_thread and self.worker_thread.isRunning():
-            self.worker_thread.quit()
-            self.worker_thread.wait()
+        # --- CHANGE: Cancel instead of waiting for the task to run out ---
+        self._detach_worker()
+        # One deadline for both pools, so closing never waits past 100 ms.
+        executors = (self.task_executor, self.index_executor)
+        if not shutdown_executors(executors, timeout_ms=100):
+            print("A background task did not stop within 100 ms.")
+        if self.process_pool:
+            self.process_pool.shutdown()
+        if INSTRUMENTATION.enabled:
+            INSTRUMENTATION.export_json("instrumentation.json")
+            INSTRUMENTATION.export_chrome_trace("instrumentation.trace.json")
+            print("Wrote instrumentation.json and instrumentation.trace.json")
         event.accept()
 
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    window = MainWindow()
+    STARTUP.mark("application")
+    # --- NEW: `--local-thumbnails` paints placeholders instead of downloading ---
+    if "--local-thumbnails" in sys.argv:
+        set_thumbnail_source(LocalThumbnailRenderer(THUMBNAIL_CACHE, THUMBNAIL_SIZE))
+    # --- NEW: `--processes` runs wizard tasks in a process pool ---
+    # --- NEW: `--instrument` records timings and writes them on exit ---
+    # --- NEW: `--asyncio` runs wizard tasks as coroutines on the Qt loop ---
+    # --- NEW: `--fast-start` builds only WELCOME before the first paint ---
+    # --- NEW: `--no-result-cache` runs the task every time ---
+    use_asyncio = "--asyncio" in sys.argv
+    window = MainWindow(
+        use_process_pool="--processes" in sys.argv,
+        instrument="--instrument" in sys.argv,
+        use_asyncio=use_asyncio,
+        defer_pages="--fast-start" in sys.argv,
+        use_result_cache="--no-result-cache" not in sys.argv,
+    )
     window.show()
-    sys.exit(app.exec())
+    STARTUP.mark("window")
+    # --- NEW: `--startup-report` prints import and first-paint times;
+    # `--quit-after-startup` then exits, for scripted cold-start runs ---
+    if "--startup-report" in sys.argv:
+
+        def on_started():
+            print(STARTUP.summary(), flush=True)
+            if "--quit-after-startup" in sys.argv:
+                window.close()
+
+        STARTUP.watch_first_paint(window, on_started)
+    if use_asyncio:
+        from PySide6 import QtAsyncio
+
+        # The asyncio loop is the Qt event loop; it ends with the last window.
+        QtAsyncio.run(handle_sigint=True)
+    else:
+        sys.exit(app.exec())
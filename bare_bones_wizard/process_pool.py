@@ -0,0 +1,154 @@
+# process_pool.py
+import asyncio
+import concurrent.futures
+import json
+import multiprocessing
+import os
+import struct
+from collections import deque
+from multiprocessing import shared_memory
+
+from result_store import ResultStore, store_buffers, store_from_buffer, store_layout
+
+# Header layout: the byte length of the JSON column table that follows it.
+_HEADER = struct.Struct("<I")
+
+
+def pack_results(results):
+    """
+    Writes results (a ResultStore or a list of flat dicts) into a new shared
+    memory block in the store_layout format and returns `(name, size)`.
+    The caller of `unpack_results` owns the block afterwards.
+
+    Every row must have the same keys; values are ints, floats or strings.
+    """
+    if not isinstance(results, ResultStore):
+        results = ResultStore(results)
+    table = json.dumps(store_layout(results)).encode("utf-8")
+    size = _HEADER.size + len(table) + results.nbytes
+    block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    try:
+        block.buf[: _HEADER.size] = _HEADER.pack(len(table))
+        position = _HEADER.size
+        block.buf[position : position + len(table)] = table
+        position += len(table)
+        for buffer in store_buffers(results):
+            with memoryview(buffer) as view, view.cast("B") as data:
+                block.buf[position : position + data.nbytes] = data
+                position += data.nbytes
+        return block.name, size
+    finally:
+        block.close()
+
+
+def unpack_results(name, size):
+    """
+    Reads the results written by `pack_results` into a ResultStore and
+    frees the block. Columns are copied out whole; no per-row objects are
+    created.
+    """
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        with block.buf[:size] as buffer:
+            (table_size,) = _HEADER.unpack_from(buffer)
+            start = _HEADER.size + table_size
+            layout = json.loads(bytes(buffer[_HEADER.size : start]))
+            with buffer[start:] as data:
+                return store_from_buffer(layout, data)
+    finally:
+        block.close()
+        block.unlink()
+
+
+def _discard_results(name, size):
+    try:
+        block = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    block.close()
+    block.unlink()
+
+
+def _run_packed(function, args):
+    # Runs in the pool process; only the block's name travels back.
+    return pack_results(function(*args))
+
+
+class ProcessPool:
+    """
+    A long-lived pool of worker processes for CPU-bound wizard tasks.
+
+    Work runs outside this interpreter, so it never holds the GUI thread's
+    GIL. Results come back through shared memory: the child writes them
+    column by column and only the block's name is pickled.
+    """
+
+    # Cancelled waits are noticed at least this often.
+    POLL_INTERVAL = 0.05  # seconds
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        # "spawn" everywhere: forking a process that runs Qt threads is unsafe.
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    def map_chunks(self, function, chunks, token=None):
+        """
+        Runs `function(*args)` for every args tuple in `chunks` across the
+        pool and yields each chunk's ResultStore in order as soon as it is
+        ready. `function` must be a picklable module-level function returning
+        a ResultStore or a list of flat dicts. Stops early, dropping pending
+        chunks, once `token` is cancelled.
+        """
+        pending = deque(
+            self._executor.submit(_run_packed, function, args) for args in chunks
+        )
+        try:
+            while pending:
+                if token is not None and token.is_cancelled:
+                    return
+                try:
+                    name, size = pending[0].result(timeout=self.POLL_INTERVAL)
+                except concurrent.futures.TimeoutError:
+                    continue
+                pending.popleft()
+                yield unpack_results(name, size)
+        finally:
+            _drop_pending(pending)
+
+    # --- NEW: The same, awaited on the running loop instead of polled ---
+    async def map_chunks_async(self, function, chunks):
+        """
+        An async generator counterpart of `map_chunks`. Each chunk is
+        awaited without blocking the loop; cancelling the consuming task
+        drops the pending chunks.
+        """
+        pending = deque(
+            self._executor.submit(_run_packed, function, args) for args in chunks
+        )
+        try:
+            while pending:
+                name, size = await asyncio.wrap_future(pending[0])
+                pending.popleft()
+                yield unpack_results(name, size)
+        finally:
+            _drop_pending(pending)
+
+    def shutdown(self):
+        """Drops queued chunks without waiting for running ones."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _drop_pending(pending):
+    for future in pending:
+        if not future.cancel():
+            # Already running or done; free its block once it lands.
+            future.add_done_callback(_discard_future)
+
+
+def _discard_future(future):
+    if future.cancelled() or future.exception() is not None:
+        return
+    _discard_results(*future.result())
@@ -0,0 +1,74 @@
+# qt_network_backend.py
+from download_engine import BodySink, DownloadBackend, DownloadResponse
+from PySide6.QtCore import QUrl
+from PySide6.QtNetwork import QNetworkAccessManager, QNetworkReply, QNetworkRequest
+
+
+class _QtJob:
+    def __init__(self, manager, url, headers, spill_threshold, timeout, on_bytes, done):
+        self.url = url
+        self.spill_threshold = spill_threshold
+        self.on_bytes = on_bytes
+        self.done = done
+        self.sink = None
+        self.is_aborted = False
+        request = QNetworkRequest(QUrl(url))
+        # Multiplex over one connection where the server speaks HTTP/2.
+        request.setAttribute(QNetworkRequest.Attribute.Http2AllowedAttribute, True)
+        request.setTransferTimeout(int(timeout * 1000))
+        for name, value in headers.items():
+            request.setRawHeader(name.encode("latin-1"), value.encode("latin-1"))
+        self.reply = manager.get(request)
+        self.reply.readyRead.connect(self._on_ready_read)
+        self.reply.finished.connect(self._on_finished)
+
+    def abort(self):
+        self.is_aborted = True
+        self.reply.abort()
+        if self.sink is not None:
+            self.sink.close()
+
+    def _on_ready_read(self):
+        if self.sink is None:
+            length = self.reply.header(QNetworkRequest.KnownHeaders.ContentLengthHeader)
+            self.sink = BodySink(
+                self.spill_threshold, length if isinstance(length, int) else None
+            )
+        data = self.reply.readAll()
+        self.on_bytes(data.size())
+        self.sink.write(data.data())
+
+    def _on_finished(self):
+        reply = self.reply
+        reply.deleteLater()
+        if self.is_aborted:
+            return
+        status = reply.attribute(QNetworkRequest.Attribute.HttpStatusCodeAttribute)
+        if reply.error() != QNetworkReply.NetworkError.NoError and status is None:
+            if self.sink is not None:
+                self.sink.close()
+            self.done(None, reply.errorString())
+            return
+        if reply.bytesAvailable():
+            self._on_ready_read()
+        headers = {
+            bytes(name).decode("latin-1"): bytes(value).decode("latin-1")
+            for name, value in reply.rawHeaderPairs()
+        }
+        body = self.sink.finish() if self.sink is not None else bytearray()
+        self.done(DownloadResponse(self.url, status, headers, body), None)
+
+
+class QtNetworkBackend(DownloadBackend):
+    """
+    Downloads with a QNetworkAccessManager on the GUI thread's event loop.
+    Connections are kept alive and HTTP/2 is negotiated where available.
+    """
+
+    def __init__(self, manager=None):
+        self.manager = manager or QNetworkAccessManager()
+
+    def start(self, url, headers, spill_threshold, timeout, on_bytes, done):
+        return _QtJob(
+            self.manager, url, headers, spill_threshold, timeout, on_bytes, done
+        )
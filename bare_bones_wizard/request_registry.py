@@ -0,0 +1,153 @@
+# request_registry.py
+import heapq
+import itertools
+
+from PySide6.QtCore import QObject
+
+
+class _InFlight:
+    """One running (or queued) job and everyone waiting for it."""
+
+    def __init__(self):
+        self.job = None
+        self.subscribers = []
+        self.priority = 0
+        # Whether the queue holds an entry for this request yet.
+        self.queued = False
+
+    def update_priority(self):
+        """The request runs at the priority of its most urgent subscriber."""
+        self.priority = max(s.priority for s in self.subscribers)
+
+
+class Subscription:
+    """A handle returned by RequestRegistry.subscribe, used to cancel interest."""
+
+    __slots__ = ("callback", "priority", "url")
+
+    def __init__(self, url, callback, priority=0):
+        self.url = url
+        self.callback = callback
+        self.priority = priority
+
+
+class RequestRegistry(QObject):
+    """
+    Coalesces identical in-flight URLs into a single job.
+
+    `start_job(url, finish)` starts the work for a URL and returns an object
+    with an `abort()` method; the job calls `finish(result, error)` exactly
+    once unless it is aborted first. The result is fanned out to every
+    subscriber as `callback(result, error)`, where `error` is None on success.
+    The job is aborted only when its last subscriber cancels.
+
+    At most `max_concurrent` jobs run at once. Waiting requests are started
+    highest priority first, and their priority can be changed while they wait.
+    """
+
+    def __init__(self, start_job, max_concurrent=6, parent=None):
+        super().__init__(parent)
+        self._start_job = start_job
+        self.max_concurrent = max_concurrent
+        self._inflight = {}
+        # Heap of (-priority, sequence, url). Entries are never removed in
+        # place; stale ones are skipped when popped, and dropped in bulk once
+        # they outnumber the live ones.
+        self._queue = []
+        self._sequence = itertools.count()
+        self._running = 0
+        self.stats = {"requests": 0, "coalesced": 0, "aborted": 0}
+
+    def subscribe(self, url, callback, priority=0):
+        """Registers interest in `url`, queueing a request only if none exists."""
+        subscription = Subscription(url, callback, priority)
+        inflight = self._inflight.get(url)
+        if inflight is None:
+            inflight = _InFlight()
+            self._inflight[url] = inflight
+        else:
+            self.stats["coalesced"] += 1
+        inflight.subscribers.append(subscription)
+        self._reschedule(url, inflight)
+        self._dispatch()
+        return subscription
+
+    def set_priority(self, subscription, priority):
+        """Re-ranks a waiting subscription. Running requests are unaffected."""
+        subscription.priority = priority
+        inflight = self._inflight.get(subscription.url)
+        if inflight is not None and subscription in inflight.subscribers:
+            self._reschedule(subscription.url, inflight)
+
+    def cancel(self, subscription):
+        """Drops a subscriber; aborts the job if nobody else is waiting."""
+        inflight = self._inflight.get(subscription.url)
+        if inflight is None or subscription not in inflight.subscribers:
+            return
+        inflight.subscribers.remove(subscription)
+        if inflight.subscribers:
+            self._reschedule(subscription.url, inflight)
+            return
+        del self._inflight[subscription.url]
+        self.stats["aborted"] += 1
+        if inflight.job is not None:
+            inflight.job.abort()
+            self._running -= 1
+            self._dispatch()
+
+    def is_pending(self, url):
+        return url in self._inflight
+
+    def _reschedule(self, url, inflight):
+        old_priority = inflight.priority
+        inflight.update_priority()
+        if inflight.job is not None or (
+            inflight.queued and inflight.priority == old_priority
+        ):
+            return
+        inflight.queued = True
+        heapq.heappush(self._queue, (-inflight.priority, next(self._sequence), url))
+        if len(self._queue) > 2 * len(self._inflight) + 64:
+            self._compact()
+
+    def _compact(self):
+        """Drops the queue entries _dispatch would skip."""
+        live = []
+        for entry in sorted(self._queue):
+            inflight = self._inflight.get(entry[2])
+            if (
+                inflight is not None
+                and inflight.job is None
+                and -entry[0] == inflight.priority
+            ):
+                live.append(entry)
+        # A sorted list is a valid heap.
+        self._queue = live
+
+    def _dispatch(self):
+        """Starts queued jobs, most urgent first, while slots are free."""
+        while self._running < self.max_concurrent and self._queue:
+            negative_priority, _, url = heapq.heappop(self._queue)
+            inflight = self._inflight.get(url)
+            if (
+                inflight is None
+                or inflight.job is not None
+                or -negative_priority != inflight.priority
+            ):
+                continue  # Cancelled, already started, or re-ranked since.
+            self._running += 1
+            self.stats["requests"] += 1
+            inflight.job = self._start_job(
+                url,
+                lambda result, error, u=url, i=inflight: self._on_finished(
+                    u, i, result, error
+                ),
+            )
+
+    def _on_finished(self, url, inflight, result, error):
+        self._running -= 1
+        if self._inflight.get(url) is inflight:
+            del self._inflight[url]
+            for subscription in inflight.subscribers:
+                subscription.callback(result, error)
+        self._dispatch()
@@ -0,0 +1,109 @@
+# requests_backend.py
+import requests
+from download_engine import CHUNK_SIZE, BodySink, DownloadBackend, DownloadResponse
+from PySide6.QtCore import QRunnable, QThreadPool, Slot
+from requests.adapters import HTTPAdapter
+from task_executor import call_on_gui_thread
+
+# --- NEW: Create a single, global session object ---
+# This allows for connection pooling and proper resource management.
+SESSION = requests.Session()
+
+
+class DownloadRunner(QRunnable):
+    """
+    A runnable task to download a single file with the shared session.
+    The body is collected by a BodySink, so large payloads end up mmap'ed.
+    `done(response, error)` is called on the GUI thread unless aborted.
+    """
+
+    def __init__(self, url, headers, spill_threshold, timeout, on_bytes, done):
+        super().__init__()
+        self.url = url
+        self.headers = headers
+        self.spill_threshold = spill_threshold
+        self.timeout = timeout
+        self.on_bytes = on_bytes
+        self.done = done
+        self.is_aborted = False
+
+    @Slot()
+    def abort(self):
+        """Sets a flag to stop the runner's execution."""
+        self.is_aborted = True
+
+    def _deliver(self, response, error):
+        # On the GUI thread. The response object itself crosses the thread
+        # boundary; no copy is made.
+        if not self.is_aborted:
+            self.done(response, error)
+
+    def run(self):
+        """The main work of the runner, executed on a background thread."""
+        if self.is_aborted:
+            return
+
+        try:
+            response = SESSION.get(
+                self.url, headers=self.headers, stream=True, timeout=self.timeout
+            )
+            with response:
+                sink = BodySink(self.spill_threshold, _content_length(response))
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    if self.is_aborted:
+                        sink.close()
+                        return
+                    self.on_bytes(len(chunk))
+                    sink.write(chunk)
+                body = sink.finish()
+            call_on_gui_thread(
+                self._deliver,
+                DownloadResponse(
+                    self.url, response.status_code, dict(response.headers), body
+                ),
+                None,
+            )
+
+        except (requests.exceptions.RequestException, OSError) as e:
+            # When the session is closed, this exception is expected.
+            if not self.is_aborted:
+                print(f"Failed to download {self.url}: {e}")
+                call_on_gui_thread(self._deliver, None, str(e))
+
+
+class RequestsBackend(DownloadBackend):
+    """
+    Downloads with the shared requests session on a thread pool.
+
+    The session keeps up to `per_host_limit` connections alive per host.
+    requests only speaks HTTP/1.1.
+    """
+
+    def __init__(self, max_threads=16, per_host_limit=6):
+        adapter = HTTPAdapter(pool_connections=max_threads, pool_maxsize=per_host_limit)
+        SESSION.mount("http://", adapter)
+        SESSION.mount("https://", adapter)
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(max_threads)
+
+    def start(self, url, headers, spill_threshold, timeout, on_bytes, done):
+        runner = DownloadRunner(url, headers, spill_threshold, timeout, on_bytes, done)
+        self.pool.start(runner)
+        return runner
+
+    def shutdown(self):
+        """Closes the session; running requests then fail quickly."""
+        print("Downloader: Closing session and aborting runners.")
+        self.pool.clear()
+        SESSION.close()
+
+
+def _content_length(response):
+    """Returns the decoded body length if the headers tell us, else None."""
+    if response.headers.get("Content-Encoding", "identity") != "identity":
+        # Content-Length is the compressed size; iter_content decompresses.
+        return None
+    try:
+        return int(response.headers["Content-Length"])
+    except (KeyError, ValueError):
+        return None
@@ -0,0 +1,198 @@
+# result_cache.py
+import json
+import mmap
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from disk_tier import DiskTier
+from result_store import store_buffers, store_from_buffer, store_layout
+
+# How long stored results are used without running the task again.
+DEFAULT_TTL = 10 * 60  # seconds
+# How long after that they are still shown while the task runs again.
+DEFAULT_STALE_TTL = 7 * 24 * 60 * 60  # seconds
+# Entries written with another layout are ignored.
+FORMAT_VERSION = 2
+
+
+class ResultCache:
+    """
+    Finished wizard results, keyed by the inputs that produced them.
+
+    Stores live in a byte-bounded in-memory LRU and in a size-bounded
+    directory on disk, so a repeated run skips the task, also after a
+    restart. An entry is fresh for `ttl` seconds after it was stored. For
+    `stale_ttl` seconds after that `lookup` still returns it, marked stale,
+    so it can be shown while the task runs again (stale-while-revalidate);
+    a `stale_ttl` of 0 turns that off. Older entries are misses.
+
+    On disk a store is a JSON header with its store_layout plus its column
+    buffers end to end, so loading one is a copy per column rather than a
+    parse per row.
+    Methods may be called from any thread. Stores handed to or returned by
+    the cache are shared and must not be modified. A failed disk write is
+    logged and leaves the entry in memory only.
+    """
+
+    def __init__(
+        self,
+        ttl=DEFAULT_TTL,
+        stale_ttl=DEFAULT_STALE_TTL,
+        memory_limit=64 * 1024 * 1024,
+        disk_limit=256 * 1024 * 1024,
+        directory=None,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.memory_limit = memory_limit
+        # key -> (store, stored timestamp, size in bytes)
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._disk = DiskTier("results", disk_limit, (".bin", ".json"), directory)
+        self._lock = threading.Lock()
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+        }
+
+    # --- Lookup ---
+
+    def lookup(self, key):
+        """
+        Returns (store, is_fresh) for `key`, or (None, False) if there is
+        no entry or it is past its stale window.
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+        if entry is None:
+            entry = self._load(key)
+            if entry is None:
+                with self._lock:
+                    self.stats["misses"] += 1
+                return None, False
+            with self._lock:
+                self.stats["disk_hits"] += 1
+                self._insert_memory(key, *entry)
+        store, stored = entry[0], entry[1]
+        age = time.time() - stored
+        if age >= self.ttl + self.stale_ttl:
+            self.invalidate(key)
+            return None, False
+        if age >= self.ttl:
+            with self._lock:
+                self.stats["stale_hits"] += 1
+            return store, False
+        return store, True
+
+    def store(self, key, results):
+        """Caches finished results under `key`, replacing any older entry."""
+        stored = time.time()
+        with self._lock:
+            self._insert_memory(key, results, stored)
+        self._store_disk(key, results, stored)
+
+    def invalidate(self, key):
+        """Forgets the entry for `key` in both tiers."""
+        with self._lock:
+            entry = self._memory.pop(key, None)
+            if entry is not None:
+                self._memory_bytes -= entry[2]
+        self._disk.remove(self._file_key(key))
+
+    # --- Memory tier ---
+
+    def _insert_memory(self, key, store, stored, size=None):
+        # Called with the lock held.
+        size = store.nbytes if size is None else size
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= old[2]
+        if size > self.memory_limit:
+            # Would evict everything else; it stays on disk only.
+            return
+        self._memory[key] = (store, stored, size)
+        self._memory_bytes += size
+        while self._memory_bytes > self.memory_limit:
+            _, (_, _, evicted_size) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_size
+            self.stats["memory_evictions"] += 1
+
+    # --- Disk tier ---
+
+    @property
+    def directory(self):
+        return self._disk.directory
+
+    def _file_key(self, key):
+        return self._disk.key(key)
+
+    def _path(self, file_key, suffix):
+        return self._disk.path(file_key, suffix)
+
+    def _load(self, key):
+        """Reads an entry from disk as (store, stored timestamp), or None."""
+        file_key = self._file_key(key)
+        try:
+            with open(self._path(file_key, ".json"), encoding="utf-8") as f:
+                header = json.load(f)
+            if header.get("key") != key or header.get("version") != FORMAT_VERSION:
+                return None
+            with open(self._path(file_key, ".bin"), "rb") as f:
+                if os.fstat(f.fileno()).st_size != header["size"]:
+                    # Caught between the two renames of a rewrite.
+                    return None
+                store = _read_store(f, header)
+        except (OSError, ValueError, KeyError) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"Result cache: could not read an entry: {e}")
+            return None
+        self._disk.touch(file_key)
+        return store, header["stored"]
+
+    def _store_disk(self, key, results, stored):
+        file_key = self._file_key(key)
+        # Written under temporary names and renamed, so a reader on another
+        # thread or a crash never sees half an entry.
+        try:
+            with open(self._path(file_key, ".bin.tmp"), "wb") as f:
+                f.writelines(store_buffers(results))
+                size = f.tell()
+            header = {
+                "key": key,
+                "version": FORMAT_VERSION,
+                "stored": stored,
+                "layout": store_layout(results),
+                "size": size,
+            }
+            with open(self._path(file_key, ".json.tmp"), "w", encoding="utf-8") as f:
+                json.dump(header, f)
+            os.replace(self._path(file_key, ".bin.tmp"), self._path(file_key, ".bin"))
+            os.replace(self._path(file_key, ".json.tmp"), self._path(file_key, ".json"))
+            evicted = self._disk.added(file_key, size, keep=True)
+        except OSError as e:
+            print(f"Result cache: could not write an entry: {e}")
+            return
+        with self._lock:
+            self.stats["disk_evictions"] += evicted
+
+
+def _read_store(f, header):
+    """Reads back a store written by _store_disk, as described by `header`."""
+    if not header["size"]:
+        return store_from_buffer(header["layout"], b"")
+    # Mapped rather than read, so each column is copied once, straight
+    # from the page cache.
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return store_from_buffer(header["layout"], mapped)
+
+
+RESULT_CACHE = ResultCache()
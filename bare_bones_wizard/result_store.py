@@ -0,0 +1,400 @@
+# result_store.py
+from array import array
+from collections.abc import Mapping
+
+
+class _StringColumn:
+    """Strings stored end to end as UTF-8, with the end offset of each value."""
+
+    __slots__ = ("data", "ends")
+
+    def __init__(self, data=None, ends=None):
+        self.data = data if data is not None else bytearray()
+        self.ends = ends if ends is not None else array("Q")
+
+    def __len__(self):
+        return len(self.ends)
+
+    def __getitem__(self, index):
+        start = self.ends[index - 1] if index else 0
+        return self.data[start : self.ends[index]].decode("utf-8")
+
+    def append(self, value):
+        if not isinstance(value, str):
+            raise TypeError(f"expected a string, not {type(value).__name__}")
+        self.data += value.encode("utf-8")
+        self.ends.append(len(self.data))
+
+    def truncate(self, count):
+        del self.data[self.ends[count - 1] if count else 0 :]
+        del self.ends[count:]
+
+    def extend(self, other):
+        base = len(self.data)
+        self.data += other.data
+        self.ends.extend(end + base for end in other.ends)
+
+    @property
+    def nbytes(self):
+        return len(self.data) + len(self.ends) * self.ends.itemsize
+
+
+def _new_column(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise TypeError(f"results cannot hold {type(value).__name__} values")
+    if isinstance(value, int):
+        return array("q")
+    if isinstance(value, float):
+        return array("d")
+    return _StringColumn()
+
+
+# Rows compared together when looking for the ones that changed.
+_DIFF_BLOCK = 4096
+
+
+def _span(buffer, first, last):
+    # A whole buffer compares with one memcmp; slicing would copy it first.
+    return buffer if first == 0 and last == len(buffer) else buffer[first:last]
+
+
+def _same_rows(old, new, first, last):
+    """Whether rows [first, last) hold equal values in two columns of one kind."""
+    if isinstance(old, _StringColumn):
+        old_start = old.ends[first - 1] if first else 0
+        new_start = new.ends[first - 1] if first else 0
+        old_end, new_end = old.ends[last - 1], new.ends[last - 1]
+        if old_end - old_start != new_end - new_start:
+            return False
+        if _span(old.data, old_start, old_end) != _span(new.data, new_start, new_end):
+            return False
+        if old_start == new_start:
+            return _span(old.ends, first, last) == _span(new.ends, first, last)
+        # Same bytes at another offset; the values must split the same way.
+        shift = new_start - old_start
+        return all(
+            end + shift == other
+            for end, other in zip(old.ends[first:last], new.ends[first:last])
+        )
+    return _span(old, first, last) == _span(new, first, last)
+
+
+def _bits(column, count):
+    bits = array("q")
+    bits.frombytes(memoryview(column)[:count].cast("B"))
+    return bits
+
+
+def _changed_rows(old, new, count):
+    """Rows below `count` where two columns of the same kind differ."""
+    if isinstance(old, array) and old.typecode == "d":
+        # Floats are compared as their bits, block and row alike: one memcmp
+        # per block, NaN equal to itself and -0.0 different from 0.0.
+        old, new = _bits(old, count), _bits(new, count)
+    if not count or _same_rows(old, new, 0, count):
+        return ()
+    changed = []
+    for first in range(0, count, _DIFF_BLOCK):
+        last = min(first + _DIFF_BLOCK, count)
+        if not _same_rows(old, new, first, last):
+            changed.extend(row for row in range(first, last) if old[row] != new[row])
+    return changed
+
+
+class ResultDiff:
+    """
+    How a newer ResultStore differs from an older one, row by row.
+
+    `changed` lists the rows present in both whose values differ, `added`
+    counts rows past the end of the older store and `removed` rows past
+    the end of the newer one. Without `same_columns` the rows cannot be
+    compared and `changed` is None.
+    """
+
+    __slots__ = ("added", "changed", "removed", "same_columns")
+
+    def __init__(self, changed, added, removed, same_columns=True):
+        self.changed = changed
+        self.added = added
+        self.removed = removed
+        self.same_columns = same_columns
+
+    @property
+    def unchanged(self):
+        return self.same_columns and not (self.changed or self.added or self.removed)
+
+    @property
+    def in_place(self):
+        """True if applying it only rewrites rows and appends new ones."""
+        return self.same_columns and not self.removed
+
+    def __repr__(self):
+        if not self.same_columns:
+            return "ResultDiff(columns changed)"
+        return (
+            f"ResultDiff(changed={len(self.changed)}, added={self.added}, "
+            f"removed={self.removed})"
+        )
+
+
+class ResultRow(Mapping):
+    """
+    A read-only view of one row of a ResultStore.
+
+    It reads like the dict it replaces (`row["name"]`, `row.get("id")`) but
+    only holds the store and a row number, so handing rows to widgets or
+    signals costs no copy.
+    """
+
+    __slots__ = ("index", "store")
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    def __getitem__(self, key):
+        return self.store.column(key)[self.index]
+
+    def __iter__(self):
+        return iter(self.store.keys())
+
+    def __len__(self):
+        return len(self.store.keys())
+
+    def __repr__(self):
+        return f"ResultRow({dict(self)!r})"
+
+    def to_dict(self):
+        return dict(self)
+
+
+class ResultStore:
+    """
+    Worker results as typed columns instead of a list of dicts.
+
+    Ints and floats live in `array` columns and strings are packed end to
+    end, so a row costs its payload bytes rather than a dict and a Python
+    object per value. Every row must have the same keys; a column's type is
+    taken from its first value, and an int column becomes a float column
+    if a float arrives. Values must be ints, floats or strings: anything
+    else, None and bools included, raises TypeError instead of being
+    stored as something it is not.
+
+    Stores travel through `Signal(object)`, which passes the reference, so
+    a store handed to a signal belongs to the receiver and the sender must
+    not modify it afterwards.
+    """
+
+    def __init__(self, items=None):
+        # key -> array or _StringColumn, all of length `_count`
+        self._columns = {}
+        self._count = 0
+        if items is not None:
+            self.extend(items)
+
+    @classmethod
+    def from_columns(cls, count, columns):
+        """Adopts prebuilt columns: arrays, or (data, ends) pairs for strings."""
+        store = cls()
+        for key, column in columns.items():
+            if isinstance(column, tuple):
+                column = _StringColumn(*column)
+            store._columns[key] = column
+        store._count = count
+        return store
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("result index out of range")
+        return ResultRow(self, index)
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield ResultRow(self, index)
+
+    def keys(self):
+        return self._columns.keys()
+
+    def column(self, key):
+        """The raw column for `key`: an array, or a string column."""
+        return self._columns[key]
+
+    def column_kind(self, key):
+        """Returns "q" for ints, "d" for floats or "s" for strings."""
+        column = self._columns[key]
+        return "s" if isinstance(column, _StringColumn) else column.typecode
+
+    def column_kinds(self):
+        """Returns {key: kind} for every column, in key order."""
+        return {key: self.column_kind(key) for key in self._columns}
+
+    def value(self, index, key, default=None):
+        column = self._columns.get(key)
+        if column is None:
+            return default
+        return column[index]
+
+    def append(self, item):
+        """Adds one row from a dict or a ResultRow."""
+        if not self._columns:
+            self._columns = {key: _new_column(value) for key, value in item.items()}
+        elif len(item) != len(self._columns):
+            raise KeyError(f"row keys {list(item)} do not match {list(self._columns)}")
+        try:
+            for key, column in self._columns.items():
+                value = item[key]
+                if isinstance(value, bool):
+                    # An int or float column would take it as 0 or 1.
+                    raise TypeError(f"column {key!r} cannot hold bool values")
+                try:
+                    column.append(value)
+                except TypeError:
+                    self._promote(key, value).append(value)
+        except (KeyError, TypeError, OverflowError):
+            # Undo the columns this row already reached.
+            self._truncate(self._count)
+            if not self._count:
+                self._columns = {}
+            raise
+        self._count += 1
+
+    def extend(self, items):
+        """Adds rows from another store (column by column) or any iterable."""
+        if not isinstance(items, ResultStore):
+            for item in items:
+                self.append(item)
+            return
+        if not items._count:
+            return
+        if not self._columns:
+            for key, column in items._columns.items():
+                self._columns[key] = _new_column(column[0])
+        if items.keys() != self._columns.keys():
+            raise KeyError(
+                f"keys {list(items.keys())} do not match {list(self.keys())}"
+            )
+        for key in self._columns:
+            kind, other_kind = self.column_kind(key), items.column_kind(key)
+            if kind != other_kind and "s" in (kind, other_kind):
+                raise TypeError(f"column {key!r} mixes strings and numbers")
+        for key, column in self._columns.items():
+            other = items._columns[key]
+            if self.column_kind(key) == items.column_kind(key):
+                column.extend(other)
+            else:
+                # One side holds ints and the other floats.
+                self._promote(key, 0.0).extend(array("d", other))
+        self._count += items._count
+
+    def copy(self):
+        return ResultStore(self)
+
+    # --- NEW: Lets a refreshed result set be applied to the one on screen ---
+    def diff(self, newer):
+        """
+        Compares these results with a newer version of them, row by row.
+        Columns are compared as whole buffers, then in blocks, so only
+        blocks that differ are walked value by value.
+        """
+        common = min(self._count, newer._count)
+        added, removed = newer._count - common, self._count - common
+        if self.keys() != newer.keys() or any(
+            self.column_kind(key) != newer.column_kind(key) for key in self.keys()
+        ):
+            return ResultDiff(None, added, removed, same_columns=False)
+        changed = set()
+        for key, column in self._columns.items():
+            changed.update(_changed_rows(column, newer._columns[key], common))
+        return ResultDiff(sorted(changed), added, removed)
+
+    @property
+    def nbytes(self):
+        """The bytes held by the columns' buffers."""
+        return sum(
+            (
+                column.nbytes
+                if isinstance(column, _StringColumn)
+                else len(column) * column.itemsize
+            )
+            for column in self._columns.values()
+        )
+
+    def _truncate(self, count):
+        for column in self._columns.values():
+            if isinstance(column, _StringColumn):
+                column.truncate(count)
+            else:
+                del column[count:]
+
+    def _promote(self, key, value):
+        column = self._columns[key]
+        if self.column_kind(key) == "d" and isinstance(value, (int, float)):
+            return column
+        if self.column_kind(key) == "q" and isinstance(value, float):
+            self._columns[key] = array("d", column)
+            return self._columns[key]
+        raise TypeError(f"column {key!r} cannot hold {type(value).__name__} values")
+
+
+# --- NEW: One byte layout for whole stores, for the process pool and the cache ---
+def _column_buffers(column):
+    if isinstance(column, _StringColumn):
+        return (column.ends, column.data)
+    return (column,)
+
+
+def store_layout(store):
+    """
+    Describes the bytes `store_buffers` yields, as JSON-ready data:
+    {"count": rows, "columns": [[key, kind, byte length], ...]}. Columns
+    follow each other in that order; a string column is its end offsets
+    followed by its UTF-8 data.
+    """
+    return {
+        "count": len(store),
+        "columns": [
+            [
+                key,
+                store.column_kind(key),
+                sum(memoryview(b).nbytes for b in _column_buffers(column)),
+            ]
+            for key, column in store._columns.items()
+        ],
+    }
+
+
+def store_buffers(store):
+    """Yields the column buffers `store_layout` describes, without copying."""
+    for column in store._columns.values():
+        yield from _column_buffers(column)
+
+
+def store_from_buffer(layout, buffer):
+    """
+    Rebuilds a store from `store_layout` output and a bytes-like object
+    holding the buffers end to end. Columns are copied out whole.
+    """
+    count = layout["count"]
+    columns = {}
+    with memoryview(buffer) as view:
+        if view.nbytes < sum(nbytes for _, _, nbytes in layout["columns"]):
+            raise ValueError("buffer is shorter than its layout")
+        position = 0
+        for key, kind, nbytes in layout["columns"]:
+            end = position + nbytes
+            if kind == "s":
+                ends = array("Q")
+                split = position + count * ends.itemsize
+                ends.frombytes(view[position:split])
+                columns[key] = (bytearray(view[split:end]), ends)
+            else:
+                values = array(kind)
+                values.frombytes(view[position:end])
+                columns[key] = values
+            position = end
+    return ResultStore.from_columns(count, columns)
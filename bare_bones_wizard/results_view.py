@@ -0,0 +1,360 @@
+# results_view.py
+from card_widget import THUMBNAIL_REQUESTS, thumbnail_url
+from PySide6.QtCore import (
+    QAbstractListModel,
+    QModelIndex,
+    QRect,
+    QSize,
+    Qt,
+    QTimer,
+    Signal,
+    Slot,
+)
+from PySide6.QtGui import QColor, QPen, QPixmap
+from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QListView,
+    QStyle,
+    QStyledItemDelegate,
+)
+from result_store import ResultStore
+from thumbnail_cache import THUMBNAIL_CACHE
+from thumbnail_loader import THUMBNAIL_SIZE
+
+CARD_HEIGHT = 150
+# Pending thumbnails further than this many rows from the viewport are cancelled.
+CANCEL_DISTANCE_ROWS = 50
+# Rows laid out per event loop pass after a reset (about 6 us each).
+LAYOUT_BATCH_ROWS = 250
+
+
+class ResultsModel(QAbstractListModel):
+    """
+    A flat list model over a ResultStore of worker results.
+    Thumbnails are only fetched for rows the view actually asks to paint.
+
+    With a SearchResult set through `set_view`, the model lists only its
+    rows, in its order. Model rows are then positions in the search result;
+    `store_row` and `view_row` convert between the two.
+    """
+
+    ItemDataRole = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._results = ResultStore()
+        # Rows whose thumbnail request failed; they are not retried.
+        self._failed = set()
+        # Maps a row to its pending thumbnail subscription.
+        self._requests = {}
+        # --- NEW: The current search result, or None for every row ---
+        self._view = None
+
+    def set_results(self, results):
+        """
+        Replaces the whole result set. A ResultStore is used in place, not
+        copied, and later `append_results` calls extend it.
+        """
+        self.beginResetModel()
+        self.abort_downloads()
+        if not isinstance(results, ResultStore):
+            results = ResultStore(results or [])
+        self._results = results
+        self._view = None
+        self._failed.clear()
+        self.endResetModel()
+
+    def set_view(self, view):
+        """
+        Shows only the rows of a SearchResult, or every row for None.
+        Thumbnail state is kept per store row, so nothing is fetched again.
+        """
+        self.beginResetModel()
+        self._view = view
+        self.endResetModel()
+
+    def store_row(self, position):
+        return self._view.row(position) if self._view is not None else position
+
+    def view_row(self, row):
+        """The model row showing store row `row`, or None if it is filtered out."""
+        return self._view.position(row) if self._view is not None else row
+
+    def append_results(self, results):
+        """Adds rows at the end, e.g. while a worker is still streaming."""
+        if not results:
+            return
+        if self._view is not None:
+            # A search result only covers the rows it was built from.
+            self._results.extend(results)
+            return
+        first = len(self._results)
+        self.beginInsertRows(QModelIndex(), first, first + len(results) - 1)
+        self._results.extend(results)
+        self.endInsertRows()
+
+    # --- NEW: Applies a refresh without resetting the view ---
+    def update_results(self, results, changed_rows):
+        """
+        Swaps in a newer version of the results that keeps every row at its
+        place and may add rows at the end. Only `changed_rows` are repainted,
+        so the view keeps its scroll position and selection.
+        """
+        first = len(self._results)
+        if len(results) > first:
+            self.beginInsertRows(QModelIndex(), first, len(results) - 1)
+            self._results = results
+            self.endInsertRows()
+        self._results = results
+        if not changed_rows:
+            return
+        for row in changed_rows:
+            # The row may show another id now; fetch its thumbnail afresh.
+            self._failed.discard(row)
+            subscription = self._requests.pop(row, None)
+            if subscription is not None:
+                THUMBNAIL_REQUESTS.cancel(subscription)
+        self.dataChanged.emit(
+            self.index(self.view_row(changed_rows[0])),
+            self.index(self.view_row(changed_rows[-1])),
+        )
+
+    def rowCount(self, parent=None):
+        if parent is not None and parent.isValid():
+            return 0
+        return self._view.count if self._view is not None else len(self._results)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.store_row(index.row())
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._results.value(row, "name", "No Name")
+        if role == self.ItemDataRole:
+            # A row view; nothing is copied out of the store.
+            return self._results[row]
+        if role == Qt.ItemDataRole.DecorationRole:
+            # Decoded pixmaps live in the shared cache, not in the model.
+            pixmap, is_fresh = THUMBNAIL_CACHE.lookup(self._thumbnail_url(row))
+            if not is_fresh and row not in self._requests and row not in self._failed:
+                self._start_download(row)
+            if pixmap is None and row in self._failed:
+                return QPixmap()
+            return pixmap
+        return None
+
+    def _thumbnail_url(self, row):
+        return thumbnail_url(self._results.value(row, "id", 0))
+
+    def _start_download(self, row):
+        """Subscribes to the (possibly shared) thumbnail request for a row."""
+        self._requests[row] = THUMBNAIL_REQUESTS.subscribe(
+            self._thumbnail_url(row),
+            lambda pixmap, error: self._on_request_finished(row, pixmap, error),
+        )
+
+    def _on_request_finished(self, row, pixmap, error):
+        del self._requests[row]
+        if error is not None:
+            print(f"Network Error: {error}")
+        if pixmap is None:
+            self._failed.add(row)
+        position = self.view_row(row)
+        if position is None:
+            return
+        index = self.index(position)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+    def update_download_priorities(self, first_row, last_row):
+        """
+        Ranks pending thumbnails by their distance in rows from the visible
+        range, and cancels the ones that scrolled far away. Cancelled rows are
+        requested again if they are painted later. Rows the current search
+        filtered out are cancelled too.
+        """
+        for row, subscription in list(self._requests.items()):
+            position = self.view_row(row)
+            if position is None:
+                distance = CANCEL_DISTANCE_ROWS + 1
+            elif position < first_row:
+                distance = first_row - position
+            elif position > last_row:
+                distance = position - last_row
+            else:
+                distance = 0
+            if distance > CANCEL_DISTANCE_ROWS:
+                THUMBNAIL_REQUESTS.cancel(subscription)
+                del self._requests[row]
+            else:
+                THUMBNAIL_REQUESTS.set_priority(subscription, -distance)
+
+    def abort_downloads(self):
+        """Cancels every pending thumbnail subscription."""
+        for subscription in self._requests.values():
+            THUMBNAIL_REQUESTS.cancel(subscription)
+        self._requests.clear()
+
+
+class CardDelegate(QStyledItemDelegate):
+    """Paints a result row so it looks like a CardWidget, without any widgets."""
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), CARD_HEIGHT)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        card_rect = option.rect.adjusted(4, 4, -4, -4)
+
+        # --- Card frame; selection uses the same colour as CardWidget ---
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.setPen(QPen(QColor("#0078d4"), 2))
+        else:
+            painter.setPen(QPen(option.palette.mid().color(), 1))
+        painter.drawRect(card_rect)
+
+        name_height = option.fontMetrics.height()
+        top = (
+            card_rect.top()
+            + (card_rect.height() - THUMBNAIL_SIZE.height() - name_height - 6) // 2
+        )
+        thumb_rect = QRect(
+            card_rect.left() + (card_rect.width() - THUMBNAIL_SIZE.width()) // 2,
+            top,
+            THUMBNAIL_SIZE.width(),
+            THUMBNAIL_SIZE.height(),
+        )
+
+        # --- Thumbnail, or the same placeholder text CardWidget shows ---
+        pixmap = index.data(Qt.ItemDataRole.DecorationRole)
+        painter.setPen(QPen(QColor("gray"), 1))
+        painter.drawRect(thumb_rect)
+        painter.setPen(option.palette.text().color())
+        if pixmap is None:
+            painter.drawText(thumb_rect, Qt.AlignmentFlag.AlignCenter, "Loading...")
+        elif pixmap.isNull():
+            painter.drawText(thumb_rect, Qt.AlignmentFlag.AlignCenter, "Error")
+        else:
+            # Already decoded at this size and ratio; no scaling while painting.
+            pixmap_rect = QRect(
+                thumb_rect.topLeft(), pixmap.deviceIndependentSize().toSize()
+            )
+            pixmap_rect.moveCenter(thumb_rect.center())
+            painter.drawPixmap(pixmap_rect.topLeft(), pixmap)
+
+        name_rect = QRect(
+            card_rect.left(), thumb_rect.bottom() + 6, card_rect.width(), name_height
+        )
+        painter.drawText(
+            name_rect,
+            Qt.AlignmentFlag.AlignCenter,
+            index.data(Qt.ItemDataRole.DisplayRole),
+        )
+        painter.restore()
+
+
+class ResultsView(QListView):
+    """
+    A virtualized replacement for the scroll area of CardWidgets.
+    Only rows inside the viewport are ever painted or asked for data.
+    """
+
+    # Both carry a ResultRow; `selected` carries None when nothing is selected
+    # or the selected row is filtered out.
+    selected = Signal(object)
+    chosen = Signal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.results_model = ResultsModel(self)
+        self.setModel(self.results_model)
+        self.setItemDelegate(CardDelegate(self))
+        # Uniform rows let the view compute geometry without visiting items,
+        # and batched layout spreads the row bookkeeping over several event
+        # loop passes so the first screen is painted right after a reset.
+        # --- CHANGE: Smaller batches; every search keystroke is a reset, and
+        # a pass over 1000 rows alone took most of a 10 ms keystroke ---
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setBatchSize(LAYOUT_BATCH_ROWS)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        # --- CHANGE: Ctrl/Shift multi-selection, like the card list ---
+        self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        # --- CHANGE: `selected` follows the selection, not just the current
+        # row, so Ctrl-clicking the last selected row off reports None ---
+        self.selectionModel().currentRowChanged.connect(self._on_selection_changed)
+        self.selectionModel().selectionChanged.connect(self._on_selection_changed)
+        self.doubleClicked.connect(self._on_double_clicked)
+        # --- Re-rank pending thumbnails once scrolling settles ---
+        self._priority_timer = QTimer(self)
+        self._priority_timer.setSingleShot(True)
+        self._priority_timer.setInterval(50)
+        self._priority_timer.timeout.connect(self._update_download_priorities)
+        self.verticalScrollBar().valueChanged.connect(
+            lambda _: self._priority_timer.start()
+        )
+
+    def set_results(self, results):
+        self.results_model.set_results(results)
+
+    def append_results(self, results):
+        self.results_model.append_results(results)
+
+    def set_view(self, view):
+        """
+        Filters and orders the rows by a SearchResult (None shows them all).
+        The selected result stays selected if it is still listed; otherwise
+        `selected` is emitted with None.
+        """
+        current = self.currentIndex()
+        row = self.results_model.store_row(current.row()) if current.isValid() else None
+        self.results_model.set_view(view)
+        if row is not None:
+            position = self.results_model.view_row(row)
+            if position is not None:
+                self.setCurrentIndex(self.results_model.index(position))
+                self.scrollTo(self.currentIndex())
+            else:
+                self.selected.emit(None)
+        # Pending thumbnails for rows that left the list are cancelled.
+        self._priority_timer.start()
+
+    def clear(self):
+        self.results_model.set_results(ResultStore())
+
+    def selected_items(self):
+        """ResultRows of the selected rows, in list order."""
+        rows = sorted(index.row() for index in self.selectionModel().selectedIndexes())
+        return [
+            self.results_model.index(row).data(ResultsModel.ItemDataRole)
+            for row in rows
+        ]
+
+    def selected_item(self):
+        """The current row's item if it is selected, else any selected item."""
+        current = self.currentIndex()
+        if current.isValid() and self.selectionModel().isSelected(current):
+            return current.data(ResultsModel.ItemDataRole)
+        selected = self.selectionModel().selectedIndexes()
+        if selected:
+            return selected[0].data(ResultsModel.ItemDataRole)
+        return None
+
+    def _update_download_priorities(self):
+        rect = self.viewport().rect()
+        first = self.indexAt(rect.topLeft())
+        last = self.indexAt(rect.bottomLeft())
+        if not first.isValid():
+            if not self.model().rowCount():
+                # Nothing listed, e.g. a search with no matches: cancel all.
+                self.results_model.abort_downloads()
+            return
+        last_row = last.row() if last.isValid() else self.model().rowCount() - 1
+        self.results_model.update_download_priorities(first.row(), last_row)
+
+    def _on_selection_changed(self, *args):
+        self.selected.emit(self.selected_item())
+
+    @Slot(QModelIndex)
+    def _on_double_clicked(self, index):
+        self.chosen.emit(index.data(ResultsModel.ItemDataRole))
@@ -0,0 +1,86 @@
+# search_bar.py
+from PySide6.QtCore import Qt, Signal, Slot
+from PySide6.QtWidgets import (
+    QComboBox,
+    QHBoxLayout,
+    QLabel,
+    QLineEdit,
+    QToolButton,
+    QWidget,
+)
+
+
+class SearchBar(QWidget):
+    """
+    A search box with a sort field and direction for the RESULTS page.
+    Emits `changed(text, field, descending)` on every edit; a `field` of None
+    means the order the results arrived in.
+    """
+
+    changed = Signal(str, object, bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Search results")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.textChanged.connect(self._emit_changed)
+        layout.addWidget(self.search_edit, 1)
+
+        self.sort_box = QComboBox()
+        self.sort_box.currentIndexChanged.connect(self._emit_changed)
+        layout.addWidget(self.sort_box)
+
+        self.direction_button = QToolButton()
+        self.direction_button.setCheckable(True)
+        self.direction_button.setArrowType(Qt.ArrowType.UpArrow)
+        self.direction_button.setToolTip("Sort descending")
+        self.direction_button.toggled.connect(self._on_direction_toggled)
+        layout.addWidget(self.direction_button)
+
+        self.count_label = QLabel()
+        layout.addWidget(self.count_label)
+
+        self.set_fields([])
+        self.setEnabled(False)
+
+    def set_fields(self, fields):
+        """Offers `fields` as sort keys, after the arrival order."""
+        self.sort_box.blockSignals(True)
+        self.sort_box.clear()
+        self.sort_box.addItem("Original order", None)
+        for field in fields:
+            self.sort_box.addItem(f"Sort by {field}", field)
+        self.sort_box.blockSignals(False)
+
+    def set_match_count(self, count, total):
+        self.count_label.setText(f"{count} of {total}" if count != total else "")
+
+    def clear(self):
+        """Resets the query and sort without emitting `changed`."""
+        for widget in (self.search_edit, self.sort_box, self.direction_button):
+            widget.blockSignals(True)
+        self.search_edit.clear()
+        self.sort_box.setCurrentIndex(0)
+        self.direction_button.setChecked(False)
+        self.direction_button.setArrowType(Qt.ArrowType.UpArrow)
+        for widget in (self.search_edit, self.sort_box, self.direction_button):
+            widget.blockSignals(False)
+        self.count_label.clear()
+
+    @Slot(bool)
+    def _on_direction_toggled(self, descending):
+        self.direction_button.setArrowType(
+            Qt.ArrowType.DownArrow if descending else Qt.ArrowType.UpArrow
+        )
+        self._emit_changed()
+
+    def _emit_changed(self, *args):
+        self.changed.emit(
+            self.search_edit.text(),
+            self.sort_box.currentData(),
+            self.direction_button.isChecked(),
+        )
@@ -0,0 +1,437 @@
+# search_index.py
+import gc
+import heapq
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from itertools import accumulate, chain, islice, repeat
+from operator import le
+
+from PySide6.QtCore import QObject, Signal
+
+# Query words match result words that start with them.
+WORD_PATTERN = re.compile(r"\w+")
+_NON_WORD = re.compile(r"\W")
+# Prefixes matching more rows than this are kept as precomputed bitmaps;
+# smaller ones are intersected as sets at query time.
+SPARSE_LIMIT = 20_000
+# At most this many bitmaps are precomputed per sort field. Dense prefixes
+# beyond it are built on first use and cached.
+MAX_BITMAPS = 256
+# The build works through this many rows (or words) at a time. Each step is
+# a few C calls that hold the GIL, so it must stay short for the GUI thread
+# to get a turn, and cancellation is checked between steps.
+BUILD_CHUNK_ROWS = 5_000
+# Bitmaps are counted in blocks of this many bytes (4096 rows) so a
+# position can be found without walking every bit before it.
+_BLOCK_BYTES = 512
+_POPCOUNT = bytes(value.bit_count() for value in range(256))
+# Sorts after every character a word can continue with.
+_LAST_CHAR = "\U0010ffff"
+# Maps a 0/1 byte mask to the ASCII digits int(..., 2) parses.
+_BINARY_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class SearchResult:
+    """
+    The rows matching one query, in the order of one sort field.
+
+    `row(position)` maps a position in the filtered, sorted list to a store
+    row and `position(row)` maps back, returning None for rows that do not
+    match. Both are cheap, so a view can ask for exactly the rows it paints.
+    """
+
+    def __init__(self, order, rank, count, descending):
+        # order[k] is the store row with rank k; rank is its inverse.
+        self.order = order
+        self.rank = rank
+        self.count = count
+        self.descending = descending
+
+    def row(self, position):
+        if self.descending:
+            position = self.count - 1 - position
+        return self.order[self._rank_at(position)]
+
+    def position(self, row):
+        position = self._position_of_rank(self.rank[row])
+        if position is None or not self.descending:
+            return position
+        return self.count - 1 - position
+
+    def _rank_at(self, position):
+        raise NotImplementedError
+
+    def _position_of_rank(self, rank):
+        raise NotImplementedError
+
+
+class _AllRows(SearchResult):
+    def _rank_at(self, position):
+        return position
+
+    def _position_of_rank(self, rank):
+        return rank
+
+
+class _SparseRows(SearchResult):
+    """Matches held as a sorted array of ranks."""
+
+    def __init__(self, order, rank, ranks, descending):
+        super().__init__(order, rank, len(ranks), descending)
+        self.ranks = ranks
+
+    def _rank_at(self, position):
+        return self.ranks[position]
+
+    def _position_of_rank(self, rank):
+        position = bisect_left(self.ranks, rank)
+        if position < len(self.ranks) and self.ranks[position] == rank:
+            return position
+        return None
+
+
+class _BitmapRows(SearchResult):
+    """Matches held as a bitmap over ranks, with a running count per block."""
+
+    def __init__(self, order, rank, bitmap, descending):
+        super().__init__(order, rank, bitmap.bit_count(), descending)
+        self.bits = bitmap.to_bytes((len(order) + 7) // 8, "little")
+        self.block_counts = [0]
+        for start in range(0, len(self.bits), _BLOCK_BYTES):
+            block = self.bits[start : start + _BLOCK_BYTES]
+            self.block_counts.append(
+                self.block_counts[-1] + int.from_bytes(block, "little").bit_count()
+            )
+
+    def _rank_at(self, position):
+        block = bisect_right(self.block_counts, position) - 1
+        remaining = position - self.block_counts[block]
+        offset = block * _BLOCK_BYTES
+        while True:
+            byte = self.bits[offset]
+            if remaining < _POPCOUNT[byte]:
+                break
+            remaining -= _POPCOUNT[byte]
+            offset += 1
+        for bit in range(8):
+            if byte >> bit & 1:
+                if not remaining:
+                    return offset * 8 + bit
+                remaining -= 1
+
+    def _position_of_rank(self, rank):
+        offset, bit = divmod(rank, 8)
+        if not self.bits[offset] >> bit & 1:
+            return None
+        block = offset // _BLOCK_BYTES
+        before = self.bits[block * _BLOCK_BYTES : offset]
+        return (
+            self.block_counts[block]
+            + int.from_bytes(before, "little").bit_count()
+            + (self.bits[offset] & ((1 << bit) - 1)).bit_count()
+        )
+
+
+class SearchIndex:
+    """
+    Word-prefix search and per-field sort orders over a ResultStore.
+
+    Building does all per-row work up front, so it belongs off the GUI
+    thread. After that, `search` only bisects sorted words, intersects
+    small row sets and ANDs precomputed bitmaps, so each keystroke stays
+    in the low milliseconds even for a million rows.
+
+    Every distinct lowercase word of `text_field` is kept once, in sorted
+    order, with the rows containing it grouped behind it. All words sharing
+    a prefix are therefore one contiguous range of rows.
+    """
+
+    def __init__(self, store, text_field="name", token=None):
+        self.store = store
+        self.count = len(store)
+        self._token = token
+        self._text_field = text_field
+        self._build_words(store, text_field)
+        # field -> (order, rank); None sorts by row, i.e. arrival order.
+        self._orders = {None: (range(self.count), range(self.count))}
+        for field in self.fields():
+            self._orders[field] = self._build_order(store, field)
+        # (field, first, last) -> bitmap over that field's ranks
+        self._bitmaps = {}
+        self._all_rows = (1 << self.count) - 1
+        for first, last in islice(self._dense_ranges(), MAX_BITMAPS):
+            for field in self._orders:
+                self._bitmap(field, first, last)
+        # Only the build can be cancelled; queries always finish.
+        self._token = None
+        self._texts = None
+
+    def fields(self):
+        return list(self.store.keys())
+
+    def search(self, text, field=None, descending=False):
+        """
+        Returns a SearchResult for the rows where every word of `text` starts
+        a word of the text field, ordered by `field` (None keeps row order).
+        """
+        order, rank = self._orders[field]
+        ranges = sorted(
+            (self._range(word) for word in set(WORD_PATTERN.findall(text.lower()))),
+            key=lambda r: r[1] - r[0],
+        )
+        if not ranges:
+            return _AllRows(order, rank, self.count, descending)
+
+        first, last = ranges[0]
+        if last - first > SPARSE_LIMIT:
+            # Every word is common: AND their bitmaps.
+            bitmap = self._bitmap(field, first, last)
+            for other in ranges[1:]:
+                bitmap &= self._bitmap(field, *other)
+            return _BitmapRows(order, rank, bitmap, descending)
+
+        # Start from the rarest word and narrow down.
+        ranks = self._ranks(rank, first, last)
+        for other_first, other_last in ranges[1:]:
+            if not ranks:
+                break
+            if other_last - other_first > SPARSE_LIMIT:
+                bitmap = self._bitmap(field, other_first, other_last)
+                if bitmap == self._all_rows:
+                    # A word every row has filters nothing.
+                    continue
+                bits = bitmap.to_bytes((self.count + 7) // 8, "little")
+                ranks = {k for k in ranks if bits[k >> 3] >> (k & 7) & 1}
+            else:
+                ranks &= self._ranks(rank, other_first, other_last)
+        return _SparseRows(order, rank, array("I", sorted(ranks)), descending)
+
+    def _ranks(self, rank, first, last):
+        """The ranks of the rows in [first, last) of the word index, as a set."""
+        if isinstance(rank, range):
+            return set(self._rows[first:last])
+        return set(map(rank.__getitem__, self._rows[first:last]))
+
+    # --- Building ---
+    # Per-row work is done with map(), sorted() and friends so the loops run
+    # in C, but only BUILD_CHUNK_ROWS at a time: one C call over a million
+    # rows holds the GIL, and so stalls the GUI thread, for a second or more.
+    # Large sorts are done per chunk and the sorted chunks merged by
+    # heapq.merge, which runs as Python code and lets other threads in.
+
+    def _check(self):
+        if self._token is not None and self._token.is_cancelled:
+            raise _Cancelled()
+
+    def _chunks(self, first, last):
+        """Splits [first, last) into build steps, checking for a cancel before each."""
+        for start in range(first, last, BUILD_CHUNK_ROWS):
+            self._check()
+            # The build allocates few tracked objects, so left alone the young
+            # generations are collected late, after the index's lists have
+            # grown to a row each; walking those stalls every thread. Collecting
+            # them each step moves the lists to the old generation while small.
+            gc.collect(1)
+            yield start, min(start + BUILD_CHUNK_ROWS, last)
+
+    def _build_words(self, store, text_field):
+        self._texts = []
+        # Per chunk: its words in row order, the row of each, and its
+        # distinct words sorted. Nothing here keeps a list per row, which
+        # would give the garbage collector a million objects to walk.
+        chunks = []
+        if text_field in self.fields():
+            for first, last in self._chunks(0, self.count):
+                texts, spaced = _column_texts(store, text_field, first, last)
+                self._texts.extend(texts)
+                # Same words as WORD_PATTERN finds, but str.split is much faster.
+                words = list(chain.from_iterable(map(str.split, spaced)))
+                rows = array(
+                    "I",
+                    chain.from_iterable(
+                        map(
+                            repeat, range(first, last), map(len, map(str.split, spaced))
+                        )
+                    ),
+                )
+                chunks.append((words, rows, sorted(set(words))))
+
+        self._words = []
+        merged = heapq.merge(*(distinct for _, _, distinct in chunks))
+        for _ in self._chunks(0, sum(len(distinct) for _, _, distinct in chunks)):
+            for word in islice(merged, BUILD_CHUNK_ROWS):
+                if not self._words or word != self._words[-1]:
+                    self._words.append(word)
+
+        # Word ids per chunk, looked up through a small per-chunk dict; one
+        # dict over every word would be a long pause for the collector.
+        counts = array("I", bytes(4 * len(self._words)))
+        for index, (words, rows, distinct) in enumerate(chunks):
+            self._check()
+            ids = map(bisect_left, repeat(self._words), distinct)
+            words = array("I", map(dict(zip(distinct, ids)).__getitem__, words))
+            chunks[index] = (words, rows)
+            for word in words:
+                counts[word] += 1
+
+        # Places rows chunk by chunk in row order, so rows stay ascending
+        # within a word. A word repeated in one row leaves a duplicate entry,
+        # which searching tolerates.
+        self._starts = array("I", [0])
+        for first, last in self._chunks(0, len(counts)):
+            self._starts.extend(
+                accumulate(counts[first:last], initial=self._starts[-1])
+            )
+            del self._starts[first]
+        positions = self._starts[:-1]
+        self._rows = array("I", bytes(4 * self._starts[-1]))
+        for words, rows in chunks:
+            self._check()
+            for word, row in zip(words, rows):
+                self._rows[positions[word]] = row
+                positions[word] += 1
+
+    def _build_order(self, store, field):
+        if store.column_kind(field) == "s" and field == self._text_field:
+            values = self._texts
+            key = values.__getitem__
+        elif store.column_kind(field) == "s":
+            values = None
+            column = store.column(field)
+
+            def key(row):
+                return column[row].lower()
+
+        else:
+            values = store.column(field)
+            key = values.__getitem__
+        if values is not None and self._is_sorted(values):
+            # Already in row order (ids usually are); share that permutation.
+            return self._orders[None]
+
+        runs = [
+            sorted(range(first, last), key=key)
+            for first, last in self._chunks(0, self.count)
+        ]
+        # Ties keep row order: runs are in row order and merge is stable.
+        merged = heapq.merge(*runs, key=key)
+        order = array("I")
+        for _ in self._chunks(0, self.count):
+            order.extend(islice(merged, BUILD_CHUNK_ROWS))
+        rank = array("I", bytes(4 * self.count))
+        for first, last in self._chunks(0, self.count):
+            _consume(map(rank.__setitem__, order[first:last], range(first, last)))
+        return order, rank
+
+    def _is_sorted(self, values):
+        for first, last in self._chunks(0, self.count):
+            # Each chunk also compares its last value with the next chunk's first.
+            end = min(last + 1, self.count)
+            if not all(map(le, values[first : end - 1], values[first + 1 : end])):
+                return False
+        return True
+
+    def _dense_ranges(self):
+        """Yields the distinct row ranges of prefixes matching many rows."""
+        seen = set()
+        stack = [("", 0, len(self._words))]
+        while stack:
+            prefix, low, high = stack.pop()
+            first, last = self._starts[low], self._starts[high]
+            if last - first <= SPARSE_LIMIT:
+                continue
+            if prefix and (first, last) not in seen:
+                seen.add((first, last))
+                yield first, last
+            # Split by the next character; a word equal to the prefix sorts first.
+            depth = len(prefix)
+            if low < high and len(self._words[low]) == depth:
+                low += 1
+            while low < high:
+                child = self._words[low][: depth + 1]
+                end = bisect_left(self._words, child + _LAST_CHAR, low, high)
+                stack.append((child, low, end))
+                low = end
+
+    def _range(self, prefix):
+        low = bisect_left(self._words, prefix)
+        high = bisect_left(self._words, prefix + _LAST_CHAR, low)
+        return self._starts[low], self._starts[high]
+
+    def _bitmap(self, field, first, last):
+        rank = self._orders[field][1]
+        if isinstance(rank, range):
+            # Every field sorted in row order shares the same bitmaps.
+            field = None
+        key = (field, first, last)
+        bitmap = self._bitmaps.get(key)
+        if bitmap is None:
+            # One byte per rank first, then packed into an int in one go.
+            mask = bytearray(self.count)
+            for start, end in self._chunks(first, last):
+                _consume(
+                    map(
+                        mask.__setitem__,
+                        map(rank.__getitem__, self._rows[start:end]),
+                        repeat(1),
+                    )
+                )
+            self._check()
+            bitmap = self._bitmaps[key] = int(
+                mask.translate(_BINARY_DIGITS)[::-1] or b"0", 2
+            )
+        return bitmap
+
+
+def _column_texts(store, field, first, last):
+    """
+    Returns rows [first, last) of a column lowercased, and the same values
+    with every non-word character replaced by a space. A string column is
+    decoded in one go rather than row by row when it is plain ASCII.
+    """
+    column = store.column(field)
+    if store.column_kind(field) != "s":
+        texts = [str(column[row]).lower() for row in range(first, last)]
+        return texts, [_NON_WORD.sub(" ", text) for text in texts]
+    start = column.ends[first - 1] if first else 0
+    data = column.data[start : column.ends[last - 1]]
+    text = data.decode("utf-8")
+    if len(text) != len(data):
+        # Multi-byte characters: byte offsets are not character offsets.
+        texts = [column[row].lower() for row in range(first, last)]
+        return texts, [_NON_WORD.sub(" ", text) for text in texts]
+    text = text.lower()
+    # One character for one, so the row offsets still apply.
+    spaced = _NON_WORD.sub(" ", text)
+    ends = [end - start for end in column.ends[first:last]]
+    return (
+        list(map(text.__getitem__, map(slice, chain((0,), ends), ends))),
+        list(map(spaced.__getitem__, map(slice, chain((0,), ends), ends))),
+    )
+
+
+def _consume(iterator):
+    deque(iterator, maxlen=0)
+
+
+class SearchIndexBuilder(QObject):
+    """Builds a SearchIndex on a TaskExecutor thread and hands it back."""
+
+    index_ready = Signal(object)
+
+    def __init__(self, store):
+        super().__init__()
+        self.store = store
+
+    def build(self, token=None):
+        try:
+            index = SearchIndex(self.store, token=token)
+        except _Cancelled:
+            return
+        self.index_ready.emit(index)
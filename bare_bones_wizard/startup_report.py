@@ -0,0 +1,52 @@
+# startup_report.py
+import time
+
+# Taken when this module is first imported; main.py imports it before
+# anything else, so every later import is counted.
+_STARTED = time.perf_counter()
+
+from PySide6.QtCore import QEvent, QObject, QTimer
+
+
+class StartupReport(QObject):
+    """
+    Times a cold start: how long main.py spent importing, creating the
+    QApplication and the window, and when the window first painted.
+
+    Phases are recorded with `mark(name)` as milliseconds since main.py
+    started. `watch_first_paint` records "first_paint" at the window's first
+    paint event and then calls `on_ready`. Interpreter start-up before
+    main.py runs is not included.
+    """
+
+    def __init__(self, started=_STARTED):
+        super().__init__()
+        self.started = started
+        # name -> ms since `started`, in the order they were marked
+        self.marks = {}
+        self._on_ready = None
+
+    def mark(self, name):
+        self.marks[name] = (time.perf_counter() - self.started) * 1000
+
+    def watch_first_paint(self, widget, on_ready=None):
+        self._on_ready = on_ready
+        widget.installEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Type.Paint and "first_paint" not in self.marks:
+            self.mark("first_paint")
+            watched.removeEventFilter(self)
+            if self._on_ready is not None:
+                # After this paint has been handled and flushed.
+                QTimer.singleShot(0, self._on_ready)
+        return False
+
+    def summary(self):
+        """One line, e.g. `Startup (ms): imports=80.1 ... first_paint=140.2`."""
+        return "Startup (ms): " + " ".join(
+            f"{name}={value:.1f}" for name, value in self.marks.items()
+        )
+
+
+STARTUP = StartupReport()
@@ -0,0 +1,140 @@
+# task_executor.py
+import threading
+import time
+
+from PySide6.QtCore import QCoreApplication, QObject, QRunnable, Qt, QThreadPool, Signal
+
+
+class CancellationToken:
+    """
+    A thread-safe flag a running task checks to stop early.
+    Tasks should wait with `sleep` instead of time.sleep so that a cancel
+    wakes them immediately.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def is_cancelled(self):
+        return self._event.is_set()
+
+    def sleep(self, seconds):
+        """Waits up to `seconds`; returns True if cancelled in the meantime."""
+        return self._event.wait(seconds)
+
+
+class _TaskRunner(QRunnable):
+    """Runs `task(token)` on a pool thread and keeps it alive until done."""
+
+    def __init__(self, executor, task, token):
+        super().__init__()
+        self.executor = executor
+        self.task = task
+        self.token = token
+
+    def run(self):
+        # An exception from the task is printed with its traceback by
+        # PySide and the thread goes back to the pool either way.
+        try:
+            if not self.token.is_cancelled:
+                self.task(self.token)
+        finally:
+            self.executor._task_done(self)
+
+
+class TaskExecutor(QObject):
+    """
+    A long-lived pool for wizard tasks.
+
+    Threads are created once and reused across runs instead of building a
+    QThread per run. Every task receives a CancellationToken; cancelling a
+    superseded run lets its thread go back to the pool right away.
+    """
+
+    def __init__(self, max_threads=2, parent=None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_threads)
+        # Never let idle threads expire, so runs after the first start instantly.
+        self._pool.setExpiryTimeout(-1)
+        self._runners = set()
+        self._lock = threading.Lock()
+
+    def submit(self, task):
+        """Starts `task(token)` on a pool thread and returns its token."""
+        token = CancellationToken()
+        runner = _TaskRunner(self, task, token)
+        with self._lock:
+            self._runners.add(runner)
+        self._pool.start(runner)
+        return token
+
+    def cancel_all(self):
+        with self._lock:
+            runners = list(self._runners)
+        for runner in runners:
+            runner.token.cancel()
+
+    def shutdown(self, timeout_ms=100):
+        """
+        Cancels every task and waits at most `timeout_ms` for them to return.
+        Returns False if a task did not stop in time.
+        """
+        return shutdown_executors([self], timeout_ms)
+
+    def _task_done(self, runner):
+        # Called on the pool thread.
+        with self._lock:
+            self._runners.discard(runner)
+
+
+def shutdown_executors(executors, timeout_ms=100):
+    """
+    Shuts several executors down within one `timeout_ms` in total: every
+    task on every executor is cancelled before any of them is waited for.
+    Returns False if a task did not stop in time.
+    """
+    for executor in executors:
+        executor.cancel_all()
+        executor._pool.clear()
+    deadline = time.monotonic() + timeout_ms / 1000
+    stopped = True
+    for executor in executors:
+        remaining_ms = max(0, round((deadline - time.monotonic()) * 1000))
+        stopped = executor._pool.waitForDone(remaining_ms) and stopped
+    return stopped
+
+
+class _GuiCaller(QObject):
+    """Runs functions handed over by worker threads on the GUI thread."""
+
+    called = Signal(object, object)
+
+    def __init__(self):
+        super().__init__()
+        app = QCoreApplication.instance()
+        if app is not None:
+            self.moveToThread(app.thread())
+        self.called.connect(self._call, Qt.ConnectionType.QueuedConnection)
+
+    def _call(self, function, args):
+        function(*args)
+
+
+# One long-lived sender for every worker. A notifier QObject per runner
+# was deleted and recreated thousands of times, and PySide now and then
+# failed an emit from a worker thread with "Signal source has been
+# deleted" while the notifier was alive, losing the result for good.
+_GUI_CALLER = _GuiCaller()
+
+
+def call_on_gui_thread(function, *args):
+    """
+    Calls `function(*args)` on the GUI thread from any thread. The call is
+    always queued, so it runs once the GUI thread is back in its event loop.
+    """
+    _GUI_CALLER.called.emit(function, args)
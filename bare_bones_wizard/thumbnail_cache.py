@@ -0,0 +1,210 @@
+# thumbnail_cache.py
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from disk_tier import DiskTier
+
+# How long a thumbnail is considered fresh when the server sends no max-age.
+DEFAULT_MAX_AGE = 24 * 60 * 60  # seconds
+
+
+class ThumbnailCache:
+    """
+    A two-tier thumbnail cache keyed by URL.
+
+    Decoded pixmaps live in a byte-bounded in-memory LRU. The encoded bytes
+    and their validators (ETag / Last-Modified) live in a size-bounded
+    directory on disk, so a stale entry can be revalidated with a
+    conditional request instead of being downloaded again.
+
+    The memory tier belongs to the GUI thread, like the pixmaps in it. Disk
+    tier methods block and are meant for a worker thread; they may run on
+    several at once.
+    """
+
+    def __init__(
+        self,
+        memory_limit=32 * 1024 * 1024,
+        disk_limit=128 * 1024 * 1024,
+        directory=None,
+    ):
+        self.memory_limit = memory_limit
+        # url -> (pixmap, cost in bytes, expires timestamp)
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._disk = DiskTier("thumbnails", disk_limit, (".img", ".json"), directory)
+        self._lock = threading.Lock()
+        # One of the first three per load: served from memory, served from a
+        # fresh disk entry, or sent to the network. Of the network loads,
+        # `revalidations` carried validators and `not_modified` got a 304.
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+            "revalidations": 0,
+            "not_modified": 0,
+        }
+
+    # --- Lookup ---
+
+    def lookup(self, url, load=False):
+        """
+        Returns (pixmap, is_fresh) from the memory tier, or (None, False).
+        This never touches the disk, so it is cheap enough to call from paint.
+        With `load`, a fresh entry counts as a memory hit; repaints pass
+        nothing, so they are not counted.
+        """
+        entry = self._memory.get(url)
+        if entry is None:
+            return None, False
+        self._memory.move_to_end(url)
+        is_fresh = entry[2] > time.time()
+        if load and is_fresh:
+            self.count("memory_hits")
+        return entry[0], is_fresh
+
+    def count(self, name):
+        """Adds one to `stats[name]`; safe from any thread."""
+        with self._lock:
+            self.stats[name] += 1
+
+    def disk_entry(self, url):
+        """
+        Returns (path, expires) for an entry in the disk tier, or None.
+        The file is decoded by the caller, typically off the GUI thread.
+        """
+        meta = self._read_meta(url)
+        if meta is None:
+            return None
+        self._touch(url)
+        return self._data_path(url), meta["expires"]
+
+    def insert(self, url, pixmap, expires):
+        """Adds a decoded pixmap to the memory tier."""
+        self._insert_memory(url, pixmap, expires)
+
+    # --- Download glue ---
+
+    def conditional_headers(self, url):
+        """Returns the validators to send for `url`, if we hold any."""
+        headers = {}
+        meta = self._read_meta(url)
+        if meta is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+            self.count("revalidations")
+        return headers
+
+    def refresh(self, url, response):
+        """
+        Applies a 304 response to the disk entry and returns its new expiry;
+        `renew` applies it to the memory tier.
+        """
+        self.count("not_modified")
+        expires = time.time() + _max_age(response)
+        meta = self._read_meta(url)
+        if meta is not None:
+            meta["expires"] = expires
+            try:
+                self._write_meta(url, meta)
+            except OSError as e:
+                print(f"Thumbnail cache: could not update {url}: {e}")
+        return expires
+
+    def renew(self, url, expires):
+        """Gives the memory entry for `url` a new expiry; returns its pixmap or None."""
+        entry = self._memory.get(url)
+        if entry is None:
+            return None
+        self._memory[url] = (entry[0], entry[1], expires)
+        return entry[0]
+
+    def store(self, url, data, response):
+        """Writes a 200 response's body to the disk tier and returns its expiry."""
+        expires = time.time() + _max_age(response)
+        self._store_disk(url, data, response, expires)
+        return expires
+
+    # --- Memory tier ---
+
+    def _insert_memory(self, url, pixmap, expires):
+        cost = pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+        old = self._memory.pop(url, None)
+        if old is not None:
+            self._memory_bytes -= old[1]
+        self._memory[url] = (pixmap, cost, expires)
+        self._memory_bytes += cost
+        while self._memory_bytes > self.memory_limit and len(self._memory) > 1:
+            _, (_, evicted_cost, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_cost
+            self.stats["memory_evictions"] += 1
+
+    # --- Disk tier ---
+
+    @property
+    def directory(self):
+        return self._disk.directory
+
+    def _key(self, url):
+        return self._disk.key(url)
+
+    def _data_path(self, url):
+        return self._disk.path(self._key(url), ".img")
+
+    def _meta_path(self, url):
+        return self._disk.path(self._key(url), ".json")
+
+    def _read_meta(self, url):
+        try:
+            with open(self._meta_path(url), encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url or not os.path.exists(self._data_path(url)):
+            return None
+        return meta
+
+    def _write_meta(self, url, meta):
+        with open(self._meta_path(url), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    def _touch(self, url):
+        self._disk.touch(self._key(url))
+
+    def _store_disk(self, url, data, response, expires):
+        meta = {
+            "url": url,
+            "etag": response.header("ETag"),
+            "last_modified": response.header("Last-Modified"),
+            "expires": expires,
+        }
+        try:
+            with open(self._data_path(url), "wb") as f:
+                f.write(data)
+            self._write_meta(url, meta)
+            evicted = self._disk.added(self._key(url), len(data))
+        except OSError as e:
+            print(f"Thumbnail cache: could not write {url}: {e}")
+            return
+        with self._lock:
+            self.stats["disk_evictions"] += evicted
+
+
+def _max_age(response):
+    """Reads max-age from Cache-Control, falling back to DEFAULT_MAX_AGE."""
+    cache_control = response.header("Cache-Control") or ""
+    if "no-cache" in cache_control or "no-store" in cache_control:
+        return 0
+    match = re.search(r"max-age=(\d+)", cache_control)
+    return int(match.group(1)) if match else DEFAULT_MAX_AGE
+
+
+THUMBNAIL_CACHE = ThumbnailCache()
@@ -0,0 +1,143 @@
+# thumbnail_loader.py
+import time
+
+from image_decoder import decode_image, run_on_decode_pool
+from instrumentation import INSTRUMENTATION
+from PySide6.QtCore import QSize
+from PySide6.QtGui import QGuiApplication, QPixmap
+from thumbnail_source import ThumbnailSource
+
+# The logical size every thumbnail is decoded to.
+THUMBNAIL_SIZE = QSize(128, 96)
+
+
+class _ThumbnailJob:
+    """
+    Loads one thumbnail: fresh disk entry, else a (conditional) network
+    request, then an off-thread decode. Calls `finish(pixmap, error)` once,
+    unless aborted first. Disk reads and writes run on DECODE_POOL; the
+    GUI thread only starts steps and handles their results.
+    """
+
+    def __init__(self, loader, url, finish):
+        self.loader = loader
+        self.url = url
+        self.finish = finish
+        self.transfer = None
+        self.decode_runner = None
+        self.is_aborted = False
+
+    def start(self):
+        self._on_disk(self._read_disk, self._on_disk_read)
+
+    def abort(self):
+        """Stops the job; `finish` will not be called."""
+        self.is_aborted = True
+        if self.transfer is not None:
+            self.transfer.abort()
+        if self.decode_runner is not None:
+            # A queued runner returns immediately once it sees the flag.
+            self.decode_runner.abort()
+
+    def _on_disk(self, function, callback):
+        run_on_decode_pool(
+            function, lambda result: None if self.is_aborted else callback(result)
+        )
+
+    def _read_disk(self):
+        # On DECODE_POOL: a fresh entry, or the headers for a request.
+        cache = self.loader.cache
+        entry = cache.disk_entry(self.url)
+        if entry is not None and entry[1] > time.time():
+            return entry, None
+        return None, cache.conditional_headers(self.url)
+
+    def _on_disk_read(self, result):
+        entry, headers = result
+        cache = self.loader.cache
+        if entry is not None:
+            cache.count("disk_hits")
+            self._decode(*entry)
+            return
+        cache.count("misses")
+        self.transfer = self.loader.engine.get(
+            self.url, self._on_response, headers=headers
+        )
+
+    @INSTRUMENTATION.timed
+    def _on_response(self, response, error):
+        self.transfer = None
+        cache = self.loader.cache
+        if error is not None:
+            # Serve a stale copy rather than nothing if we have one.
+            self._on_disk(
+                lambda: cache.disk_entry(self.url),
+                lambda entry: (
+                    self._decode(*entry)
+                    if entry is not None
+                    else self.finish(None, error)
+                ),
+            )
+            return
+
+        if response.status == 304:
+            self._on_disk(
+                lambda: (cache.refresh(self.url, response), cache.disk_entry(self.url)),
+                self._on_refreshed,
+            )
+            return
+
+        self._on_disk(
+            lambda: cache.store(self.url, response.body, response),
+            lambda expires: self._decode(response.body, expires),
+        )
+
+    def _on_refreshed(self, result):
+        expires, entry = result
+        pixmap = self.loader.cache.renew(self.url, expires)
+        if pixmap is not None:
+            self.finish(pixmap, None)
+        elif entry is None:
+            self.finish(None, "Cached thumbnail disappeared")
+        else:
+            self._decode(entry[0], expires)
+
+    def _decode(self, source, expires):
+        # The ratio is read on the GUI thread and applied by the decoder.
+        device_pixel_ratio = QGuiApplication.instance().devicePixelRatio()
+        self.decode_runner = decode_image(
+            source,
+            THUMBNAIL_SIZE,
+            device_pixel_ratio,
+            lambda image: self._on_decoded(image, expires),
+        )
+
+    def _on_decoded(self, image, expires):
+        self.decode_runner = None
+        if image.isNull():
+            self.finish(None, "Invalid image data")
+            return
+        pixmap = QPixmap.fromImage(image)
+        self.loader.cache.insert(self.url, pixmap, expires)
+        self.finish(pixmap, None)
+
+
+class ThumbnailLoader(ThumbnailSource):
+    """
+    Starts thumbnail jobs against a ThumbnailCache and a DownloadEngine.
+    `fetch` has the job signature RequestRegistry expects.
+    """
+
+    def __init__(self, engine, cache, url_template):
+        self.engine = engine
+        self.cache = cache
+        # `{id}` is replaced by the item id.
+        self.url_template = url_template
+
+    def url_for(self, item_id):
+        return self.url_template.format(id=item_id)
+
+    def fetch(self, url, finish):
+        job = _ThumbnailJob(self, url, finish)
+        job.start()
+        return job
@@ -0,0 +1,141 @@
+# thumbnail_source.py
+import threading
+from collections import OrderedDict
+
+from image_decoder import DECODE_POOL
+from PySide6.QtCore import QRunnable, QSize, Qt
+from PySide6.QtGui import QColor, QFont, QGuiApplication, QImage, QPainter, QPixmap
+from task_executor import call_on_gui_thread
+
+
+class ThumbnailSource:
+    """
+    Where thumbnails come from.
+
+    `url_for(item_id)` names an item's thumbnail; the name is the key used
+    by THUMBNAIL_CACHE and RequestRegistry. `fetch(url, finish)` has the job
+    signature RequestRegistry expects: it returns an object with `abort()`
+    and later calls `finish(pixmap, error)` on the GUI thread, never from
+    inside `fetch` itself.
+    """
+
+    def url_for(self, item_id):
+        raise NotImplementedError
+
+    def fetch(self, url, finish):
+        raise NotImplementedError
+
+
+class _RenderRunner(QRunnable):
+    """
+    Paints one placeholder on a pool thread, or reuses a memoized one, and
+    calls `callback(image)` on the GUI thread unless aborted first.
+    """
+
+    def __init__(self, renderer, text, size, device_pixel_ratio, callback):
+        super().__init__()
+        self.renderer = renderer
+        self.text = text
+        self.size = size
+        self.device_pixel_ratio = device_pixel_ratio
+        self.callback = callback
+        self.is_aborted = False
+
+    def abort(self):
+        self.is_aborted = True
+
+    def run(self):
+        if self.is_aborted:
+            return
+        image = self.renderer.render(self.text, self.size, self.device_pixel_ratio)
+        call_on_gui_thread(self._deliver, image)
+
+    def _deliver(self, image):
+        # On the GUI thread, where abort() is called too.
+        if not self.is_aborted:
+            self.callback(image)
+
+
+class LocalThumbnailRenderer(ThumbnailSource):
+    """
+    Paints the same "Item N" placeholder placehold.co serves, without the
+    network: light text centered on a dark background.
+
+    Painting happens on DECODE_POOL. Finished images are memoized per text,
+    size and pixel ratio, so the output is deterministic and each distinct
+    placeholder is only painted once.
+    """
+
+    SCHEME = "local:"
+
+    def __init__(
+        self,
+        cache,
+        size=None,
+        background="#222",
+        foreground="#FFF",
+        memo_limit=1024,
+    ):
+        self.cache = cache
+        self.size = QSize(128, 96) if size is None else size
+        self.background = QColor(background)
+        self.foreground = QColor(foreground)
+        self.memo_limit = memo_limit
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+
+    def url_for(self, item_id):
+        return f"{self.SCHEME}Item {item_id}"
+
+    def fetch(self, url, finish):
+        # The ratio is read on the GUI thread and applied by the runner.
+        device_pixel_ratio = QGuiApplication.instance().devicePixelRatio()
+
+        def on_rendered(image):
+            pixmap = QPixmap.fromImage(image)
+            # Never stale: the same text always paints the same image.
+            self.cache.insert(url, pixmap, float("inf"))
+            finish(pixmap, None)
+
+        runner = _RenderRunner(
+            self,
+            url.removeprefix(self.SCHEME),
+            self.size,
+            device_pixel_ratio,
+            on_rendered,
+        )
+        DECODE_POOL.start(runner)
+        return runner
+
+    def render(self, text, size, device_pixel_ratio=1.0):
+        """Returns the placeholder image; safe to call from any thread."""
+        key = (text, size.width(), size.height(), device_pixel_ratio)
+        with self._lock:
+            image = self._memo.get(key)
+            if image is not None:
+                self._memo.move_to_end(key)
+                return image
+
+        image = QImage(
+            round(size.width() * device_pixel_ratio),
+            round(size.height() * device_pixel_ratio),
+            QImage.Format.Format_ARGB32_Premultiplied,
+        )
+        image.setDevicePixelRatio(device_pixel_ratio)
+        image.fill(self.background)
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+        font = QFont()
+        font.setPixelSize(max(8, size.height() // 6))
+        painter.setFont(font)
+        painter.setPen(self.foreground)
+        painter.drawText(
+            0, 0, size.width(), size.height(), Qt.AlignmentFlag.AlignCenter, text
+        )
+        painter.end()
+
+        with self._lock:
+            self._memo[key] = image
+            while len(self._memo) > self.memo_limit:
+                self._memo.popitem(last=False)
+        return image
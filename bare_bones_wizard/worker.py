@@ -1,7 +1,37 @@
 # worker.py
+import json
 import time
 
 from PySide6.QtCore import QObject, Signal
+from result_store import ResultStore
+
+# The simulated task takes this long in total, spread evenly over its items.
+TASK_DURATION = 3  # seconds
+PROJECT_NAMES = ["Alpha", "Beta", "Gamma", "Delta"]
+# Bump when _make_result changes, so results cached by older code are not reused.
+RESULTS_VERSION = 1
+
+
+def _make_result(index):
+    return {"id": index + 1, "name": f"Project {PROJECT_NAMES[index]}"}
+
+
+# --- NEW: Names the task's inputs for the result cache ---
+def cache_key():
+    """Equal keys mean the task would produce equal results."""
+    return json.dumps(
+        {"task": "projects", "version": RESULTS_VERSION, "names": PROJECT_NAMES}
+    )
+
+
+# --- NEW: The same task, split into chunks that can run in another process ---
+def compute_results(first, last):
+    """Builds the results for items [first, last). Runs in a pool process."""
+    results = ResultStore()
+    for index in range(first, last):
+        time.sleep(TASK_DURATION / len(PROJECT_NAMES))
+        results.append(_make_result(index))
+    return results
 
 
 class Worker(QObject):
@@ -10,25 +40,181 @@ class Worker(QObject):
     Inherits from QObject to allow signal/slot communication.
     """
 
-    # Signal to emit when work is done. The list argument will carry our results.
-    work_finished = Signal(list)
+    # Signal to emit when work is done. The argument carries our results.
+    # --- CHANGE: Results travel as a ResultStore, passed by reference ---
+    work_finished = Signal(object)
+    # --- NEW: Streaming signals, emitted while the task is still running ---
+    batch_ready = Signal(object)
+    # Items done, total items, estimated seconds left (-1 while unknown).
+    progress_changed = Signal(int, int, float)
+    # --- NEW: Emitted instead of work_finished when a run is cancelled ---
+    work_cancelled = Signal()
+    # --- NEW: Emitted instead of work_finished by a refresh: the results and
+    # their ResultDiff against the previous ones ---
+    work_refreshed = Signal(object, object)
+
+    # A partial batch is flushed at least this often.
+    BATCH_INTERVAL = 0.1  # seconds
+
+    def __init__(self, process_pool=None, result_cache=None, previous=None):
+        """
+        With a ProcessPool, results are computed in its processes and this
+        object only forwards them, so the GUI thread never waits on the GIL.
+        With a ResultCache, finished results are stored under `cache_key()`.
+        With `previous` results, the run is a refresh of them: it ends with
+        work_refreshed, and the diff is computed on the worker's thread.
+        """
+        super().__init__()
+        self.process_pool = process_pool
+        self.result_cache = result_cache
+        self.previous = previous
+
+    def total(self):
+        """The number of results the task will produce."""
+        return len(PROJECT_NAMES)
+
+    def produce_results(self, token=None):
+        """
+        Yields results one at a time, simulating the cost of each.
+        Stops early, mid-wait, once `token` is cancelled.
+        """
+        if self.process_pool is not None:
+            yield from self._produce_in_processes(token)
+            return
+        for index in range(len(PROJECT_NAMES)):
+            delay = TASK_DURATION / len(PROJECT_NAMES)
+            if token is None:
+                time.sleep(delay)
+            elif token.sleep(delay):
+                return
+            yield _make_result(index)
+
+    def _chunks(self):
+        total = self.total()
+        # A few chunks per process keeps every core busy and results flowing.
+        size = max(1, total // (self.process_pool.max_workers * 4))
+        return [(first, min(first + size, total)) for first in range(0, total, size)]
+
+    def _produce_in_processes(self, token):
+        for results in self.process_pool.map_chunks(
+            compute_results, self._chunks(), token
+        ):
+            yield from results
+
+    # --- NEW: The same results from a coroutine, for the QtAsyncio mode ---
+    async def produce_results_async(self):
+        """
+        Yields results like produce_results, awaiting instead of blocking.
+        Cancelling the consuming task stops it mid-wait.
+        """
+        # Imported on use, so only the QtAsyncio mode pays for asyncio.
+        import asyncio
+
+        if self.process_pool is not None:
+            async for results in self.process_pool.map_chunks_async(
+                compute_results, self._chunks()
+            ):
+                for item in results:
+                    yield item
+            return
+        for index in range(len(PROJECT_NAMES)):
+            await asyncio.sleep(TASK_DURATION / len(PROJECT_NAMES))
+            yield _make_result(index)
 
-    def do_work(self):
+    def do_work(self, token=None):
         """
         The main task for the worker. This method will be executed in the background thread.
         """
         print("Worker thread: Starting a long task...")
         # Simulate a 3-second task, like fetching data from a server.
-        time.sleep(3)
-
-        # Simulate the results we got from the task.
-        results = [
-            {"id": 1, "name": "Project Alpha"},
-            {"id": 2, "name": "Project Beta"},
-            {"id": 3, "name": "Project Gamma"},
-            {"id": 4, "name": "Project Delta"},
-        ]
+        results = ResultStore(self.produce_results(token))
+        if token is not None and token.is_cancelled:
+            print("Worker thread: Task cancelled.")
+            self.work_cancelled.emit()
+            return
 
         print("Worker thread: Task complete. Emitting results.")
         # Emit the signal to send the results back to the main UI thread.
-        self.work_finished.emit(results)
+        self._finish(results)
+
+    def do_work_streaming(self, token=None):
+        """
+        Like do_work, but emits results in batches as they are produced.
+        The first result is sent on its own so the UI can show it right away;
+        later ones are grouped so the GUI thread is not flooded with signals.
+        """
+        print("Worker thread: Starting a long task (streaming)...")
+        stream = _ResultStream(self)
+        for item in self.produce_results(token):
+            stream.add(item)
+
+        if token is not None and token.is_cancelled:
+            print("Worker thread: Task cancelled.")
+            self.work_cancelled.emit()
+            return
+        print("Worker thread: Task complete. Emitting results.")
+        self._finish(stream.finish())
+
+    async def do_work_async(self):
+        """
+        do_work_streaming as a coroutine on the GUI thread's asyncio loop
+        (QtAsyncio). Cancel the task running it to stop the run.
+        """
+        import asyncio
+
+        print("Worker: Starting a long task (asyncio)...")
+        stream = _ResultStream(self)
+        try:
+            async for item in self.produce_results_async():
+                stream.add(item)
+            print("Worker: Task complete. Emitting results.")
+            # Off the event loop; caching and diffing large stores take a while.
+            await asyncio.to_thread(self._finish, stream.finish())
+        except asyncio.CancelledError:
+            print("Worker: Task cancelled.")
+            self.work_cancelled.emit()
+            raise
+
+    def _finish(self, results):
+        """Caches a finished run's results and emits them."""
+        if self.result_cache is not None:
+            self.result_cache.store(cache_key(), results)
+        if self.previous is None:
+            self.work_finished.emit(results)
+        else:
+            self.work_refreshed.emit(results, self.previous.diff(results))
+
+
+class _ResultStream:
+    """Collects one run's results and emits them through the streaming signals."""
+
+    def __init__(self, worker):
+        self.worker = worker
+        self.total = worker.total()
+        self.results = ResultStore()
+        self.batch = ResultStore()
+        self.start = self.last_flush = time.monotonic()
+        worker.progress_changed.emit(0, self.total, -1.0)
+
+    def add(self, item):
+        self.batch.append(item)
+        now = time.monotonic()
+        if not self.results or now - self.last_flush >= Worker.BATCH_INTERVAL:
+            self._flush(now)
+            self.last_flush = now
+
+    def finish(self):
+        """Flushes the last partial batch and returns every result."""
+        if self.batch:
+            self._flush(time.monotonic())
+        return self.results
+
+    def _flush(self, now):
+        self.results.extend(self.batch)
+        done = len(self.results)
+        # The receiver owns the emitted batch, so start a new one.
+        self.worker.batch_ready.emit(self.batch)
+        self.batch = ResultStore()
+        elapsed = now - self.start
+        eta = elapsed / done * (self.total - done) if done else -1.0
+        self.worker.progress_changed.emit(done, self.total, eta)
@@ -0,0 +1,651 @@
+# run.py
+"""
+Headless benchmarks for Bare Bones Wizard.
+
+Runs on the offscreen QPA platform against a local stub server, so no
+display or network is needed:
+
+    python benchmarks/run.py                    # compare with baseline.json
+    python benchmarks/run.py --update-baseline  # record a new baseline
+    python benchmarks/run.py --latency 0.05 --bandwidth 500000
+    python benchmarks/run.py --runs 3           # medians of three passes
+
+The run fails (exit code 1) when a metric is worse than the baseline by more
+than --threshold (25% by default). Baselines are machine-specific; record
+one on the machine that runs the comparison, with a few --runs on a noisy
+machine, since the worst-gap metrics are single worst-case samples.
+"""
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [HERE, os.path.join(HERE, os.pardir, "bare_bones_wizard")]
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from stub_server import StubServer
+
+BASELINE_PATH = os.path.join(HERE, "baseline.json")
+POPULATE_SIZES = (100, 10_000, 100_000)
+POPULATE_RUNS = 5
+CARD_BUILD_COUNT = 5_000
+CARD_BUILD_RUNS = 3
+STORE_ROWS = 1_000_000
+SEARCH_QUERY = "project 12345"
+TRANSITIONS = 10
+CARD_CYCLES = 5
+CARD_CLICKS = 500
+THUMBNAIL_CARDS = 150
+BLOB_COUNT = 40
+BLOB_SIZE = 256 * 1024
+STARTUP_RUNS = 5
+# Changes smaller than this are timer or allocator noise, whatever the ratio.
+NOISE_FLOOR = {"ms": 2.0, "MB": 1.0, "us": 50.0}
+# Hard limits, whatever the baseline says: one frame at 60 fps.
+LIMITS = {f"cards_{CARD_BUILD_COUNT}_max_gap_ms": 16.0}
+
+
+def _rss_bytes():
+    """Current resident set size, or peak RSS where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _wait(app, condition, timeout=60.0):
+    # Sleeps while there are no events, as a real event loop does; spinning
+    # would keep idle-priority worker threads off the CPU.
+    from PySide6.QtCore import QEventLoop, QTimer
+
+    heartbeat = QTimer()
+    heartbeat.start(10)
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("benchmark did not finish in time")
+        app.processEvents(QEventLoop.ProcessEventsFlag.WaitForMoreEvents)
+    heartbeat.stop()
+
+
+def _wait_max_gap(app, condition, timeout=60.0):
+    """Like _wait; returns the longest the GUI thread went without events, in ms."""
+    deadline = time.perf_counter() + timeout
+    longest = 0.0
+    last = time.perf_counter()
+    while not condition():
+        app.processEvents()
+        now = time.perf_counter()
+        longest = max(longest, now - last)
+        last = now
+        if now > deadline:
+            raise TimeoutError("benchmark did not finish in time")
+    return longest * 1000
+
+
+def _settle(app, seconds=0.2):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        app.processEvents()
+
+
+def _results_window(app):
+    from main import MainWindow, WizardStep
+
+    window = MainWindow()
+    window.resize(500, 600)
+    window.show()
+    window.wizard.setCurrentIndex(WizardStep.RESULTS.value - 1)
+    _settle(app)
+    return window
+
+
+def _results(ids):
+    from result_store import ResultStore
+
+    return ResultStore({"id": index, "name": f"Project {index}"} for index in ids)
+
+
+def _close(app, window):
+    from PySide6.QtCore import QEvent
+
+    window._clear_cards()
+    window.close()
+    window.deleteLater()
+    # processEvents() outside exec() never runs deferred deletes, which
+    # would keep every closed window's cards alive for later benchmarks.
+    app.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+    _settle(app)
+
+
+def bench_startup(metrics):
+    """Cold start of the app in --fast-start mode, in fresh interpreters."""
+    import subprocess
+
+    main_path = os.path.join(HERE, os.pardir, "bare_bones_wizard", "main.py")
+    command = [
+        sys.executable,
+        main_path,
+        "--fast-start",
+        "--startup-report",
+        "--quit-after-startup",
+    ]
+    marks = {"imports": [], "first_paint": [], "launch_to_paint": []}
+    for _ in range(STARTUP_RUNS):
+        started = time.perf_counter()
+        with subprocess.Popen(
+            command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+        ) as process:
+            for line in process.stdout:
+                if line.startswith("Startup (ms):"):
+                    # Includes interpreter start-up, which the report cannot see.
+                    marks["launch_to_paint"].append(
+                        (time.perf_counter() - started) * 1000
+                    )
+                    for pair in line.split(":", 1)[1].split():
+                        name, value = pair.split("=")
+                        if name in marks:
+                            marks[name].append(float(value))
+        if process.returncode:
+            raise RuntimeError(f"startup run failed with code {process.returncode}")
+    for name, values in marks.items():
+        metrics[f"startup_{name}_ms"] = (statistics.median(values), "ms", "lower")
+
+
+def _populate_once(app, size):
+    """Returns (blocking, total) seconds of populating `size` results."""
+    window = _results_window(app)
+    items = _results(range(size))
+    gc.collect()
+    start = time.perf_counter()
+    window.results_data = items
+    window.populate_results_page()
+    blocked = time.perf_counter() - start
+    _wait(app, lambda: not window.card_builder.is_running())
+    app.processEvents()
+    total = time.perf_counter() - start
+    _close(app, window)
+    return blocked, total
+
+
+def populate_rss(size):
+    """
+    Run by --populate-rss in a child interpreter: prints the RSS growth of
+    populating `size` results. In a long-lived process the allocator hands
+    back memory freed by earlier windows, so the growth there reads as 0.
+    """
+    from PySide6.QtCore import QStandardPaths
+    from PySide6.QtWidgets import QApplication
+
+    QStandardPaths.setTestModeEnabled(True)
+    app = QApplication([])
+    window = _results_window(app)
+    items = _results(range(size))
+    gc.collect()
+    rss_before = _rss_bytes()
+    window.results_data = items
+    window.populate_results_page()
+    # Thumbnails included: how many are decoded by a given moment varies.
+    builder = window.card_builder
+    _wait(
+        app,
+        lambda: not builder.is_running()
+        and all(card.thumbnail_loaded for card in builder.cards),
+    )
+    app.processEvents()
+    print(f"populate_rss_bytes={_rss_bytes() - rss_before}")
+
+
+def _populate_rss_in_child(size):
+    import subprocess
+    import tempfile
+
+    # A home of its own gives the child an empty thumbnail cache: whatever
+    # this process has written to the shared one by then varies per run.
+    with tempfile.TemporaryDirectory() as home:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--populate-rss", str(size)],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            check=True,
+            env={**os.environ, "HOME": home},
+        ).stdout
+    for line in output.splitlines():
+        if line.startswith("populate_rss_bytes="):
+            return int(line.split("=", 1)[1])
+    raise RuntimeError("populate RSS run printed no result")
+
+
+def bench_populate(app, metrics):
+    # A discarded warm-up run pays for what only the first window does
+    # (card styles, fonts, allocator growth). Card building then yields to
+    # the event loop between slices, so single runs still vary by half and
+    # the median of a few is reported.
+    _populate_once(app, POPULATE_SIZES[0])
+    for size in POPULATE_SIZES:
+        runs = [_populate_once(app, size) for _ in range(POPULATE_RUNS)]
+        blocked, total = (statistics.median(values) for values in zip(*runs))
+        metrics[f"populate_{size}_blocking_ms"] = (blocked * 1000, "ms", "lower")
+        metrics[f"populate_{size}_total_ms"] = (total * 1000, "ms", "lower")
+        # In a fresh interpreter, where it is stable to a few pages.
+        rss = _populate_rss_in_child(size)
+        metrics[f"populate_{size}_rss_mb"] = (rss / 2**20, "MB", "lower")
+
+
+def _card_build_once(app):
+    """Returns (max gap ms, longest slice ms) of building CARD_BUILD_COUNT cards."""
+    window = _results_window(app)
+    window.results_data = _results(range(CARD_BUILD_COUNT))
+    window.results_layout.setCurrentWidget(window.scroll_area)
+    builder = window.card_builder
+    builder.add(window.results_data)
+    max_gap = _wait_max_gap(app, lambda: not builder.is_running(), timeout=120.0)
+    longest_slice = builder.longest_slice * 1000
+    _close(app, window)
+    return max_gap, longest_slice
+
+
+def bench_card_build(app, metrics):
+    """
+    The GUI thread's longest stall while CARD_BUILD_COUNT cards are built.
+    The builder is fed directly: populating that many results would switch
+    to the virtualized view instead. A single build's worst gap also catches
+    whatever else the machine did at that moment, so the median of a few
+    builds is reported.
+    """
+    runs = [_card_build_once(app) for _ in range(CARD_BUILD_RUNS)]
+    max_gap, longest_slice = (statistics.median(values) for values in zip(*runs))
+    metrics[f"cards_{CARD_BUILD_COUNT}_max_gap_ms"] = (max_gap, "ms", "lower")
+    metrics[f"cards_{CARD_BUILD_COUNT}_longest_slice_ms"] = (
+        longest_slice,
+        "ms",
+        "lower",
+    )
+
+
+def bench_result_store(app, metrics):
+    """Memory of a million-row result set, and handing it across threads."""
+    import threading
+    import tracemalloc
+
+    from PySide6.QtCore import QObject, Signal
+
+    gc.collect()
+    tracemalloc.start()
+    results = _results(range(STORE_ROWS))
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    metrics[f"results_{STORE_ROWS}_store_mb"] = (size / 2**20, "MB", "lower")
+
+    class Sender(QObject):
+        ready = Signal(object)
+
+    sender = Sender()
+    received = []
+    sender.ready.connect(lambda store: received.append(time.perf_counter()))
+    sent = []
+
+    def emit():
+        sent.append(time.perf_counter())
+        # Emitted off the GUI thread, so delivery is queued.
+        sender.ready.emit(results)
+
+    thread = threading.Thread(target=emit)
+    thread.start()
+    thread.join()
+    _wait(app, lambda: received)
+    metrics[f"results_{STORE_ROWS}_emit_ms"] = (
+        (received[0] - sent[0]) * 1000,
+        "ms",
+        "lower",
+    )
+
+
+def bench_search(app, metrics):
+    """
+    Index build time, the GUI thread's longest stall while it runs, how soon
+    a cancelled build lets go of its thread, and per-keystroke latency over a
+    million results.
+    """
+    window = _results_window(app)
+    results = _results(range(STORE_ROWS))
+    started = time.perf_counter()
+    window.on_work_finished(results)
+    build_gap = _wait_max_gap(
+        app, lambda: window.search_index is not None, timeout=120.0
+    )
+    metrics[f"search_{STORE_ROWS}_build_s"] = (
+        time.perf_counter() - started,
+        "s",
+        "lower",
+    )
+    metrics[f"search_{STORE_ROWS}_build_max_gap_ms"] = (build_gap, "ms", "lower")
+    _settle(app)
+
+    # Type the query one character at a time, then sort it; every step
+    # includes the view reset and one event loop pass that paints it.
+    edit = window.search_bar.search_edit
+    steps = [
+        lambda n=n: edit.setText(SEARCH_QUERY[:n])
+        for n in range(1, len(SEARCH_QUERY) + 1)
+    ]
+    sort_box = window.search_bar.sort_box
+    steps.append(lambda: sort_box.setCurrentIndex(sort_box.findData("name")))
+    steps.append(lambda: window.search_bar.direction_button.toggle())
+    steps.append(edit.clear)
+    # Garbage left by the build is not a keystroke's cost.
+    gc.collect()
+    samples = []
+    for step in steps:
+        start = time.perf_counter()
+        step()
+        app.processEvents()
+        samples.append((time.perf_counter() - start) * 1000)
+    metrics[f"search_{STORE_ROWS}_keystroke_max_ms"] = (max(samples), "ms", "lower")
+
+    # Cancel a second build halfway through and wait for its thread.
+    window._build_search_index()
+    _settle(app, metrics[f"search_{STORE_ROWS}_build_s"][0] / 2)
+    start = time.perf_counter()
+    window._cancel_search_index()
+    window.index_executor.shutdown(timeout_ms=5000)
+    metrics[f"search_{STORE_ROWS}_cancel_ms"] = (
+        (time.perf_counter() - start) * 1000,
+        "ms",
+        "lower",
+    )
+    _close(app, window)
+
+
+def bench_result_cache(app, metrics):
+    """Reloading a million cached results, and a repeated run served from cache."""
+    import tempfile
+
+    from main import MainWindow
+    from result_cache import ResultCache
+    from worker import cache_key
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = _results(range(STORE_ROWS))
+        ResultCache(directory=directory).store("bench", results)
+        start = time.perf_counter()
+        # A new cache starts with an empty memory tier, as after a restart.
+        loaded, _ = ResultCache(directory=directory).lookup("bench")
+        metrics[f"result_cache_{STORE_ROWS}_load_ms"] = (
+            (time.perf_counter() - start) * 1000,
+            "ms",
+            "lower",
+        )
+        start = time.perf_counter()
+        loaded.diff(results)
+        metrics[f"result_cache_{STORE_ROWS}_diff_ms"] = (
+            (time.perf_counter() - start) * 1000,
+            "ms",
+            "lower",
+        )
+        del results, loaded
+
+        cache = ResultCache(directory=directory)
+        cache.store(cache_key(), _results(range(4)))
+        window = MainWindow()
+        window.result_cache = cache
+        window.resize(500, 600)
+        window.show()
+        _settle(app)
+        # WELCOME -> RESULTS until every card is built; the task never runs.
+        start = time.perf_counter()
+        window.go_to_next_step()
+        _wait(
+            app,
+            lambda: window.card_builder.cards and not window.card_builder.is_running(),
+        )
+        metrics["rerun_cached_ms"] = (
+            (time.perf_counter() - start) * 1000,
+            "ms",
+            "lower",
+        )
+        _close(app, window)
+
+
+def bench_transitions(app, metrics):
+    window = _results_window(app)
+    window.results_data = _results(range(THUMBNAIL_CARDS))
+    window.populate_results_page()
+    _wait(app, lambda: not window.card_builder.is_running())
+    _settle(app)
+
+    intervals = []
+    last = [None]
+    finished = [0]
+
+    def on_started():
+        last[0] = time.perf_counter()
+
+    def on_frame():
+        now = time.perf_counter()
+        intervals.append((now - last[0]) * 1000)
+        last[0] = now
+
+    def on_finished():
+        finished[0] += 1
+
+    wizard = window.wizard
+    wizard.transition_started.connect(on_started)
+    wizard.transition_frame.connect(on_frame)
+    wizard.transition_finished.connect(on_finished)
+    results_index = wizard.currentIndex()
+    for count in range(1, TRANSITIONS + 1):
+        wizard.goto_page(results_index + count % 2)
+        _wait(app, lambda count=count: finished[0] >= count)
+
+    intervals.sort()
+    metrics["transition_frame_p50_ms"] = (statistics.median(intervals), "ms", "lower")
+    metrics["transition_frame_p95_ms"] = (
+        intervals[int(len(intervals) * 0.95)],
+        "ms",
+        "lower",
+    )
+    metrics["transition_frame_max_ms"] = (intervals[-1], "ms", "lower")
+    _close(app, window)
+
+
+def bench_card_cycles(app, metrics):
+    """Back/Next round trips over the same results, then plain clicks."""
+    window = _results_window(app)
+    window.results_data = _results(range(THUMBNAIL_CARDS))
+    window.populate_results_page()
+    _wait(app, lambda: not window.card_builder.is_running())
+
+    samples = []
+    for _ in range(CARD_CYCLES):
+        window._clear_cards()
+        start = time.perf_counter()
+        window.populate_results_page()
+        _wait(app, lambda: not window.card_builder.is_running())
+        samples.append((time.perf_counter() - start) * 1000)
+    metrics["card_cycle_repopulate_ms"] = (statistics.median(samples), "ms", "lower")
+    # Every cycle should rebind the cards of the first one.
+    metrics["card_cycle_widgets"] = (
+        len(window.card_builder._pool),
+        "cards",
+        "lower",
+    )
+
+    cards = window.card_builder.cards
+    start = time.perf_counter()
+    for click in range(CARD_CLICKS):
+        window.card_selection.click(cards[click * 7 % len(cards)])
+    elapsed = time.perf_counter() - start
+    metrics["card_click_us"] = (elapsed / CARD_CLICKS * 1e6, "us", "lower")
+    _close(app, window)
+
+
+def bench_card_thumbnails(app, metrics):
+    window = _results_window(app)
+    # Ids nobody has asked for yet, so every thumbnail is a real download.
+    first = int(time.time() * 1000)
+    window.results_data = _results(range(first, first + THUMBNAIL_CARDS))
+    start = time.perf_counter()
+    window.populate_results_page()
+    _wait(
+        app,
+        lambda: len(window.card_builder.cards) == THUMBNAIL_CARDS
+        and all(card.thumbnail_loaded for card in window.card_builder.cards),
+    )
+    elapsed = time.perf_counter() - start
+    metrics["card_thumbnails_per_s"] = (THUMBNAIL_CARDS / elapsed, "1/s", "higher")
+    _close(app, window)
+
+
+def bench_download_runner(app, server, metrics):
+    from downloader import GLOBAL_DOWNLOAD_POOL
+
+    done = []
+    start = time.perf_counter()
+    for index in range(BLOB_COUNT):
+        GLOBAL_DOWNLOAD_POOL.subscribe(
+            f"{server.base_url}/blob/{BLOB_SIZE}?n={index}",
+            lambda data, error: done.append(error),
+        )
+    _wait(app, lambda: len(done) == BLOB_COUNT)
+    elapsed = time.perf_counter() - start
+    errors = [error for error in done if error is not None]
+    if errors:
+        raise RuntimeError(f"downloads failed: {errors[0]}")
+    metrics["download_runner_mb_per_s"] = (
+        BLOB_COUNT * BLOB_SIZE / 2**20 / elapsed,
+        "MB/s",
+        "higher",
+    )
+
+
+def compare(metrics, baseline, threshold):
+    """Prints every metric next to its baseline; returns the regressions."""
+    regressions = []
+    for name, (value, unit, better) in metrics.items():
+        reference = baseline.get(name, {}).get("value")
+        line = f"{name:36} {value:12.2f} {unit:5}"
+        if reference is not None:
+            difference = value - reference if better == "lower" else reference - value
+            worse = difference > NOISE_FLOOR.get(unit, 0.0)
+            line += f"  baseline {reference:10.2f}"
+            if reference:
+                worse = worse and difference / abs(reference) > threshold
+                line += f"  {(value - reference) / reference:+7.1%}"
+            else:
+                # No ratio to a zero baseline; the noise floor alone decides.
+                line += f"  {'':7}"
+            if worse:
+                line += "  REGRESSION"
+                regressions.append(name)
+        print(line)
+    return regressions
+
+
+def over_limits(metrics):
+    """Returns the metrics worse than their entry in LIMITS."""
+    return [
+        name
+        for name, limit in LIMITS.items()
+        if name in metrics and metrics[name][0] > limit
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument(
+        "--runs", type=int, default=1, help="report the median of this many passes"
+    )
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds")
+    parser.add_argument(
+        "--bandwidth", type=int, default=2_000_000, help="bytes/s per connection"
+    )
+    parser.add_argument(
+        "--backend", choices=("qt", "requests", "asyncio"), default="qt"
+    )
+    parser.add_argument("--populate-rss", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.populate_rss is not None:
+        populate_rss(args.populate_rss)
+        return 0
+
+    server = StubServer(latency=args.latency, bandwidth=args.bandwidth).start()
+    # Read by card_widget and download_engine at import time.
+    os.environ["BBW_THUMBNAIL_URL"] = server.base_url + "/thumb/{id}.png"
+    os.environ["BBW_DOWNLOAD_BACKEND"] = args.backend
+
+    from PySide6.QtCore import QStandardPaths
+    from PySide6.QtWidgets import QApplication
+
+    # Keep the disk cache out of the user's real cache directory.
+    QStandardPaths.setTestModeEnabled(True)
+    app = QApplication([])
+
+    passes = []
+    for _ in range(max(args.runs, 1)):
+        metrics = {}
+        bench_populate(app, metrics)
+        bench_card_build(app, metrics)
+        bench_result_store(app, metrics)
+        bench_search(app, metrics)
+        bench_result_cache(app, metrics)
+        bench_transitions(app, metrics)
+        bench_card_cycles(app, metrics)
+        bench_card_thumbnails(app, metrics)
+        bench_download_runner(app, server, metrics)
+        passes.append(metrics)
+    server.stop()
+    metrics = {
+        name: (statistics.median(run[name][0] for run in passes), unit, better)
+        for name, (_, unit, better) in passes[0].items()
+    }
+    # Last, so the child interpreters do not disturb the in-process numbers.
+    bench_startup(metrics)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    regressions = compare(metrics, baseline, args.threshold)
+    over = over_limits(metrics)
+    if over:
+        # Not even as a new baseline.
+        print(f"{len(over)} metric(s) over their limit: {', '.join(over)}")
+        return 1
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(
+                {
+                    name: {"value": round(value, 3), "unit": unit, "better": better}
+                    for name, (value, unit, better) in metrics.items()
+                },
+                f,
+                indent=2,
+            )
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if regressions:
+        print(
+            f"{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}"
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
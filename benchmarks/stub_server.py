@@ -0,0 +1,112 @@
+# stub_server.py
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from PySide6.QtCore import QBuffer, QIODevice
+from PySide6.QtGui import QColor, QImage
+
+# Bodies are written in chunks this big so a bandwidth limit can pace them.
+WRITE_CHUNK = 16 * 1024
+
+
+def make_png(width=128, height=96):
+    """Encodes a solid thumbnail like the ones placehold.co serves."""
+    image = QImage(width, height, QImage.Format.Format_RGB32)
+    image.fill(QColor("#222"))
+    buffer = QBuffer()
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    image.save(buffer, "PNG")
+    return bytes(buffer.data())
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Cancelled downloads drop their connection mid-response; that is
+        # expected, so only report other errors.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class StubServer:
+    """
+    A local stand-in for the thumbnail host.
+
+    `GET /thumb/<anything>` returns a PNG thumbnail and `GET /blob/<bytes>`
+    returns that many bytes. `latency` delays every response and
+    `bandwidth` (bytes per second, per connection) paces the body, so runs
+    are repeatable without touching the network.
+    """
+
+    def __init__(self, latency=0.0, bandwidth=None, max_age=3600):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.max_age = max_age
+        self.png = make_png()
+        self.requests = 0
+        self._blob = b""
+        self._lock = threading.Lock()
+        self._server = _QuietServer(("127.0.0.1", 0), self._handler())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _body(self, path):
+        if path.startswith("/thumb/"):
+            return self.png, "image/png"
+        match = re.fullmatch(r"/blob/(\d+)", path)
+        if match:
+            size = int(match.group(1))
+            with self._lock:
+                if len(self._blob) < size:
+                    self._blob = bytes(range(256)) * (size // 256 + 1)
+                return self._blob[:size], "application/octet-stream"
+        return None, None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                body, content_type = server._body(self.path.split("?")[0])
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", f"max-age={server.max_age}")
+                self.end_headers()
+                view = memoryview(body)
+                for start in range(0, len(body), WRITE_CHUNK):
+                    chunk = view[start : start + WRITE_CHUNK]
+                    self.wfile.write(chunk)
+                    if server.bandwidth:
+                        time.sleep(len(chunk) / server.bandwidth)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,8 @@
+# conftest.py
+import os
+import sys
+
+# The app's modules import each other by bare name, as main.py does when
+# run from inside bare_bones_wizard.
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "bare_bones_wizard"))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
@@ -0,0 +1,72 @@
+# test_card_builder.py
+import time
+
+import pytest
+from card_builder import IncrementalCardBuilder
+from PySide6.QtWidgets import QApplication, QLabel, QVBoxLayout, QWidget
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def container(app):
+    widget = QWidget()
+    QVBoxLayout(widget)
+    yield widget
+    widget.deleteLater()
+
+
+def builder_for(container, create_card=None, **options):
+    create_card = create_card or (lambda index, item: QLabel(str(item)))
+    return IncrementalCardBuilder(container.layout(), create_card, **options)
+
+
+def test_slice_builds_at_most_max_cards_per_slice(container):
+    builder = builder_for(container, frame_budget=1.0, max_cards_per_slice=4)
+    builder.add(range(10))
+    builder._build_slice()
+    assert len(builder.cards) == 4
+    while builder.is_running():
+        builder._build_slice()
+    assert [card.text() for card in builder.cards] == [str(n) for n in range(10)]
+    assert builder.slices == 3
+
+
+def test_slow_card_ends_the_slice(container):
+    def create_card(index, item):
+        if index == 0:
+            time.sleep(0.003)
+        return QLabel(str(item))
+
+    # The running average alone would still expect room for a few more.
+    builder = builder_for(
+        container, create_card, frame_budget=0.005, max_cards_per_slice=10
+    )
+    builder.add(range(10))
+    builder._build_slice()
+    assert len(builder.cards) == 1
+    builder.clear()
+
+
+def test_finished_is_emitted_once_everything_is_built(container):
+    builder = builder_for(container, frame_budget=1.0)
+    finished = []
+    builder.finished.connect(lambda: finished.append(len(builder.cards)))
+    builder.add(range(6))
+    while builder.is_running():
+        builder._build_slice()
+    assert finished == [6]
+
+
+def test_build_now_builds_the_next_slice_right_away(container):
+    builder = builder_for(container, frame_budget=1.0, max_cards_per_slice=3)
+    builder.build_now()
+    assert builder.slices == 0
+    builder.add(range(5))
+    builder.build_now()
+    assert len(builder.cards) == 3
+    assert builder.is_running()
+    builder.clear()
@@ -0,0 +1,191 @@
+# test_download_engine.py
+import mmap
+
+import pytest
+from download_engine import BodySink, DownloadBackend, DownloadEngine, DownloadResponse
+
+# --- BodySink ---
+
+
+def test_small_body_fills_a_preallocated_buffer():
+    sink = BodySink(spill_threshold=100, length=6)
+    sink.write(b"abc")
+    sink.write(b"def")
+    body = sink.finish()
+    assert isinstance(body, bytearray)
+    assert body == b"abcdef"
+
+
+def test_body_shorter_or_longer_than_its_length():
+    sink = BodySink(spill_threshold=100, length=10)
+    sink.write(b"abc")
+    assert sink.finish() == b"abc"
+    sink = BodySink(spill_threshold=100, length=2)
+    sink.write(b"abc")
+    sink.write(b"de")
+    assert sink.finish() == b"abcde"
+
+
+def test_body_without_a_length():
+    sink = BodySink(spill_threshold=100)
+    for chunk in (b"ab", b"", b"cd"):
+        sink.write(chunk)
+    assert sink.finish() == b"abcd"
+
+
+def test_large_length_spills_straight_to_disk():
+    sink = BodySink(spill_threshold=4, length=8)
+    sink.write(b"abcd")
+    sink.write(b"efgh")
+    body = sink.finish()
+    assert isinstance(body, mmap.mmap)
+    assert body[:] == b"abcdefgh"
+    body.close()
+
+
+def test_growing_body_spills_once_past_the_threshold():
+    sink = BodySink(spill_threshold=4)
+    sink.write(b"abc")
+    sink.write(b"de")
+    sink.write(b"fg")
+    body = sink.finish()
+    assert isinstance(body, mmap.mmap)
+    assert body[:] == b"abcdefg"
+    with pytest.raises(TypeError):
+        body[0] = 0  # Read-only.
+    body.close()
+
+
+def test_empty_spilled_body():
+    sink = BodySink(spill_threshold=4, length=8)
+    assert sink.finish() == b""
+
+
+def test_close_discards_a_partial_body():
+    sink = BodySink(spill_threshold=4, length=8)
+    sink.write(b"abc")
+    sink.close()
+    assert sink._file.closed
+
+
+# --- DownloadEngine ---
+
+
+class FakeJob:
+    def __init__(self, url, headers, on_bytes, done):
+        self.url = url
+        self.headers = headers
+        self.on_bytes = on_bytes
+        self.done = done
+        self.aborted = False
+
+    def abort(self):
+        self.aborted = True
+
+    def succeed(self, status=200, body=b"data"):
+        self.on_bytes(len(body))
+        self.done(DownloadResponse(self.url, status, {}, bytearray(body)), None)
+
+
+class FakeBackend(DownloadBackend):
+    def __init__(self):
+        self.jobs = []
+        self.is_shut_down = False
+
+    def start(self, url, headers, spill_threshold, timeout, on_bytes, done):
+        self.jobs.append(FakeJob(url, headers, on_bytes, done))
+        return self.jobs[-1]
+
+    def shutdown(self):
+        self.is_shut_down = True
+
+    def urls(self):
+        return [job.url for job in self.jobs]
+
+
+@pytest.fixture
+def backend():
+    return FakeBackend()
+
+
+@pytest.fixture
+def engine(backend):
+    return DownloadEngine(backend, per_host_limit=2, max_concurrent=3)
+
+
+def ignore(response, error):
+    pass
+
+
+def test_per_host_limit(engine, backend):
+    for name in "abc":
+        engine.get(f"http://one/{name}", ignore)
+    assert backend.urls() == ["http://one/a", "http://one/b"]
+    assert engine.active_count("one") == 2
+    backend.jobs[0].succeed()
+    assert backend.urls()[-1] == "http://one/c"
+
+
+def test_global_limit(engine, backend):
+    for host in ("one", "two", "three", "four"):
+        engine.get(f"http://{host}/a", ignore)
+    assert len(backend.jobs) == 3
+    assert engine.active_count() == 3
+    backend.jobs[1].succeed()
+    assert backend.urls()[-1] == "http://four/a"
+
+
+def test_waiting_hosts_are_served_round_robin(engine, backend):
+    for name in "abcd":
+        engine.get(f"http://busy/{name}", ignore)
+    engine.get("http://quiet/a", ignore)
+    assert backend.urls() == ["http://busy/a", "http://busy/b", "http://quiet/a"]
+
+
+def test_finish_receives_responses_and_errors(engine, backend):
+    received = []
+    engine.get("http://one/a", lambda response, error: received.append(error))
+    engine.get("http://one/b", lambda response, error: received.append(response))
+    backend.jobs[0].succeed(status=404)
+    backend.jobs[1].done(None, "connection refused")
+    engine.get("http://one/c", lambda response, error: received.append(response))
+    backend.jobs[2].succeed()
+    assert received[0] == "HTTP 404 for http://one/a"
+    assert received[1] is None
+    assert received[2].body == b"data"
+    assert engine.stats["failed"] == 2
+
+
+def test_abort_queued_and_running_transfers(engine, backend):
+    received = []
+    running = engine.get("http://one/a", lambda *args: received.append(args))
+    engine.get("http://one/b", ignore)
+    queued = engine.get("http://one/c", lambda *args: received.append(args))
+    queued.abort()
+    running.abort()
+    assert backend.jobs[0].aborted
+    # The freed slot does not go to the aborted transfer.
+    assert backend.urls() == ["http://one/a", "http://one/b"]
+    backend.jobs[0].succeed()
+    assert received == []
+    assert engine.stats["aborted"] == 2
+    assert engine.active_count() == 1
+
+
+def test_bytes_are_counted_across_transfers(engine, backend):
+    engine.get("http://one/a", ignore)
+    engine.get("http://two/a", ignore)
+    backend.jobs[0].succeed(body=b"x" * 300)
+    backend.jobs[1].succeed(body=b"x" * 100)
+    assert engine.stats["bytes"] == 400
+    assert engine.bandwidth() > 0
+
+
+def test_shutdown_aborts_everything(engine, backend):
+    for name in "abcd":
+        engine.get(f"http://one/{name}", ignore)
+    engine.shutdown()
+    assert all(job.aborted for job in backend.jobs)
+    assert engine.active_count() == 0
+    assert backend.is_shut_down
+    assert len(backend.jobs) == 2
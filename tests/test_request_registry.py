@@ -0,0 +1,180 @@
+# test_request_registry.py
+import pytest
+from request_registry import RequestRegistry
+
+
+class FakeJob:
+    def __init__(self, url, finish):
+        self.url = url
+        self.finish = finish
+        self.aborted = False
+
+    def abort(self):
+        self.aborted = True
+
+
+@pytest.fixture
+def jobs():
+    return []
+
+
+@pytest.fixture
+def registry(jobs):
+    def start_job(url, finish):
+        jobs.append(FakeJob(url, finish))
+        return jobs[-1]
+
+    return RequestRegistry(start_job, max_concurrent=2)
+
+
+def test_identical_urls_share_one_job(registry, jobs):
+    received = []
+    registry.subscribe("a", lambda result, error: received.append((1, result)))
+    registry.subscribe("a", lambda result, error: received.append((2, result)))
+    assert [job.url for job in jobs] == ["a"]
+    jobs[0].finish("data", None)
+    assert received == [(1, "data"), (2, "data")]
+    assert registry.stats["requests"] == 1
+    assert registry.stats["coalesced"] == 1
+    assert not registry.is_pending("a")
+
+
+def test_errors_reach_every_subscriber(registry, jobs):
+    received = []
+    registry.subscribe("a", lambda result, error: received.append(error))
+    registry.subscribe("a", lambda result, error: received.append(error))
+    jobs[0].finish(None, "timed out")
+    assert received == ["timed out", "timed out"]
+
+
+def test_a_finished_url_starts_a_new_job(registry, jobs):
+    registry.subscribe("a", lambda result, error: None)
+    jobs[0].finish("data", None)
+    registry.subscribe("a", lambda result, error: None)
+    assert len(jobs) == 2
+
+
+def test_cancel_keeps_the_job_while_others_wait(registry, jobs):
+    received = []
+    first = registry.subscribe("a", lambda result, error: received.append(1))
+    registry.subscribe("a", lambda result, error: received.append(2))
+    registry.cancel(first)
+    assert not jobs[0].aborted
+    jobs[0].finish("data", None)
+    assert received == [2]
+    assert registry.stats["aborted"] == 0
+
+
+def test_cancelling_the_last_subscriber_aborts(registry, jobs):
+    subscription = registry.subscribe("a", lambda result, error: None)
+    registry.cancel(subscription)
+    assert jobs[0].aborted
+    assert not registry.is_pending("a")
+    assert registry.stats["aborted"] == 1
+    registry.cancel(subscription)
+    assert registry.stats["aborted"] == 1
+
+
+def test_concurrency_limit_queues_and_frees_slots(registry, jobs):
+    for url in "abc":
+        registry.subscribe(url, lambda result, error: None)
+    assert [job.url for job in jobs] == ["a", "b"]
+    jobs[0].finish("data", None)
+    assert [job.url for job in jobs] == ["a", "b", "c"]
+
+
+def test_cancelling_a_queued_request_starts_nothing(registry, jobs):
+    registry.subscribe("a", lambda result, error: None)
+    registry.subscribe("b", lambda result, error: None)
+    queued = registry.subscribe("c", lambda result, error: None)
+    registry.cancel(queued)
+    jobs[0].finish("data", None)
+    assert [job.url for job in jobs] == ["a", "b"]
+    assert registry.stats["aborted"] == 1
+
+
+def test_aborting_a_running_job_frees_its_slot(registry, jobs):
+    running = registry.subscribe("a", lambda result, error: None)
+    registry.subscribe("b", lambda result, error: None)
+    registry.subscribe("c", lambda result, error: None)
+    registry.cancel(running)
+    assert [job.url for job in jobs] == ["a", "b", "c"]
+
+
+def test_queued_requests_start_most_urgent_first(registry, jobs):
+    registry.subscribe("a", lambda result, error: None)
+    registry.subscribe("b", lambda result, error: None)
+    registry.subscribe("low", lambda result, error: None, priority=1)
+    registry.subscribe("high", lambda result, error: None, priority=5)
+    registry.subscribe("same", lambda result, error: None, priority=1)
+    jobs[0].finish("data", None)
+    jobs[1].finish("data", None)
+    assert [job.url for job in jobs[2:]] == ["high", "low"]
+
+
+def test_set_priority_re_ranks_a_waiting_request(registry, jobs):
+    registry.subscribe("a", lambda result, error: None)
+    registry.subscribe("b", lambda result, error: None)
+    first = registry.subscribe("first", lambda result, error: None, priority=2)
+    registry.subscribe("second", lambda result, error: None, priority=1)
+    registry.set_priority(first, 0)
+    jobs[0].finish("data", None)
+    assert jobs[-1].url == "second"
+
+
+def test_a_request_runs_at_its_most_urgent_subscribers_priority(registry, jobs):
+    registry.subscribe("a", lambda result, error: None)
+    registry.subscribe("b", lambda result, error: None)
+    registry.subscribe("other", lambda result, error: None, priority=3)
+    registry.subscribe("shared", lambda result, error: None, priority=1)
+    registry.subscribe("shared", lambda result, error: None, priority=5)
+    jobs[0].finish("data", None)
+    assert jobs[-1].url == "shared"
+
+
+def test_cancelling_the_urgent_subscriber_lowers_the_request(registry, jobs):
+    registry.subscribe("a", lambda result, error: None)
+    registry.subscribe("b", lambda result, error: None)
+    registry.subscribe("other", lambda result, error: None, priority=3)
+    registry.subscribe("shared", lambda result, error: None, priority=1)
+    urgent = registry.subscribe("shared", lambda result, error: None, priority=5)
+    registry.cancel(urgent)
+    jobs[0].finish("data", None)
+    assert jobs[-1].url == "other"
+
+
+def test_set_priority_leaves_running_requests_alone(registry, jobs):
+    running = registry.subscribe("a", lambda result, error: None)
+    registry.subscribe("b", lambda result, error: None)
+    registry.set_priority(running, 9)
+    jobs[0].finish("data", None)
+    assert len(jobs) == 2
+    assert registry.stats["requests"] == 2
+
+
+def test_unchanged_priority_queues_nothing_new(registry, jobs):
+    registry.subscribe("a", lambda result, error: None)
+    registry.subscribe("b", lambda result, error: None)
+    waiting = [
+        registry.subscribe(str(n), lambda result, error: None) for n in range(100)
+    ]
+    for _ in range(20):
+        for subscription in waiting:
+            registry.set_priority(subscription, 0)
+    assert len(registry._queue) == 100
+
+
+def test_re_ranking_keeps_the_queue_bounded(registry, jobs):
+    registry.subscribe("a", lambda result, error: None)
+    registry.subscribe("b", lambda result, error: None)
+    waiting = [
+        registry.subscribe(str(n), lambda result, error: None) for n in range(100)
+    ]
+    for rank in range(20):
+        for n, subscription in enumerate(waiting):
+            registry.set_priority(subscription, (n + rank) % 7)
+    assert len(registry._queue) <= 2 * 102 + 64
+    priorities = {str(n): (n + 19) % 7 for n in range(100)}
+    for job in jobs[:2]:
+        job.finish("data", None)
+    assert [priorities[job.url] for job in jobs[2:]] == [6, 6]
@@ -0,0 +1,179 @@
+# test_result_cache.py
+import os
+import types
+
+import pytest
+import result_cache
+from result_cache import ResultCache
+from result_store import ResultStore
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = types.SimpleNamespace(now=1_000_000.0)
+    monkeypatch.setattr(
+        result_cache, "time", types.SimpleNamespace(time=lambda: clock.now)
+    )
+    return clock
+
+
+def make_cache(directory, **options):
+    options.setdefault("ttl", 10)
+    options.setdefault("stale_ttl", 100)
+    return ResultCache(directory=str(directory), **options)
+
+
+def results(count, name="row"):
+    return ResultStore(
+        {"id": i, "score": i / 4, "name": f"{name} {i}"} for i in range(count)
+    )
+
+
+def same_rows(a, b):
+    return [row.to_dict() for row in a] == [row.to_dict() for row in b]
+
+
+def test_fresh_then_stale_then_gone(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    stored = results(3)
+    cache.store("key", stored)
+    assert cache.lookup("key") == (stored, True)
+    clock.now += 10
+    assert cache.lookup("key") == (stored, False)
+    assert cache.stats["stale_hits"] == 1
+    clock.now += 100
+    assert cache.lookup("key") == (None, False)
+    # The expired entry is gone from disk too.
+    assert not os.listdir(tmp_path)
+
+
+def test_no_stale_window(tmp_path, clock):
+    cache = make_cache(tmp_path, stale_ttl=0)
+    cache.store("key", results(1))
+    clock.now += 10
+    assert cache.lookup("key") == (None, False)
+
+
+def test_miss(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    assert cache.lookup("key") == (None, False)
+    assert cache.stats["misses"] == 1
+
+
+def test_store_replaces_and_restarts_the_ttl(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    cache.store("key", results(1))
+    clock.now += 10
+    newer = results(2)
+    cache.store("key", newer)
+    assert cache.lookup("key") == (newer, True)
+
+
+def test_disk_tier_survives_a_restart(tmp_path, clock):
+    stored = results(50, name="naïve")
+    make_cache(tmp_path).store("key", stored)
+    cache = make_cache(tmp_path)
+    loaded, is_fresh = cache.lookup("key")
+    assert is_fresh
+    assert loaded is not stored
+    assert same_rows(loaded, stored)
+    assert loaded.column_kinds() == stored.column_kinds()
+    assert cache.stats["disk_hits"] == 1
+    # Now in memory as well.
+    cache.lookup("key")
+    assert cache.stats["memory_hits"] == 1
+
+
+def test_stale_disk_entry(tmp_path, clock):
+    make_cache(tmp_path).store("key", results(1))
+    clock.now += 50
+    assert make_cache(tmp_path).lookup("key")[1] is False
+
+
+def test_empty_results_round_trip(tmp_path, clock):
+    make_cache(tmp_path).store("key", ResultStore())
+    loaded, is_fresh = make_cache(tmp_path).lookup("key")
+    assert is_fresh
+    assert len(loaded) == 0
+
+
+def test_invalidate(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    cache.store("key", results(1))
+    cache.invalidate("key")
+    assert cache.lookup("key") == (None, False)
+    assert make_cache(tmp_path).lookup("key") == (None, False)
+
+
+def test_damaged_entries_are_misses(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    cache.store("key", results(10))
+    path = cache._path(cache._file_key("key"), ".bin")
+    with open(path, "r+b") as f:
+        f.truncate(8)
+    assert make_cache(tmp_path).lookup("key") == (None, False)
+
+
+def test_memory_tier_evicts_least_recently_used(tmp_path, clock):
+    size = results(10).nbytes
+    cache = make_cache(tmp_path, memory_limit=2 * size)
+    for key in "abc":
+        cache.store(key, results(10))
+        if key == "b":
+            cache.lookup("a")
+    assert set(cache._memory) == {"a", "c"}
+    assert cache.stats["memory_evictions"] == 1
+    # An evicted entry still comes back from disk.
+    assert cache.lookup("b")[0] is not None
+    assert cache.stats["disk_hits"] == 1
+
+
+def test_results_larger_than_memory_stay_on_disk(tmp_path, clock):
+    cache = make_cache(tmp_path, memory_limit=10)
+    cache.store("key", results(10))
+    assert not cache._memory
+    assert cache.lookup("key")[1] is True
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path, clock):
+    size = results(10).nbytes
+    cache = make_cache(tmp_path, disk_limit=2 * size)
+    for mtime, key in enumerate("ab"):
+        cache.store(key, results(10))
+        path = cache._path(cache._file_key(key), ".bin")
+        os.utime(path, (mtime, mtime))
+    cache.store("c", results(10))
+    reloaded = make_cache(tmp_path)
+    assert reloaded.lookup("a") == (None, False)
+    assert reloaded.lookup("b")[0] is not None
+    assert reloaded.lookup("c")[0] is not None
+    assert cache.stats["disk_evictions"] == 1
+
+
+def test_the_newest_entry_is_kept_even_over_the_disk_limit(tmp_path, clock):
+    cache = make_cache(tmp_path, disk_limit=10)
+    cache.store("key", results(10))
+    assert make_cache(tmp_path).lookup("key")[0] is not None
+
+
+def test_eviction_skips_files_that_vanished(tmp_path, clock):
+    size = results(10).nbytes
+    cache = make_cache(tmp_path, disk_limit=2 * size)
+    cache.store("a", results(10))
+    cache.store("b", results(10))
+    # Removed behind the index's back, say by another instance.
+    os.remove(cache._path(cache._file_key("a"), ".bin"))
+    cache.store("c", results(10))
+    reloaded = make_cache(tmp_path)
+    assert reloaded.lookup("b")[0] is not None
+    assert reloaded.lookup("c")[0] is not None
+
+
+def test_failed_disk_write_keeps_the_memory_entry(tmp_path, clock, capsys):
+    blocker = tmp_path / "file"
+    blocker.write_bytes(b"")
+    cache = make_cache(blocker / "results")
+    stored = results(3)
+    cache.store("key", stored)
+    assert "could not write" in capsys.readouterr().out
+    assert cache.lookup("key") == (stored, True)
@@ -0,0 +1,171 @@
+# test_result_store.py
+import pytest
+from result_store import ResultStore
+
+
+def rows(count, start=0):
+    return [
+        {"id": i, "score": i / 2, "name": f"item {i}"}
+        for i in range(start, start + count)
+    ]
+
+
+def test_rows_read_back_like_dicts():
+    store = ResultStore(rows(3))
+    assert len(store) == 3
+    assert [row.to_dict() for row in store] == rows(3)
+    assert store[-1]["name"] == "item 2"
+    assert store.value(1, "missing", "default") == "default"
+    with pytest.raises(IndexError):
+        store[3]
+
+
+def test_columns_take_their_kind_from_the_first_row():
+    store = ResultStore(rows(1))
+    assert store.column_kinds() == {"id": "q", "score": "d", "name": "s"}
+
+
+def test_unicode_strings():
+    store = ResultStore([{"name": "naïve"}, {"name": ""}, {"name": "日本"}])
+    assert [row["name"] for row in store] == ["naïve", "", "日本"]
+
+
+def test_int_column_becomes_float_when_a_float_arrives():
+    store = ResultStore([{"value": 1}, {"value": 2.5}])
+    assert store.column_kind("value") == "d"
+    assert [row["value"] for row in store] == [1.0, 2.5]
+
+
+@pytest.mark.parametrize("value", [None, True, b"bytes", [1]])
+def test_unsupported_values_raise_type_error(value):
+    with pytest.raises(TypeError):
+        ResultStore([{"value": value}])
+    store = ResultStore([{"value": 1}])
+    with pytest.raises(TypeError):
+        store.append({"value": value})
+    assert len(store) == 1
+
+
+def test_a_rejected_row_leaves_no_partial_columns():
+    store = ResultStore(rows(2))
+    with pytest.raises(TypeError):
+        store.append({"id": 2, "score": 1.0, "name": None})
+    with pytest.raises(KeyError):
+        store.append({"id": 2, "score": 1.0, "title": "x"})
+    with pytest.raises(KeyError):
+        store.append({"id": 2})
+    assert [row.to_dict() for row in store] == rows(2)
+    assert len(store.column("name")) == 2
+
+
+def test_a_rejected_first_row_leaves_the_store_empty():
+    store = ResultStore()
+    with pytest.raises(TypeError):
+        store.append({"id": 1, "flag": False})
+    assert len(store) == 0
+    assert not store.keys()
+    store.append({"name": "x"})
+    assert store.column_kinds() == {"name": "s"}
+
+
+def test_extend_from_another_store():
+    store = ResultStore(rows(2))
+    store.extend(ResultStore(rows(3, start=2)))
+    assert [row.to_dict() for row in store] == rows(5)
+    empty = ResultStore()
+    empty.extend(ResultStore(rows(2)))
+    empty.extend(ResultStore())
+    assert [row.to_dict() for row in empty] == rows(2)
+
+
+def test_extend_promotes_ints_to_floats():
+    store = ResultStore([{"value": 1}])
+    store.extend(ResultStore([{"value": 0.5}]))
+    assert [row["value"] for row in store] == [1.0, 0.5]
+    store = ResultStore([{"value": 0.5}])
+    store.extend(ResultStore([{"value": 1}]))
+    assert [row["value"] for row in store] == [0.5, 1.0]
+
+
+def test_extend_rejects_other_columns():
+    store = ResultStore(rows(1))
+    with pytest.raises(KeyError):
+        store.extend(ResultStore([{"id": 1}]))
+    with pytest.raises(TypeError):
+        store.extend(ResultStore([{"id": 1, "score": 1.0, "name": 5}]))
+    assert len(store) == 1
+
+
+def test_copy_is_independent():
+    store = ResultStore(rows(2))
+    copy = store.copy()
+    copy.append(rows(1, start=2)[0])
+    assert len(store) == 2
+    assert len(copy) == 3
+
+
+def test_nbytes_counts_column_buffers():
+    store = ResultStore([{"id": 1, "name": "abc"}])
+    assert store.nbytes == 8 + 3 + 8
+
+
+# --- diff ---
+
+
+def changed(old, new, row, key, value):
+    """A copy of `new` with one value replaced."""
+    items = [item.to_dict() for item in new]
+    items[row][key] = value
+    return ResultStore(items)
+
+
+def test_diff_of_equal_stores_is_unchanged():
+    diff = ResultStore(rows(10)).diff(ResultStore(rows(10)))
+    assert diff.unchanged
+    assert diff.changed == []
+
+
+def test_diff_finds_changed_values_in_every_kind():
+    old = ResultStore(rows(10_000))
+    new = changed(old, old, 3, "id", -1)
+    new = changed(old, new, 5000, "score", 0.1)
+    new = changed(old, new, 9999, "name", "renamed")
+    diff = old.diff(new)
+    assert diff.changed == [3, 5000, 9999]
+    assert diff.in_place and not diff.unchanged
+
+
+def test_diff_sees_strings_split_differently():
+    old = ResultStore([{"name": "ab"}, {"name": "c"}])
+    new = ResultStore([{"name": "a"}, {"name": "bc"}])
+    assert old.diff(new).changed == [0, 1]
+
+
+def test_diff_after_a_longer_string_shifts_the_data():
+    old = ResultStore([{"name": "a"}, {"name": "same"}])
+    new = ResultStore([{"name": "abc"}, {"name": "same"}])
+    assert old.diff(new).changed == [0]
+
+
+def test_diff_compares_float_bits():
+    old = ResultStore([{"value": float("nan")}, {"value": 0.0}])
+    new = ResultStore([{"value": float("nan")}, {"value": -0.0}])
+    assert old.diff(new).changed == [1]
+
+
+def test_diff_counts_added_and_removed_rows():
+    diff = ResultStore(rows(5)).diff(ResultStore(rows(8)))
+    assert (diff.changed, diff.added, diff.removed) == ([], 3, 0)
+    assert diff.in_place
+    diff = ResultStore(rows(8)).diff(ResultStore(rows(5)))
+    assert (diff.changed, diff.added, diff.removed) == ([], 0, 3)
+    assert not diff.in_place
+
+
+def test_diff_of_other_columns_cannot_compare_rows():
+    diff = ResultStore(rows(2)).diff(ResultStore([{"id": 1}]))
+    assert not diff.same_columns
+    assert diff.changed is None
+    assert not diff.unchanged
+    diff = ResultStore([{"value": 1}]).diff(ResultStore([{"value": 1.0}]))
+    assert not diff.same_columns
@@ -0,0 +1,42 @@
+# test_results_view.py
+import pytest
+from PySide6.QtCore import QItemSelectionModel
+from PySide6.QtWidgets import QApplication
+from result_store import ResultStore
+from results_view import ResultsView
+
+Flag = QItemSelectionModel.SelectionFlag
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def view(app):
+    view = ResultsView()
+    view.set_results(ResultStore({"id": i, "name": f"row {i}"} for i in range(10)))
+    yield view
+    view.deleteLater()
+
+
+def names(items):
+    return [item["name"] for item in items]
+
+
+def test_selected_follows_the_selection(view):
+    received = []
+    view.selected.connect(lambda item: received.append(item and item["name"]))
+    model = view.model()
+    view.setCurrentIndex(model.index(1))
+    view.selectionModel().select(model.index(4), Flag.Select)
+    assert names(view.selected_items()) == ["row 1", "row 4"]
+    assert view.selected_item()["name"] == "row 1"
+    # Deselecting the current row leaves the other one as the selected item.
+    view.selectionModel().select(model.index(1), Flag.Deselect)
+    assert received[-1] == "row 4"
+    view.selectionModel().select(model.index(4), Flag.Deselect)
+    assert received[-1] is None
+    assert view.selected_items() == []
+    assert view.selected_item() is None
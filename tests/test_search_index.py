@@ -0,0 +1,138 @@
+# test_search_index.py
+import random
+import re
+
+import pytest
+import search_index
+from result_store import ResultStore
+from search_index import SearchIndex, SearchIndexBuilder
+
+WORDS = ["alpha", "alps", "beta", "Bet", "gamma", "Gam", "delta", "épée", "x"]
+
+
+class Token:
+    def __init__(self, is_cancelled=False):
+        self.is_cancelled = is_cancelled
+
+
+@pytest.fixture(autouse=True)
+def small_limits(monkeypatch):
+    # Small enough that a few hundred rows take every code path: several
+    # build chunks, sparse and bitmap matches, and mixes of the two.
+    monkeypatch.setattr(search_index, "BUILD_CHUNK_ROWS", 64)
+    monkeypatch.setattr(search_index, "SPARSE_LIMIT", 40)
+
+
+@pytest.fixture
+def store():
+    rng = random.Random(7)
+    ids = list(range(300))
+    rng.shuffle(ids)
+    rows = [
+        {
+            "id": ids[row],
+            "score": float(rng.randrange(10)),
+            "name": " ".join(rng.choices(WORDS, k=rng.randrange(4)))
+            + ("-Project" if row % 3 else "")
+            + f" r{row}",
+        }
+        for row in range(300)
+    ]
+    return ResultStore(rows)
+
+
+def matches(store, text):
+    """The rows a search for `text` should return, found the slow way."""
+    query = re.findall(r"\w+", text.lower())
+
+    def is_match(row):
+        words = re.findall(r"\w+", store[row]["name"].lower())
+        return all(any(word.startswith(q) for word in words) for q in query)
+
+    return [row for row in range(len(store)) if is_match(row)]
+
+
+def sort_key(store, field):
+    def key(row):
+        value = store[row][field]
+        return value.lower() if isinstance(value, str) else value
+
+    return key
+
+
+def positions(result):
+    return [result.row(position) for position in range(result.count)]
+
+
+QUERIES = [
+    "",
+    "a",
+    "ALP",
+    "bet gam",
+    "pro al",
+    "ép",
+    "zz",
+    # Rare words, alone and narrowed by common ones.
+    "r25",
+    "r1 r12",
+    "r25 pro",
+    "r2 al x",
+    # "r" is in every row, so it filters nothing.
+    "r25 r",
+]
+
+
+@pytest.mark.parametrize("text", QUERIES)
+def test_search_matches_word_prefixes(store, text):
+    index = SearchIndex(store)
+    assert positions(index.search(text)) == matches(store, text)
+
+
+@pytest.mark.parametrize("field", ["id", "score", "name"])
+@pytest.mark.parametrize("text", ["", "al", "bet gam", "r2 pro"])
+def test_sort_orders(store, field, text):
+    index = SearchIndex(store)
+    # Ties keep row order, and descending is the exact reverse.
+    expected = sorted(matches(store, text), key=sort_key(store, field))
+    assert positions(index.search(text, field)) == expected
+    result = index.search(text, field, descending=True)
+    assert positions(result) == expected[::-1]
+
+
+@pytest.mark.parametrize("field", [None, "id", "name"])
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("text", ["", "a", "r1", "zz"])
+def test_position_is_the_inverse_of_row(store, field, descending, text):
+    result = SearchIndex(store).search(text, field, descending)
+    expected = {row: position for position, row in enumerate(positions(result))}
+    assert [result.position(row) for row in range(len(store))] == [
+        expected.get(row) for row in range(len(store))
+    ]
+
+
+def test_repeated_words_in_a_row():
+    index = SearchIndex(ResultStore([{"name": "aa aa ab"}, {"name": "b"}]))
+    assert positions(index.search("a")) == [0]
+
+
+def test_numeric_text_field():
+    index = SearchIndex(ResultStore([{"name": 12}, {"name": 3}]))
+    assert positions(index.search("1")) == [0]
+    assert positions(index.search("", "name")) == [1, 0]
+
+
+def test_empty_store():
+    index = SearchIndex(ResultStore())
+    assert index.search("a").count == 0
+    assert index.search("").count == 0
+
+
+def test_a_cancelled_build_emits_nothing(store):
+    builder = SearchIndexBuilder(store)
+    built = []
+    builder.index_ready.connect(built.append)
+    builder.build(Token(is_cancelled=True))
+    assert built == []
+    builder.build(Token())
+    assert len(built) == 1
+    assert built[0].count == len(store)
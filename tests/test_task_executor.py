@@ -0,0 +1,44 @@
+# test_task_executor.py
+import threading
+import time
+
+import pytest
+from PySide6.QtWidgets import QApplication
+from task_executor import TaskExecutor, shutdown_executors
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def release():
+    # Lets tasks that ignore their token finish once the test is over.
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+def test_cancelled_tasks_stop_within_the_timeout(app):
+    executor = TaskExecutor()
+    executor.submit(lambda token: token.sleep(5))
+    assert executor.shutdown(timeout_ms=1000)
+
+
+def test_executors_share_one_deadline(app, release):
+    executors = [TaskExecutor(), TaskExecutor()]
+    started = threading.Semaphore(0)
+
+    def stuck(token):
+        started.release()
+        release.wait(5)
+
+    for executor in executors:
+        executor.submit(stuck)
+    for _ in executors:
+        started.acquire()
+    start = time.monotonic()
+    assert not shutdown_executors(executors, timeout_ms=100)
+    # Waiting on each in turn would take 200 ms.
+    assert time.monotonic() - start < 0.19
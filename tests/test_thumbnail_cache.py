@@ -0,0 +1,137 @@
+# test_thumbnail_cache.py
+import os
+import time
+
+import pytest
+from download_engine import DownloadResponse
+from thumbnail_cache import DEFAULT_MAX_AGE, ThumbnailCache
+
+
+class FakePixmap:
+    """Just what the memory tier reads to cost an entry."""
+
+    def __init__(self, width, height=1):
+        self._width = width
+        self._height = height
+
+    def width(self):
+        return self._width
+
+    def height(self):
+        return self._height
+
+    def depth(self):
+        return 32
+
+
+def response(status=200, **headers):
+    headers = {name.replace("_", "-"): value for name, value in headers.items()}
+    return DownloadResponse("http://host/a.png", status, headers, bytearray())
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ThumbnailCache(memory_limit=400, disk_limit=100, directory=str(tmp_path))
+
+
+def test_lookup_misses_an_unknown_url(cache):
+    assert cache.lookup("http://host/a.png") == (None, False)
+
+
+def test_memory_tier_evicts_least_recently_used(cache):
+    expires = time.time() + 60
+    cache.insert("a", FakePixmap(25), expires)  # 100 bytes each
+    cache.insert("b", FakePixmap(25), expires)
+    cache.insert("c", FakePixmap(25), expires)
+    cache.lookup("a")
+    cache.insert("d", FakePixmap(25), expires)
+    cache.insert("e", FakePixmap(25), expires)
+    assert cache.lookup("b") == (None, False)
+    assert cache.lookup("a")[0] is not None
+    assert cache.stats["memory_evictions"] == 1
+
+
+def test_memory_tier_keeps_one_entry_over_the_limit(cache):
+    cache.insert("big", FakePixmap(1000), time.time() + 60)
+    assert cache.lookup("big")[0] is not None
+
+
+def test_lookup_reports_expired_entries_as_stale(cache):
+    cache.insert("a", FakePixmap(1), time.time() - 1)
+    pixmap, is_fresh = cache.lookup("a", load=True)
+    assert pixmap is not None and not is_fresh
+    assert cache.stats["memory_hits"] == 0
+
+
+def test_only_loads_count_memory_hits(cache):
+    cache.insert("a", FakePixmap(1), time.time() + 60)
+    cache.lookup("a")
+    cache.lookup("a", load=True)
+    assert cache.stats["memory_hits"] == 1
+
+
+def test_store_keeps_validators_for_revalidation(cache):
+    url = "http://host/a.png"
+    expires = cache.store(
+        url, b"png", response(ETag='"v1"', Last_Modified="Mon, 01 Jan 2024")
+    )
+    assert cache.disk_entry(url) == (
+        os.path.join(cache.directory, cache._key(url) + ".img"),
+        expires,
+    )
+    assert cache.conditional_headers(url) == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 01 Jan 2024",
+    }
+    assert cache.stats["revalidations"] == 1
+
+
+def test_no_validators_without_a_disk_entry(cache):
+    assert cache.conditional_headers("http://host/a.png") == {}
+    assert cache.stats["revalidations"] == 0
+
+
+def test_expiry_follows_max_age(cache):
+    before = time.time()
+    expires = cache.store("a", b"x", response(Cache_Control="max-age=30"))
+    assert before + 30 <= expires <= time.time() + 30
+    expires = cache.store("b", b"x", response(Cache_Control="no-cache"))
+    assert expires <= time.time()
+    expires = cache.store("c", b"x", response())
+    assert expires >= before + DEFAULT_MAX_AGE
+
+
+def test_not_modified_extends_the_disk_and_memory_entries(cache):
+    url = "http://host/a.png"
+    cache.store(url, b"png", response(ETag='"v1"', Cache_Control="max-age=0"))
+    pixmap = FakePixmap(1)
+    cache.insert(url, pixmap, time.time() - 1)
+    expires = cache.refresh(url, response(304, Cache_Control="max-age=60"))
+    assert expires > time.time()
+    assert cache.disk_entry(url)[1] == expires
+    assert cache.renew(url, expires) is pixmap
+    assert cache.lookup(url) == (pixmap, True)
+    assert cache.stats["not_modified"] == 1
+
+
+def test_renew_without_a_memory_entry(cache):
+    assert cache.renew("a", time.time() + 60) is None
+
+
+def test_disk_tier_evicts_least_recently_used(cache):
+    for name, mtime in (("a", 1000), ("b", 2000)):
+        cache.store(name, b"x" * 40, response())
+        os.utime(cache._data_path(name), (mtime, mtime))
+    cache.disk_entry("a")  # Now the most recently used.
+    cache.store("c", b"x" * 40, response())
+    assert cache.disk_entry("b") is None
+    assert cache.disk_entry("a") is not None
+    assert cache.disk_entry("c") is not None
+    assert cache.stats["disk_evictions"] == 1
+
+
+def test_disk_entry_ignores_a_hash_collision(cache):
+    cache.store("a", b"x", response())
+    os.replace(cache._meta_path("a"), cache._meta_path("b"))
+    os.replace(cache._data_path("a"), cache._data_path("b"))
+    assert cache.disk_entry("b") is None